@@ -1,9 +1,14 @@
+import os
 import pandas as pd
 import numpy as np
-from models.operations.Operation import Operation
-from models.indicators.SimpleMovingAverageCrossover import SimpleMovingAverageCrossover
-from models.AbstractModel import AbstractModel
-from utils.constants import BUY, SELL, DO_NOTHING
+from models.operations.OperationBook import OperationBook
+from models.operations.OperationLedger import OperationLedger
+from models.FeatureStore import FeatureStore
+from agents.combiners.UnanimousCombiner import UnanimousCombiner
+from utils.constants import BUY, SELL, DO_NOTHING, CLOSE_EXITS, INTRABAR_EXITS
+from utils.search import first_crossing
+from utils.downsample import LTTB
+from utils.Profiler import PROFILER
 
 
 class AbstractAgent(object):
@@ -12,23 +17,34 @@ class AbstractAgent(object):
 
     """
 
-    def __init__(self, agent_name, balance, percentage, take_profit, stop_loss):
+    def __init__(self, agent_name, balance, percentage, take_profit, stop_loss, combiner=None):
         """
         Class constructor.
 
         @param agent_name: agent name
         @@type agent_name: string
+        @param combiner: how the models signals become the agent signal (unanimous by default)
+        @@type combiner: class derived from agents.combiners.AbstractCombiner class
         """
         self._agent_name = agent_name
-        self._history = []
         self._models = []
+        # Features shared by the models, computed once per update
+        self._features = FeatureStore()
         self._signals = pd.DataFrame()
-        self._operations = []
+        self._ledger = OperationLedger()
+        # One book per asset the agent trades
+        self._books = {}
         self.initial_balance = balance
         self.balance = balance
         self.active_balance_percentage = percentage
         self.take_profit = take_profit
         self.stop_loss = stop_loss
+        self._combiner = combiner or UnanimousCombiner()
+        self.exits = CLOSE_EXITS
+        # Called with the ledger and the operation id whenever an operation is closed
+        self._close_listeners = []
+        # Candles received by on_bar
+        self._total_bars = 0
 
     def add_model(self, model):
         """
@@ -39,41 +55,154 @@ class AbstractAgent(object):
         """
         # Append
         self._models.append(model)
+        model.attach_store(self._features)
         # Create column
         self._signals[model.get_name()] = np.array([])
         # Print
         print(f'Added model {model.get_name()}')
 
+    def remove_model(self, model):
+        """
+        Remove a model from the agent, evicting the features only it used.
+
+        @param model: model to be removed.
+        @@type model: class derived from models.AbstractModel class
+        """
+        self._models.remove(model)
+        model.detach_store()
+        if model.get_name() not in [other.get_name() for other in self._models]:
+            self._signals = self._signals.drop(columns=model.get_name(), errors='ignore')
+
+    def get_feature_store(self):
+        """
+        Get the features shared by the models.
+
+        @return store: feature store
+        @@@type store: models.FeatureStore
+        """
+        return self._features
+
     def update(self, data):
         """
-        Updated agent data. It's worth mentioning that we don't check for divergence on this agent.
-        Basically, a BUY signal will be sent if all the signals from the models are BUY. The same for SELL.
+        Updated agent data. The models signals are combined by the agent combiner: by default,
+        a BUY signal will be sent if all the signals from the models are BUY. The same for SELL.
 
         @param data: data used to generate the signals
         @@type data: pandas dataframe 
         """
-        signals = pd.DataFrame(index=data.index)
+        with PROFILER.phase('agent.update'):
+            self._signals = self.generate_signals(data)
+            # Check for operations update
+            with PROFILER.phase('agent.operations'):
+                self._update_operations(data)
 
-        # Get all the signals
+    def on_bar(self, date, bar, asset=0):
+        """
+        Update the agent with a single new candle, as it arrives. Models are updated with their own on_bar,
+        so the cost doesn't depend on how many candles were seen before. Feeding the candles of a series one
+        by one creates the same operations as calling update on every prefix of it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+        @param asset: asset the candle belongs to
+        @@type asset: integer
+
+        @return signal: agent signal on the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        model_signals = np.empty((len(self._models), 1), dtype=np.int8)
+        for row, model in enumerate(self._models):
+            with PROFILER.phase(model.get_phase_name()):
+                model_signals[row, 0] = model.on_bar(date, bar)
+
+        with PROFILER.phase('agent.consensus'):
+            signal = float(self._combiner.combine(model_signals)[0])
+
+        with PROFILER.phase('agent.operations'):
+            if self.exits == INTRABAR_EXITS:
+                self.step(self._total_bars, date, bar['Close'], signal, asset,
+                          bar['Open'], bar['High'], bar['Low'])
+            else:
+                self.step(self._total_bars, date, bar['Close'], signal, asset)
+        self._total_bars += 1
+
+        return signal
+
+    def update_all(self, data, cache=None):
+        """
+        Update agent data with the whole series at once. It creates the same operations as calling update
+        on every prefix of data, but the signals are generated only once and the operations endpoints are
+        found with array searches instead of checking every operation on every candle.
+
+        @param data: data used to generate the signals
+        @@type data: pandas dataframe
+        @param cache: signals of models shared with other agents (see generate_signals)
+        @@type cache: dict
+        """
+        with PROFILER.phase('agent.update_all'):
+            self._signals = self.generate_signals(data, cache)
+            with PROFILER.phase('agent.operations'):
+                self.trade_all(data, self._signals['Signal'].to_numpy())
+
+    def trade_all(self, data, signals):
+        """
+        Create and close the operations of a whole series whose signals were already generated.
+
+        @param data: data the signals were generated on
+        @@type data: pandas dataframe
+        @param signals: agent signal of each candle
+        @@type signals: numpy array of BUY, SELL or DO_NOTHING constants
+        """
+        close = data['Close'].to_numpy()
+        entries = np.flatnonzero((signals == BUY) | (signals == SELL))
+        positions = signals[entries]
+        lower_prices, upper_prices = OperationLedger.trigger_prices(
+            close[entries], positions, self.take_profit, self.stop_loss)
+
+        intrabar = self.exits == INTRABAR_EXITS
+        if intrabar:
+            # The range of the entry candle happened before the operation went in at its close
+            open_prices, high_prices, low_prices = (data[column].to_numpy() for column in ['Open', 'High', 'Low'])
+            exits = first_crossing(high_prices, low_prices, entries + 1, upper_prices, lower_prices)
+            exit_prices = np.full(len(exits), np.nan)
+            closed = exits >= 0
+            exit_prices[closed] = OperationLedger.fill_prices(
+                positions[closed], lower_prices[closed], upper_prices[closed],
+                open_prices[exits[closed]], high_prices[exits[closed]], low_prices[exits[closed]])
+        else:
+            exits = first_crossing(close, close, entries, upper_prices, lower_prices)
+            exit_prices = close[np.maximum(exits, 0)]
+
+        # Replay only the candles where something happens, so balance changes keep the loop order
+        first_id = len(self._ledger)
+        opening = dict(zip(entries, positions))
+        closing = {}
+        for operation_id, (exit_index, exit_price) in enumerate(zip(exits, exit_prices), start=first_id):
+            if exit_index >= 0:
+                closing.setdefault(exit_index, []).append((operation_id, exit_price))
+
+        for index in sorted(set(opening) | set(closing)):
+            if index in opening and not intrabar:
+                self._create_operation(index, data.index[index], close[index], opening[index])
+            for operation_id, exit_price in closing.get(index, []):
+                self._close_operation(operation_id, index, data.index[index], exit_price)
+            if index in opening and intrabar:
+                self._create_operation(index, data.index[index], close[index], opening[index])
+
+    def reset(self):
+        """
+        Reset the agent to its initial state, so it can be executed again.
+
+        """
+        self._ledger = OperationLedger()
+        self._books = {}
+        self._signals = pd.DataFrame(columns=[model.get_name() for model in self._models])
+        self.balance = self.initial_balance
+        self._total_bars = 0
         for model in self._models:
-            model.update(data)
-            model_signals = model.get_signals()
-            model_name = model.get_name()
-            signals[model_name] = model_signals['Signal']
-
-        # Save the signals from the agent for plotting purposes
-        self._signals = signals
-        signals = np.array([])
-        # Iterate over dataframe rows for intersection checking
-        for index, row in self._signals.iterrows():
-            format_row = np.array(row)
-            signals = np.append(signals, BUY if np.all(format_row == BUY)
-                                else SELL if np.all(format_row == SELL) else DO_NOTHING)
-        # Save it
-        self._signals['Close'] = data['Close']
-        self._signals['Signal'] = signals
-        # Check for operations update
-        self._update_operations(data)
+            model.reset_state()
 
     def run_tool(self, tool, save_log=True):
         """
@@ -82,13 +211,86 @@ class AbstractAgent(object):
         @param tool: tool to be executed
         @@type tool: a class derived from tools.AbstractTool class
         """
-        tool.execute_agent(self, 
+        return tool.execute_agent(self, 
                            save_log=save_log, 
                            balance=self.initial_balance,
                            percentage=self.active_balance_percentage,
                            take_profit=self.take_profit, 
                            stop_loss=self.stop_loss)
 
+    def get_description(self, strict=True):
+        """
+        Describe what the operations of the agent depend on (used to key stored results and checkpoints).
+
+        @param strict: whether a model whose parameters are unknown leaves the agent undescribed (otherwise
+        the model is only described by its class and name)
+        @@type strict: boolean
+
+        @return description: agent parameters, combiner and the parameter key of each model
+        (None if a model can't be described)
+        @@@type description: dict
+        """
+        models = [model.get_parameter_key() for model in self._models]
+        if None in models:
+            if strict:
+                return None
+            models = [key if key is not None else
+                      (f'{type(model).__module__}.{type(model).__qualname__}', model.get_name())
+                      for key, model in zip(models, self._models)]
+
+        return {
+            'Agent': self._agent_name,
+            'Class': type(self).__name__,
+            'Balance': self.initial_balance,
+            'Percentage': self.active_balance_percentage,
+            'Take profit': self.take_profit,
+            'Stop loss': self.stop_loss,
+            'Exits': self.exits,
+            'Combiner': [type(self._combiner).__name__,
+                         {name: value for name, value in vars(self._combiner).items() if not name.startswith('_')}],
+            'Models': models
+        }
+
+    def get_state(self):
+        """
+        Get everything the agent knows, so it can be saved and restored later (like on a checkpoint).
+        Close listeners belong to whoever is running the agent and are left out.
+
+        @return state: agent attributes, including its models and operations
+        @@@type state: dict
+        """
+        state = dict(self.__dict__)
+        del state['_close_listeners']
+
+        return state
+
+    def set_state(self, state):
+        """
+        Restore a state given by get_state, keeping the current close listeners.
+
+        @param state: agent attributes
+        @@type state: dict
+        """
+        self.__dict__.update(state)
+
+    def add_close_listener(self, listener):
+        """
+        Call a function whenever an operation is closed. Listeners are kept when the agent is reset.
+
+        @param listener: called with the ledger and the id of the closed operation
+        @@type listener: function
+        """
+        self._close_listeners.append(listener)
+
+    def remove_close_listener(self, listener):
+        """
+        Stop calling a function added by add_close_listener.
+
+        @param listener: function to be removed
+        @@type listener: function
+        """
+        self._close_listeners.remove(listener)
+
     def get_name(self):
         """
         Get agent name.
@@ -103,6 +305,40 @@ class AbstractAgent(object):
         """
         return self._signals
 
+    def set_history_size(self, history_size):
+        """
+        Set how many candles received by on_bar each model keeps to rebuild its signals.
+
+        @param history_size: number of candles kept (None keeps all of them)
+        @@type history_size: integer
+        """
+        for model in self._models:
+            model.set_history_size(history_size)
+
+    def set_exits(self, exits):
+        """
+        Set which prices the operations endpoints are checked against.
+
+        @param exits: CLOSE_EXITS checks the close price of each candle (the operations close at it).
+        INTRABAR_EXITS checks the high and low prices from the candle after the entry on, closing at
+        the endpoint price (or at the open price when the candle opens beyond it, and at the stop loss
+        when the range crosses both endpoints)
+        @@type exits: CLOSE_EXITS or INTRABAR_EXITS constant
+        """
+        if exits not in [CLOSE_EXITS, INTRABAR_EXITS]:
+            raise ValueError(f"Unknown exits '{exits}'.")
+
+        self.exits = exits
+
+    def set_combiner(self, combiner):
+        """
+        Set how the models signals become the agent signal.
+
+        @param combiner: combiner to be used
+        @@type combiner: class derived from agents.combiners.AbstractCombiner class
+        """
+        self._combiner = combiner
+
     def get_profit_data(self):
         """
         Get profit data.
@@ -119,14 +355,21 @@ class AbstractAgent(object):
 
     def get_history(self):
         """
-        Get agent history.
+        Get agent history. It is formatted from the ledger on every call.
 
         @return history: history
         @@@type history: list
-        @return profit_data: profit and percentage profit
-        @@@type profit_data: tuple
         """
-        return self._history
+        return self._ledger.to_history()
+
+    def get_ledger(self):
+        """
+        Get the ledger with all the operations.
+
+        @return ledger: operations ledger
+        @@@type ledger: models.operations.OperationLedger
+        """
+        return self._ledger
 
     def get_active_operation_data(self, updated_close_price):
         """
@@ -134,12 +377,12 @@ class AbstractAgent(object):
 
         """
         total_value_invested, total_operations_active = 0, 0
+        invested_values = self._ledger.get_column('invested_value')
 
-        for operation in self._operations:
-            if operation.is_open_position():
-                updated_value_invested = operation.get_cash_open()
-                total_operations_active += 1
-                total_value_invested += updated_value_invested
+        # Open operations still count at the value they went in with
+        for operation_id in self._get_open_ids():
+            total_operations_active += 1
+            total_value_invested += invested_values[operation_id]
 
         return total_operations_active, total_value_invested
 
@@ -152,19 +395,14 @@ class AbstractAgent(object):
         """
         return self.balance
 
-    def _should_create_operation(self, signals):
+    def get_models(self):
         """
-        Check if should create a new operation based on last signal.
+        Get the models of the agent.
 
-        @param signals: all the signals until this moment.
-        @@type signals: pandas dataframe
-
-        @return boolean that represents the operation creation
+        @return models: models, in the order they were added
+        @@@type models: list of classes derived from models.AbstractModel class
         """
-        if signals['Signal'][-1] in [BUY, SELL]:
-            return True
-
-        return False
+        return list(self._models)
 
     def get_model_signals(self):
         signals = []
@@ -172,59 +410,190 @@ class AbstractAgent(object):
             signals.append(model.get_signals())
 
         return signals
+
+    def generate_signals(self, data, cache=None):
+        """
+        Update the models and build the agent signals from theirs.
+
+        @param data: data used to generate the signals
+        @@type data: pandas dataframe
+        @param cache: signals of the models already updated on the same data, by parameter key. Models found
+        there take a copy of their signals from it instead of being updated, and the others add a copy to it,
+        so models never share a dataframe.
+        @@type cache: dict
+
+        @return signals: models signals, close prices and the agent signal
+        @@@type signals: pandas dataframe
+        """
+        signals = pd.DataFrame(index=data.index)
+        # One row per model, one column per candle
+        model_signals = np.empty((len(self._models), len(data)), dtype=np.int8)
+
+        # Get all the signals
+        for row, model in enumerate(self._models):
+            key = model.get_parameter_key() if cache is not None else None
+            if key is not None and key in cache:
+                model.signals = cache[key].copy()
+            else:
+                with PROFILER.phase(model.get_phase_name()):
+                    model.update(data)
+                if key is not None:
+                    cache[key] = model.get_signals().copy()
+            model_signal = model.get_signals()['Signal']
+            signals[model.get_name()] = model_signal
+            model_signals[row] = model_signal.to_numpy()
+
+        # Save it
+        signals['Close'] = data['Close']
+        with PROFILER.phase('agent.consensus'):
+            signals['Signal'] = self._combiner.combine(model_signals)
+
+        return signals
+
     def _update_operations(self, data):
         """
-        Go through all operation to check if any should be closed. Also, check for operation creation
+        Check for operation creation. Also, close the open operations the last candle reached the endpoint of.
 
         @param data: data updated
         @@type data: pandas dataframe
         """
+        if self.exits == INTRABAR_EXITS:
+            self.step(len(data) - 1, data.index[-1], data['Close'][-1], self._signals['Signal'][-1], 0,
+                      data['Open'][-1], data['High'][-1], data['Low'][-1])
+        else:
+            self.step(len(data) - 1, data.index[-1], data['Close'][-1], self._signals['Signal'][-1])
+
+    def step(self, index, date, close_price, signal, asset=0, open_price=None, high_price=None, low_price=None):
+        """
+        Process a single candle of an asset: create an operation if the signal asks for it, then close
+        the open operations of the asset whose endpoint was crossed. With intra-bar exits, the operations
+        opened before the candle are closed by its range first, and then the new one goes in at the close.
+
+        @param index: index of the candle
+        @@type index: integer
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param close_price: close price of the candle
+        @@type close_price: float
+        @param signal: agent signal on the candle
+        @@type signal: BUY, SELL or DO_NOTHING constant
+        @param asset: asset the candle belongs to
+        @@type asset: integer
+        @param open_price: open price of the candle (only needed by intra-bar exits)
+        @@type open_price: float
+        @param high_price: high price of the candle (only needed by intra-bar exits)
+        @@type high_price: float
+        @param low_price: low price of the candle (only needed by intra-bar exits)
+        @@type low_price: float
+        """
+        if self.exits == INTRABAR_EXITS:
+            self._close_intrabar(index, date, asset, open_price, high_price, low_price)
+            if signal in [BUY, SELL]:
+                self._create_operation(index, date, close_price, signal, asset)
+            return
+
         # Check for operation creation
-        if self._should_create_operation(self._signals):
-            # Get last position
-            position = self._signals['Signal'][-1]
-            # Create
-            self._create_operation(self._signals, position)
-
-        # Check for operation closing
-        for operation in self._operations:
-            # If it is still open
-            if operation.is_open_position():
-                # Check for endpoint
-                if operation.reached_endpoint(data['Close'][-1]):
-                    # Store operation data
-                    invested_value, profit, operation_history = operation.close(
-                        data.index[-1])
-                    self.balance += (profit + invested_value)
-                    self._add_to_history(operation_history)
-
-    def _create_operation(self, signals, position):
+        if signal in [BUY, SELL]:
+            self._create_operation(index, date, close_price, signal, asset)
+
+        # Check for operation closing, only on the operations whose endpoint was crossed
+        for operation_id in self._get_book(asset).pop_triggered(close_price):
+            self._close_operation(operation_id, index, date, close_price)
+
+    def _close_intrabar(self, index, date, asset, open_price, high_price, low_price):
+        """
+        Close the open operations of an asset whose endpoint was crossed by the range of a candle.
+
+        """
+        operation_ids = self._get_book(asset).pop_triggered(high_price, low_price)
+        if not operation_ids:
+            return
+
+        positions = self._ledger.get_column('position')[operation_ids]
+        lower_prices, upper_prices = OperationLedger.trigger_prices(
+            self._ledger.get_column('entry_price')[operation_ids], positions, self.take_profit, self.stop_loss)
+        exit_prices = OperationLedger.fill_prices(positions, lower_prices, upper_prices,
+                                                  open_price, high_price, low_price)
+        for operation_id, exit_price in zip(operation_ids, exit_prices):
+            self._close_operation(operation_id, index, date, exit_price)
+
+    def _get_book(self, asset):
+        """
+        Get the book of open operations of an asset.
+
+        """
+        if asset not in self._books:
+            self._books[asset] = OperationBook()
+
+        return self._books[asset]
+
+    def _get_open_ids(self):
+        """
+        Get the ids of the open operations of every asset, in increasing order.
+
+        """
+        return sorted(operation_id for book in self._books.values() for operation_id in book.get_open_ids())
+
+    def _create_operation(self, index, date, close_price, position, asset=0):
         """
         Creates a new operation. For now, its only theoretical.
 
-        @param signals: updated signals
-        @@type signals: pandas dataframe
+        @param index: index of the candle the operation goes in on
+        @@type index: integer
+        @param date: date of the candle the operation goes in on
+        @@type date: pandas timestamp
+        @param close_price: close price the operation goes in on
+        @@type close_price: float
         @param position: position the operation should run on
         @@type position: BUY or SELL constant
+        @param asset: asset the operation runs on
+        @@type asset: integer
         """
         invested_value = round(
             self.balance * self.active_balance_percentage, 2)
 
         self.balance -= invested_value
-        # Create operation
-        operation = Operation(id=len(self._operations),
-                              close_price=signals['Close'][-1],
-                              invested_value=invested_value,
-                              take_profit=self.take_profit,
-                              stop_loss=self.stop_loss,
-                              position=position,
-                              initial_date=signals.index[-1])
-        # Save it
-        self._operations.append(operation)
+        # Register operation
+        operation_id = self._ledger.open(index, date, close_price, position, invested_value, asset)
+        lower_price, upper_price = OperationLedger.trigger_prices(
+            close_price, position, self.take_profit, self.stop_loss)
+        self._get_book(asset).add(operation_id, float(lower_price), float(upper_price))
+
+    def _close_operation(self, operation_id, index, date, price):
+        """
+        Closes an operation that reached its endpoint, giving back its value to the balance.
+
+        @param operation_id: id of the operation to be closed
+        @@type operation_id: integer
+        @param index: index of the candle the operation was closed on
+        @@type index: integer
+        @param date: date of the candle the operation was closed on
+        @@type date: pandas timestamp
+        @param price: price the operation was closed on
+        @@type price: float
+        """
+        self._get_book(self._ledger.get_column('asset')[operation_id]).discard(operation_id)
+        invested_value, profit = self._ledger.close(operation_id, index, date, price)
+        self.balance += (profit + invested_value)
+        for listener in self._close_listeners:
+            listener(self._ledger, operation_id)
 
-    def _add_to_history(self, operation_history):
-        self._history.append(operation_history)
+    def plot(self, directory=None, points=None, method=LTTB):
+        """
+        Plot the signals of every model.
+
+        @param directory: where each model figure is saved as '<model name>.png', without a display
+        (None shows them)
+        @@type directory: string
+        @param points: maximum number of points drawn per column (None uses the figure resolution)
+        @@type points: integer
+        @param method: how the points are chosen (None draws all of them)
+        @@type method: utils.downsample.LTTB or utils.downsample.MIN_MAX constant
+        """
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
 
-    def plot(self):
         for model in self._models:
-            model.plot(exclude_columns=['Difference', 'Signal', 'Change'])
\ No newline at end of file
+            file_name = None if directory is None else os.path.join(directory, f'{model.get_name()}.png')
+            model.plot(exclude_columns=['Difference', 'Signal', 'Change'], file_name=file_name,
+                       points=points, method=method)
\ No newline at end of file
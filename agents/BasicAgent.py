@@ -6,13 +6,19 @@ class BasicAgent(AbstractAgent):
     Agent for trading that contains SimpleMovingAverageCrossover model
 
     """
-    def __init__(self, balance=10000, percentage=0.1, take_profit=0.03, stop_loss=0.01):
+    def __init__(self, balance=10000, percentage=0.1, take_profit=0.03, stop_loss=0.01, fast_factor=5, slow_factor=12):
         """
         Class constructor.
 
+        @param fast_factor: period of the faster SMA in number of candles
+        @@type fast_factor: integer
+        @param slow_factor: period of the slower SMA in number of candles
+        @@type slow_factor: integer
         """
-        super().__init__('Basic Agent', balance=balance, percentage=0.1, take_profit=take_profit, stop_loss=stop_loss)
-        
+        super().__init__('Basic Agent', balance=balance, percentage=percentage, take_profit=take_profit, stop_loss=stop_loss)
+        self.fast_factor = fast_factor
+        self.slow_factor = slow_factor
+
         self.create_agent()
 
     def create_agent(self):
@@ -20,7 +26,7 @@ class BasicAgent(AbstractAgent):
         Properly create the agent, adding its models and parameters.
 
         """
-        self.add_model(SimpleMovingAverageCrossover(fast_factor=5, slow_factor=12))
+        self.add_model(SimpleMovingAverageCrossover(fast_factor=self.fast_factor, slow_factor=self.slow_factor))
 
     
 
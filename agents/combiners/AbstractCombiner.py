@@ -0,0 +1,49 @@
+import numpy as np
+from utils.constants import BUY, SELL, DO_NOTHING
+
+
+class AbstractCombiner(object):
+    """
+    This class represents an abstract way of combining the signals of many models into the agent signal.
+
+    """
+
+    def __init__(self, combiner_name="Abstract Combiner"):
+        """
+        Class constructor.
+
+        @param combiner_name: combiner name
+        @@type combiner_name: string
+        """
+        self._combiner_name = combiner_name
+
+    def combine(self, signals):
+        """
+        Combine the models signals.
+
+        @param signals: signals of each model, one row per model and one column per candle
+        @@type signals: 2-D numpy array of int8
+
+        @return combined: agent signal of each candle
+        @@@type combined: numpy array of BUY, SELL or DO_NOTHING constants
+        """
+        raise NotImplementedError(
+            "This method is abstract and must be implemented in derived classes.")
+
+    def get_name(self):
+        """
+        Get combiner name.
+
+        """
+        return self._combiner_name
+
+    def _to_signals(self, buy, sell):
+        """
+        Turn the candles chosen for buying and selling into signals. Buying wins if both are chosen.
+
+        @param buy: candles that should be bought
+        @@type buy: numpy array of booleans
+        @param sell: candles that should be sold
+        @@type sell: numpy array of booleans
+        """
+        return np.where(buy, BUY, np.where(sell, SELL, DO_NOTHING))
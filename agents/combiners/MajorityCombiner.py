@@ -0,0 +1,33 @@
+import numpy as np
+from agents.combiners.AbstractCombiner import AbstractCombiner
+from utils.constants import BUY, SELL
+
+
+class MajorityCombiner(AbstractCombiner):
+    """
+    Sends a BUY signal if more than half of the models signals are BUY. The same for SELL.
+
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        """
+        super().__init__("Majority")
+
+    def combine(self, signals):
+        """
+        Combine the models signals.
+
+        @param signals: signals of each model, one row per model and one column per candle
+        @@type signals: 2-D numpy array of int8
+
+        @return combined: agent signal of each candle
+        @@@type combined: numpy array of BUY, SELL or DO_NOTHING constants
+        """
+        total_models = signals.shape[0]
+        buy_votes = np.count_nonzero(signals == BUY, axis=0)
+        sell_votes = np.count_nonzero(signals == SELL, axis=0)
+
+        return self._to_signals(2 * buy_votes > total_models, 2 * sell_votes > total_models)
@@ -0,0 +1,31 @@
+import numpy as np
+from agents.combiners.AbstractCombiner import AbstractCombiner
+
+
+class UnanimousCombiner(AbstractCombiner):
+    """
+    Sends a BUY signal only if all the models signals are BUY. The same for SELL.
+
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        """
+        super().__init__("Unanimous")
+
+    def combine(self, signals):
+        """
+        Combine the models signals.
+
+        @param signals: signals of each model, one row per model and one column per candle
+        @@type signals: 2-D numpy array of int8
+
+        @return combined: agent signal of each candle
+        @@@type combined: numpy array of BUY, SELL or DO_NOTHING constants
+        """
+        total_models = signals.shape[0]
+        votes = signals.sum(axis=0, dtype=np.int64)
+
+        return self._to_signals(votes == total_models, votes == -total_models)
@@ -0,0 +1,45 @@
+import numpy as np
+from agents.combiners.AbstractCombiner import AbstractCombiner
+
+
+class WeightedVoteCombiner(AbstractCombiner):
+    """
+    Each model votes with its own weight. The agent sends a BUY signal if the weighted score
+    (normalized to be between -1 and 1) is above the threshold, and a SELL signal if it is below
+    minus the threshold.
+
+    """
+
+    def __init__(self, weights=None, threshold=0.5):
+        """
+        Class constructor.
+
+        @param weights: weight of each model, in the order they were added (None gives the same weight to all)
+        @@type weights: list of floats
+        @param threshold: minimum score to send a signal
+        @@type threshold: float
+        """
+        super().__init__("Weighted Vote")
+        self.weights = weights
+        self.threshold = threshold
+
+    def combine(self, signals):
+        """
+        Combine the models signals.
+
+        @param signals: signals of each model, one row per model and one column per candle
+        @@type signals: 2-D numpy array of int8
+
+        @return combined: agent signal of each candle
+        @@@type combined: numpy array of BUY, SELL or DO_NOTHING constants
+        """
+        total_models = signals.shape[0]
+        weights = np.ones(total_models) if self.weights is None else np.asarray(self.weights, dtype=np.float64)
+
+        if len(weights) != total_models:
+            raise ValueError(f"Expected {total_models} weights, got {len(weights)}.")
+
+        total_weight = np.abs(weights).sum()
+        score = weights @ signals / total_weight if total_weight else np.zeros(signals.shape[1])
+
+        return self._to_signals(score > self.threshold, score < -self.threshold)
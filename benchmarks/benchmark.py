@@ -0,0 +1,169 @@
+"""
+Benchmark suite of the main backtest paths, on seeded synthetic data.
+
+Run it from the repository root, optionally comparing with the results of another version:
+
+    $ python -m benchmarks.benchmark --sizes 1000,100000 --output bench.json
+    $ python -m benchmarks.benchmark --compare bench.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from agents.BasicAgent import BasicAgent
+from log.Logger import Logger
+from models.indicators.SimpleMovingAverageCrossover import SimpleMovingAverageCrossover
+from models.indicators import kernels
+from providers.SyntheticDataProvider import SyntheticDataProvider
+from tools.BacktestTool import BacktestTool
+from utils.constants import LOOP, VECTORIZED
+
+
+def measure(function, repeat):
+    """
+    Time a function.
+
+    @return timings: best and median wall time in seconds
+    @@@type timings: dict
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return {'best (s)': min(timings), 'median (s)': float(np.median(timings))}
+
+
+def create_agent():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return BasicAgent(balance=10000, take_profit=0.03, stop_loss=0.01)
+
+
+def run_backtest(data, mode):
+    backtest = BacktestTool(mode=mode, provider=SyntheticDataProvider())
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return backtest.evaluate(create_agent(), data)
+
+
+def benchmark_size(data, repeat, loop_limit):
+    """
+    Run every benchmark on a dataset.
+
+    @return results: one entry per benchmark
+    @@@type results: list of dicts
+    """
+    size = len(data)
+    results = []
+
+    def add(name, function, calls=1):
+        timings = measure(function, repeat)
+        results.append({'benchmark': name, 'size': size, 'calls': calls, **timings,
+                        'per call (s)': timings['best (s)'] / calls})
+        print(f"{name:<45} {size:>10} {timings['best (s)']:>12.6f}s")
+
+    model = SimpleMovingAverageCrossover(fast_factor=5, slow_factor=12)
+    add('SimpleMovingAverageCrossover.update', lambda: model.update(data))
+
+    close = data['Close'].to_numpy()
+    windows = list(range(5, 55))
+    add('kernels.rolling_mean (50 windows)', lambda: kernels.rolling_mean(close, windows))
+    add('kernels.ema (50 windows)', lambda: kernels.ema(close, windows))
+
+    agent = create_agent()
+    add('AbstractAgent.update', lambda: agent.generate_signals(data))
+
+    # Operations checks of every candle, as done by _update_operations, on signals already generated
+    signals = agent.generate_signals(data)['Signal'].to_numpy()
+
+    def update_operations():
+        agent.reset()
+        for index in range(size):
+            agent.step(index, data.index[index], close[index], signals[index])
+    add('AbstractAgent._update_operations', update_operations, calls=size)
+
+    if size <= loop_limit:
+        add('BacktestTool.execute_agent (loop)', lambda: run_backtest(data, LOOP))
+    add('BacktestTool.execute_agent (vectorized)', lambda: run_backtest(data, VECTORIZED))
+
+    log_data = run_backtest(data, VECTORIZED)
+    with tempfile.TemporaryDirectory() as path:
+        logger = Logger(path_for_log_file=path)
+
+        def write_log():
+            with contextlib.redirect_stdout(io.StringIO()):
+                logger.log(log_data)
+        add('Logger.log', write_log)
+
+    return results
+
+
+def get_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_results):
+    """
+    Print how much slower (ratio above 1) or faster each benchmark got.
+
+    """
+    previous = {(result['benchmark'], result['size']): result['best (s)'] for result in previous_results}
+    print(f"\n{'Benchmark':<45} {'Size':>10} {'Ratio':>8}")
+    for result in results:
+        key = (result['benchmark'], result['size'])
+        if key in previous and previous[key] > 0:
+            print(f"{key[0]:<45} {key[1]:>10} {result['best (s)'] / previous[key]:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,100000,10000000', help='comma separated numbers of candles')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each benchmark (the best one is kept)')
+    parser.add_argument('--loop-limit', type=int, default=1000,
+                        help='largest size the candle by candle backtest runs on (it is quadratic)')
+    parser.add_argument('--model', default=SyntheticDataProvider.REGIME_SWITCHING,
+                        choices=[SyntheticDataProvider.GBM, SyntheticDataProvider.REGIME_SWITCHING])
+    parser.add_argument('--interval', default='1m', choices=list(SyntheticDataProvider.FREQUENCIES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_output.json', help='where the results are written')
+    parser.add_argument('--compare', help='results of a previous run to compare with')
+    arguments = parser.parse_args()
+
+    provider = SyntheticDataProvider(model=arguments.model, seed=arguments.seed)
+    results = []
+    for size in [int(size) for size in arguments.sizes.split(',')]:
+        data = provider.generate(size, interval=arguments.interval)
+        results += benchmark_size(data, arguments.repeat, arguments.loop_limit)
+
+    report = {
+        'version': get_version(),
+        'date': str(datetime.datetime.now()),
+        'machine': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'arguments': vars(arguments),
+        'results': results
+    }
+    with open(arguments.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results saved on {arguments.output}')
+
+    if arguments.compare:
+        with open(arguments.compare) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Startup time of the main entry points: each module is imported on a fresh interpreter, which is what
+every short CLI run and every pool worker pays. It also lists the heavy optional packages each import
+pulled in, which should stay empty until plotting, network providers or progress bars are used.
+
+Run it from the repository root:
+
+    $ python -m benchmarks.startup --repeat 10 --output startup_output.json
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+import numpy as np
+
+MODULES = [
+    'tools.BacktestTool',
+    'tools.SweepTool',
+    'tools.PortfolioBacktestTool',
+    'tools.WalkForwardTool',
+    'agents.BasicAgent',
+    'providers.YahooDataProvider'
+]
+
+# Packages that should only be imported when used
+HEAVY_PACKAGES = ['matplotlib', 'yfinance', 'pandas_datareader', 'tqdm']
+
+CHECK = (
+    "import sys, {module}; "
+    "print(','.join(package for package in {packages} if package in sys.modules))"
+)
+
+
+def run(code):
+    """
+    Run code on a fresh interpreter.
+
+    @return elapsed: wall time in seconds
+    @@@type elapsed: float
+    @return output: what the code printed
+    @@@type output: string
+    """
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    return elapsed, process.stdout.strip()
+
+
+def measure(code, repeat):
+    timings = [run(code)[0] for _ in range(repeat)]
+
+    return {'best (s)': min(timings), 'median (s)': float(np.median(timings))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each import (the best one is kept)')
+    parser.add_argument('--output', default='startup_output.json', help='where the results are written')
+    arguments = parser.parse_args()
+
+    interpreter = measure('pass', arguments.repeat)
+    print(f"{'Module':<35} {'Import (s)':>12} {'Heavy packages loaded'}")
+    print(f"{'(interpreter)':<35} {interpreter['best (s)']:>12.3f}")
+
+    results = []
+    for module in MODULES:
+        try:
+            loaded = run(CHECK.format(module=module, packages=HEAVY_PACKAGES))[1]
+            timings = measure(f'import {module}', arguments.repeat)
+        except RuntimeError as error:
+            print(f'{module:<35} failed: {error}')
+            continue
+
+        results.append({'module': module, **timings,
+                        'import (s)': timings['best (s)'] - interpreter['best (s)'],
+                        'heavy packages loaded': loaded.split(',') if loaded else []})
+        print(f"{module:<35} {results[-1]['import (s)']:>12.3f} {loaded or '-'}")
+
+    with open(arguments.output, 'w') as f:
+        json.dump({'python': sys.version, 'interpreter': interpreter, 'results': results}, f, indent=2)
+    print(f'Results saved on {arguments.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,13 @@
+import gzip
+import io
 import json
 import datetime
 import os
 
 class Logger(object):
     """
-    This class represents a log file.
+    This class represents a log file. Besides a single JSON document, it can stream a JSON Lines file:
+    records are appended one per line as they happen, and the summary goes on the last line.
 
     """
 
@@ -23,15 +26,73 @@ class Logger(object):
         if not os.path.isdir(self.path):
             os.mkdir(self.path)
         self._data = None
+        self._stream = None
+        self._stream_file = None
         self.date = datetime.datetime.now()
 
     def log(self, data, custom_name=''):
         """
         Log the data.
-        
+
+        @return file_name: file the data was saved to
+        @@@type file_name: string
         """
         self._data = data
-        self._save(custom_name)
+        return self._save(custom_name)
+
+    def open_stream(self, custom_name='', compress=False, buffer_size=1 << 16):
+        """
+        Start a JSON Lines log.
+
+        @param custom_name: added to the file name
+        @@type custom_name: string
+        @param compress: whether the file is compressed with gzip
+        @@type compress: boolean
+        @param buffer_size: bytes held in memory before being written to the file
+        @@type buffer_size: integer
+        """
+        if self._stream is not None:
+            raise RuntimeError("A log stream is already open.")
+
+        path = self._get_file_name(custom_name, '.jsonl.gz' if compress else '.jsonl')
+        self._stream_file = path
+        print(f'Streaming log to {path}...')
+        if compress:
+            self._stream = io.BufferedWriter(gzip.GzipFile(path, 'wb'), buffer_size)
+        else:
+            self._stream = open(path, 'wb', buffering=buffer_size)
+
+    def write(self, record):
+        """
+        Append a record to the JSON Lines log.
+
+        @param record: data of the record
+        @@type record: dict
+        """
+        self._stream.write(json.dumps(record).encode() + b'\n')
+
+    def close_stream(self, summary=None):
+        """
+        Finish the JSON Lines log, writing the summary as its last record.
+
+        @param summary: data of the whole run (nothing is written if None, as when the run failed)
+        @@type summary: dict
+
+        @return file_name: file the log was streamed to
+        @@@type file_name: string
+        """
+        if self._stream is None:
+            return
+
+        try:
+            if summary is not None:
+                self._data = summary
+                self.write({'Summary': summary})
+        finally:
+            self._stream.close()
+            self._stream = None
+
+        return self._stream_file
 
     def get_data(self):
         """
@@ -48,5 +109,11 @@ class Logger(object):
 
         """
         print('Saving log...')
-        with open(os.path.join(self.path, f"log_{custom_name}{'__'.join(str(self.date).split(' '))}.json"), 'w') as f:
+        file_name = self._get_file_name(custom_name, '.json')
+        with open(file_name, 'w') as f:
             json.dump(self._data, f)
+
+        return file_name
+
+    def _get_file_name(self, custom_name, extension):
+        return os.path.join(self.path, f"log_{custom_name}{'__'.join(str(self.date).split(' '))}{extension}")
@@ -0,0 +1,234 @@
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import pandas as pd
+
+
+class ResultStore(object):
+    """
+    This class represents a store of tool results: an SQLite index with the main results of every run,
+    next to the raw log files. Runs are keyed by a hash of everything their result depends on (agent and
+    model parameters, symbol, data range, interval and provider), so an identical run can be answered
+    from the store instead of being computed again, and runs can be compared with a query.
+
+    """
+
+    TABLE = 'results'
+
+    # Indexed results, by the name tools give them
+    RESULT_COLUMNS = {
+        'Final balance (R$)': 'final_balance',
+        'Total profit (R$)': 'total_profit',
+        'Total operations': 'total_operations',
+        'Sharpe ratio': 'sharpe_ratio',
+        'Sortino ratio': 'sortino_ratio',
+        'Max drawdown (%)': 'max_drawdown',
+        'Exposure (%)': 'exposure',
+        'Turnover': 'turnover'
+    }
+    COLUMNS = ['key', 'tool', 'agent', 'symbol', 'initial_date', 'final_date', 'interval', 'created',
+               'log_file', 'description'] + list(RESULT_COLUMNS.values())
+
+    def __init__(self, path='tmp/results.sqlite'):
+        """
+        Class constructor.
+
+        @param path: SQLite database file
+        @@type path: string
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        with self._connect() as connection:
+            connection.execute(f'''
+                CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT,
+                    agent TEXT,
+                    symbol TEXT,
+                    initial_date TEXT,
+                    final_date TEXT,
+                    interval TEXT,
+                    created TEXT,
+                    log_file TEXT,
+                    description TEXT,
+                    {', '.join(f'{column} REAL' for column in self.RESULT_COLUMNS.values())},
+                    result TEXT
+                )''')
+            connection.execute(f'CREATE INDEX IF NOT EXISTS {self.TABLE}_run ON {self.TABLE} '
+                               f'(tool, symbol, interval, initial_date, final_date)')
+
+    @staticmethod
+    def get_key(description):
+        """
+        Hash the description of a run.
+
+        @param description: everything the result of the run depends on
+        @@type description: dict
+
+        @return key: hexadecimal SHA-256 of the description
+        @@@type key: string
+        """
+        content = json.dumps(description, sort_keys=True, default=str)
+
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Get the result of a run.
+
+        @param key: key given by get_key
+        @@type key: string
+
+        @return result: result of the run (None if it isn't stored)
+        @@@type result: dict
+        """
+        with self._connect() as connection:
+            row = connection.execute(f'SELECT result FROM {self.TABLE} WHERE key = ?', (key,)).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def get_many(self, keys):
+        """
+        Get the results of many runs at once.
+
+        @param keys: keys given by get_key
+        @@type keys: list of strings
+
+        @return results: result of each stored run, by key
+        @@@type results: dict
+        """
+        results = {}
+        with self._connect() as connection:
+            # Bounded number of parameters per statement
+            for begin in range(0, len(keys), 500):
+                block = keys[begin:begin + 500]
+                rows = connection.execute(f"SELECT key, result FROM {self.TABLE} WHERE key IN "
+                                          f"({', '.join('?' * len(block))})", block)
+                results.update((key, json.loads(result)) for key, result in rows)
+
+        return results
+
+    def put(self, key, description, result, log_file=None):
+        """
+        Store the result of a run, replacing the one stored with the same key.
+
+        @param key: key given by get_key
+        @@type key: string
+        @param description: everything the result of the run depends on, with at least the 'Tool'
+        @@type description: dict
+        @param result: result of the run, like the data that goes into the log file
+        @@type result: dict
+        @param log_file: raw log file of the run
+        @@type log_file: string
+        """
+        self.put_many([(key, description, result)], log_file)
+
+    def put_many(self, runs, log_file=None):
+        """
+        Store the results of many runs in a single transaction.
+
+        @param runs: (key, description, result) of each run
+        @@type runs: list of tuples
+        @param log_file: raw log file of the runs
+        @@type log_file: string
+        """
+        created = datetime.datetime.now().isoformat(sep=' ')
+        rows = []
+        for key, description, result in runs:
+            values = self._get_result_values(result)
+            agent = description.get('Agent')
+            rows.append((key,
+                         description.get('Tool'),
+                         agent.get('Agent') if isinstance(agent, dict) else agent,
+                         description.get('Symbol'),
+                         str(description.get('Initial date')),
+                         str(description.get('Final date')),
+                         description.get('Interval'),
+                         created,
+                         log_file,
+                         json.dumps(description, sort_keys=True, default=str),
+                         *[values.get(name) for name in self.RESULT_COLUMNS],
+                         json.dumps(result, default=str)))
+
+        with self._connect() as connection:
+            connection.executemany(f"INSERT OR REPLACE INTO {self.TABLE} VALUES "
+                                   f"({', '.join('?' * (len(self.COLUMNS) + 1))})", rows)
+
+    def query(self, order_by=None, ascending=False, limit=None, **filters):
+        """
+        Query the index of the stored runs.
+
+        @param order_by: column the runs are sorted by, like 'sharpe_ratio' or 'Sharpe ratio'
+        @@type order_by: string
+        @param ascending: whether the runs are sorted from the lowest value
+        @@type ascending: boolean
+        @param limit: maximum number of runs
+        @@type limit: integer
+        @param filters: values the columns must be equal to, like symbol='AAPL' or tool='Sweep'
+        @@type filters: dict
+
+        @return runs: one row per run, with the indexed columns
+        @@@type runs: pandas dataframe
+        """
+        columns = [self._check_column(column) for column in filters]
+
+        statement = f"SELECT {', '.join(self.COLUMNS)} FROM {self.TABLE}"
+        if filters:
+            statement += ' WHERE ' + ' AND '.join(f'{column} = ?' for column in columns)
+        if order_by is not None:
+            statement += f" ORDER BY {self._check_column(order_by)} {'ASC' if ascending else 'DESC'}"
+        if limit is not None:
+            statement += f' LIMIT {int(limit)}'
+
+        with self._connect() as connection:
+            return pd.read_sql_query(statement, connection, params=list(filters.values()))
+
+    def __len__(self):
+        with self._connect() as connection:
+            return connection.execute(f'SELECT COUNT(*) FROM {self.TABLE}').fetchone()[0]
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """
+        Open the database for a transaction, committed if nothing fails, and close it afterwards.
+
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _check_column(self, column):
+        """
+        Get the index column with a name, given by tools (like 'Sharpe ratio') or by the index.
+
+        """
+        column = self.RESULT_COLUMNS.get(column, column)
+        if column not in self.COLUMNS:
+            raise ValueError(f"Unknown result column '{column}'.")
+
+        return column
+
+    @staticmethod
+    def _get_result_values(result):
+        """
+        Find the indexed results, either on a backtest log or on a flat row (like the rows of a sweep).
+
+        """
+        values = {**result, **result.get('Metrics', {})}
+        if isinstance(result.get('Balance'), dict):
+            values['Final balance (R$)'] = result['Balance']['Final (R$)']
+        if isinstance(result.get('Profit'), dict):
+            values['Total profit (R$)'] = result['Profit']['Total profit (R$)']
+        if isinstance(result.get('Operations'), dict):
+            values['Total operations'] = result['Operations']['Total']
+
+        return values
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from models.FeatureStore import FeatureStore
 
 class AbstractModel(object):
     """
@@ -15,7 +16,10 @@ class AbstractModel(object):
         @@type model_name: string
         """
         self._model_name = model_name
+        self._phase_name = f'model.update ({model_name})'
         self.signals = None
+        self._store = None
+        self._feature_keys = []
     
     def run_tool(self, tool, save_log=True, plot_signals=False, plot_tool_data=True):
         """
@@ -33,9 +37,111 @@ class AbstractModel(object):
         """
         raise NotImplementedError("This class is abstract and should not have this method.")
 
+    def reset_state(self):
+        """
+        Forget every candle received one by one. Models without running state have nothing to forget.
+
+        """
+        pass
+
+    def set_history_size(self, history_size):
+        """
+        Set how many candles received one by one are kept. Models without running state keep none.
+
+        @param history_size: number of candles kept (None keeps all of them)
+        @@type history_size: integer
+        """
+        pass
+
+    def get_features(self):
+        """
+        Get the features the model uses, which can be shared with other models through a feature store.
+
+        @return features: (source column, operator, window) of each feature
+        @@@type features: list of tuples
+        """
+        return []
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on. Models of the same class with the same parameters
+        generate the same signals, so they can be computed once for all of them.
+
+        @return parameters: parameter values by name (None if the model can't be shared)
+        @@@type parameters: dict
+        """
+        return None
+
+    def get_parameter_key(self):
+        """
+        Get a key identifying the signals of the model.
+
+        @return key: model class (with its module) and parameters (None if the model can't be shared)
+        @@@type key: tuple
+        """
+        parameters = self.get_parameters()
+        if parameters is None:
+            return None
+
+        # Classes with the same name in different modules don't give the same signals
+        model_class = type(self)
+
+        return (f'{model_class.__module__}.{model_class.__qualname__}', tuple(sorted(parameters.items())))
+
+    def attach_store(self, store):
+        """
+        Get the features of the model from a store shared with other models.
+
+        @param store: feature store
+        @@type store: models.FeatureStore
+        """
+        self.detach_store()
+        self._store = store
+        self._feature_keys = [store.register(*feature) for feature in self.get_features()]
+
+    def detach_store(self):
+        """
+        Stop using the feature store, so the features only this model used are evicted.
+
+        """
+        if self._store is not None:
+            for key in self._feature_keys:
+                self._store.release(key)
+        self._store = None
+        self._feature_keys = []
+
+    def _get_feature(self, data, column, operator, window=None):
+        """
+        Get a feature of the data, from the feature store if the model has one.
+
+        @param data: data the feature is computed on
+        @@type data: pandas dataframe
+        @param column: source column, like 'Close'
+        @@type column: string
+        @param operator: how the feature is computed (one of FeatureStore.OPERATORS)
+        @@type operator: string
+        @param window: number of candles the operator looks at
+        @@type window: integer
+
+        @return feature: feature values, indexed as the data
+        @@@type feature: pandas series
+        """
+        if self._store is None:
+            return FeatureStore.OPERATORS[operator](data[column], window)
+
+        self._store.update(data)
+        return self._store.get((column, operator, window))
+
     def get_name(self):
         """
         Get model name.
         
         """
-        return self._model_name
\ No newline at end of file
+        return self._model_name
+
+    def get_phase_name(self):
+        """
+        Get the name the model updates are profiled under.
+
+        """
+        return self._phase_name
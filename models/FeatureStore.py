@@ -0,0 +1,158 @@
+import weakref
+import numpy as np
+import pandas as pd
+from models.indicators import kernels
+
+
+class FeatureStore(object):
+    """
+    Features shared by the models of an agent, like the rolling means of the close price.
+    A feature is keyed by (source column, operator, window) and computed at most once per data the
+    agent is updated with, whatever the number of models using it. Models register the features they use,
+    and a feature is evicted as soon as no model uses it anymore.
+
+    The data is told apart by identity, size, last date and last values of the source columns, so appending
+    candles or changing the last one in place recomputes the features. Earlier candles changed in place
+    aren't noticed: call invalidate after changing them.
+
+    """
+
+    ROLLING_MEAN = 'rolling_mean'
+    ROLLING_STD = 'rolling_std'
+    EMA = 'ema'
+    RSI = 'rsi'
+    PCT_CHANGE = 'pct_change'
+
+    # How each operator computes a feature from the source column
+    OPERATORS = {
+        ROLLING_MEAN: lambda values, window: values.rolling(window=window).mean(),
+        ROLLING_STD: lambda values, window: values.rolling(window=window).std(ddof=0),
+        EMA: lambda values, window: pd.Series(kernels.ema(values.to_numpy(dtype=np.float64), window)[0],
+                                              index=values.index),
+        RSI: lambda values, window: pd.Series(kernels.rsi(values.to_numpy(dtype=np.float64), window)[0],
+                                              index=values.index),
+        PCT_CHANGE: lambda values, window: values.pct_change(periods=window or 1)
+    }
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        """
+        self._users = {}
+        self._features = {}
+        # Weak reference, so the store doesn't keep the data alive
+        self._data = None
+        self._version = None
+
+    def register(self, column, operator, window=None):
+        """
+        Register a use of a feature.
+
+        @param column: source column, like 'Close'
+        @@type column: string
+        @param operator: how the feature is computed (one of FeatureStore.OPERATORS)
+        @@type operator: string
+        @param window: number of candles the operator looks at
+        @@type window: integer
+
+        @return key: key of the feature
+        @@@type key: tuple
+        """
+        if operator not in self.OPERATORS:
+            raise ValueError(f"Unknown feature operator '{operator}'.")
+
+        key = (column, operator, window)
+        self._users[key] = self._users.get(key, 0) + 1
+
+        return key
+
+    def release(self, key):
+        """
+        Remove a use of a feature, evicting it if nothing uses it anymore.
+
+        @param key: key given by register
+        @@type key: tuple
+        """
+        self._users[key] -= 1
+        if not self._users[key]:
+            del self._users[key]
+            self._features.pop(key, None)
+
+    def update(self, data):
+        """
+        Set the data features are computed on. Features computed on other data are dropped.
+
+        @param data: data the agent is updated with
+        @@type data: pandas dataframe
+        """
+        version = self._get_version(data)
+        if self._get_data() is not data or version != self._version:
+            self._data = weakref.ref(data)
+            self._version = version
+            self._features = {}
+
+    def invalidate(self):
+        """
+        Drop every feature computed, as when the data was changed in place before its last candle.
+
+        """
+        self._features = {}
+
+    def get(self, key):
+        """
+        Get a feature of the current data, computing it if it wasn't yet.
+
+        @param key: key given by register
+        @@type key: tuple
+
+        @return feature: feature values, indexed as the data
+        @@@type feature: pandas series
+        """
+        if key not in self._users:
+            raise KeyError(f"Feature {key} isn't registered.")
+
+        if key not in self._features:
+            data = self._get_data()
+            if data is None:
+                raise RuntimeError("There is no data to compute the features on.")
+
+            column, operator, window = key
+            self._features[key] = self.OPERATORS[operator](data[column], window)
+
+        return self._features[key]
+
+    def __getstate__(self):
+        # Features are only a cache of the data, which is left out when saved
+        state = dict(self.__dict__)
+        state['_data'] = None
+        state['_version'] = None
+        state['_features'] = {}
+
+        return state
+
+    def get_keys(self):
+        """
+        Get the keys of the features in use.
+
+        @return keys: keys of the registered features
+        @@@type keys: list of tuples
+        """
+        return list(self._users)
+
+    def _get_data(self):
+        return self._data() if self._data is not None else None
+
+    def _get_version(self, data):
+        """
+        Get what tells the contents of the data apart, besides its identity.
+
+        """
+        if not len(data):
+            return 0, None, ()
+
+        columns = sorted({key[0] for key in self._users})
+        return len(data), data.index[-1], tuple(data[column].iat[-1] for column in columns)
+
+    def __len__(self):
+        return len(self._features)
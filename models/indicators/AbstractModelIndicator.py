@@ -1,9 +1,8 @@
 import pandas as pd
 import numpy as np
+from collections import deque
 from models.AbstractModel import AbstractModel
-import matplotlib.dates as mdates
-from matplotlib import pyplot as plt
-import matplotlib
+from utils.downsample import downsample, LTTB
 
 
 class AbstractModelIndicator(AbstractModel):
@@ -12,40 +11,174 @@ class AbstractModelIndicator(AbstractModel):
 
     """
 
-    def __init__(self, model_name="Abstract Model"):
+    def __init__(self, model_name="Abstract Model", columns=None, history_size=None):
         """
         Class constructor.
 
+        @param columns: columns of the signals dataframe, in the order on_bar records them
+        @@type columns: list of strings
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
         """
         super().__init__(model_name=model_name)
         self.signals = None
+        self.history_size = history_size
+        self._columns = columns or []
+        self._streamed_dates = deque(maxlen=history_size)
+        self._streamed_rows = deque(maxlen=history_size)
+        self._stale_signals = False
+        self._plot_source = None
+        self._plot_cache = {}
 
-    def plot(self, exclude_columns=[]):
+    def __getstate__(self):
+        # Plotted points are only a cache of the signals, which is left out when saved
+        state = dict(self.__dict__)
+        state['_plot_source'] = None
+        state['_plot_cache'] = {}
+
+        return state
+
+    def on_bar(self, date, bar):
         """
-        Plotting signals obtained.
+        Update the model with a single new candle. Derived classes keep running state, so the cost
+        doesn't depend on how many candles were seen before.
 
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
         """
-        # Check for errors
-        if np.all(self.signals, None):
-            raise ValueError("Signals haven't been generated yet.")
-        
+        raise NotImplementedError(
+            "This method is abstract and must be implemented in derived classes.")
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar. Derived classes should also reset their running state.
+
+        """
+        self._streamed_dates.clear()
+        self._streamed_rows.clear()
+        self._stale_signals = False
+        self.signals = None
+
+    def set_history_size(self, history_size):
+        """
+        Set how many candles received by on_bar are kept to rebuild the signals, keeping the latest ones.
+
+        @param history_size: number of candles kept (None keeps all of them)
+        @@type history_size: integer
+        """
+        self.history_size = history_size
+        self._streamed_dates = deque(self._streamed_dates, maxlen=history_size)
+        self._streamed_rows = deque(self._streamed_rows, maxlen=history_size)
+
+    def _record(self, date, row):
+        """
+        Store the values computed by on_bar for a candle, so the signals dataframe can be rebuilt.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param row: values of each column, in the same order as the columns
+        @@type row: tuple
+        """
+        self._streamed_dates.append(date)
+        self._streamed_rows.append(row)
+        self._stale_signals = True
+
+    def plot(self, exclude_columns=[], file_name=None, points=None, method=LTTB):
+        """
+        Plotting signals obtained. Each column is downsampled to about the resolution of the figure,
+        so long series take as long to draw as short ones.
+
+        @param exclude_columns: columns that aren't plotted
+        @@type exclude_columns: list of strings
+        @param file_name: file the figure is saved to, without a display (None shows it)
+        @@type file_name: string
+        @param points: maximum number of points drawn per column (None uses two per pixel of the figure width)
+        @@type points: integer
+        @param method: how the points are chosen (None draws all of them)
+        @@type method: utils.downsample.LTTB or utils.downsample.MIN_MAX constant
+        """
+        signals = self.get_signals()
+
         print(f'Plotting signals from {self.get_name()}...')
+        if file_name is None:
+            from matplotlib import pyplot as plt
+            fig, ax = plt.subplots()
+        else:
+            # Drawn straight on an Agg canvas, so neither a display nor pyplot global state is needed
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure()
+            FigureCanvasAgg(fig)
+            ax = fig.subplots()
 
-        fig, ax = plt.subplots()
+        if points is None:
+            points = 2 * int(fig.get_figwidth() * fig.dpi)
 
-        for column in self.signals.columns:
-            if column not in exclude_columns:
-                ax.plot(self.signals.index, self.signals[column])
+        columns = [column for column in signals.columns if column not in exclude_columns]
+        for column in columns:
+            positions = self.get_plot_positions(column, points, method)
+            ax.plot(signals.index[positions], signals[column].to_numpy()[positions])
 
         # Set ylabel
-        plt.legend([column for column in self.signals.columns if column not in exclude_columns])
-        plt.show()
+        ax.legend(columns)
+        if file_name is None:
+            plt.show()
+        else:
+            fig.savefig(file_name)
+
+    def get_plot_positions(self, column, points, method=LTTB):
+        """
+        Get the positions of the points of a column that are plotted. They are cached per column
+        until the signals change.
+
+        @param column: signals column
+        @@type column: string
+        @param points: maximum number of points
+        @@type points: integer
+        @param method: how the points are chosen (None chooses all of them)
+        @@type method: utils.downsample.LTTB or utils.downsample.MIN_MAX constant
+
+        @return positions: positions of the points on the signals
+        @@@type positions: numpy array of integers or slice
+        """
+        signals = self.get_signals()
+        if method is None:
+            return slice(None)
+
+        if self._plot_source is not signals:
+            self._plot_source = signals
+            self._plot_cache = {}
+
+        key = (column, points, method)
+        if key not in self._plot_cache:
+            index = signals.index
+            if isinstance(index, pd.DatetimeIndex):
+                x = index.asi8
+            elif pd.api.types.is_numeric_dtype(index):
+                x = index.to_numpy()
+            else:
+                x = np.arange(len(index))
+            self._plot_cache[key] = downsample(x, signals[column].to_numpy(dtype=np.float64), points, method)
+
+        return self._plot_cache[key]
 
     def get_signals(self):
         """
         Method to get signals from a model.
 
         """
+        if self._stale_signals:
+            # Rebuild the signals from the candles received by on_bar
+            self.signals = pd.DataFrame(list(self._streamed_rows),
+                                        index=pd.Index(list(self._streamed_dates)),
+                                        columns=self._columns)
+            self._stale_signals = False
+
         if np.all(self.signals == None):
             raise ValueError("Signals haven't been generated yet.")
 
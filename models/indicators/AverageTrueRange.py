@@ -0,0 +1,110 @@
+import math
+import numpy as np
+import pandas as pd
+from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from models.indicators.ExponentialMean import ExponentialMean
+from models.indicators import kernels
+from utils.constants import BUY, SELL, DO_NOTHING
+
+
+class AverageTrueRange(AbstractModelIndicator):
+    """
+    Model representing a volatility breakout on the average true range (Wilder mean of the true range).
+    When the close price rises more than a multiple of the previous ATR, send a signal for long.
+    When it drops more than that, send a signal for short.
+
+    """
+
+    def __init__(self, window=14, multiplier=1.0, history_size=None):
+        """
+        Class constructor
+
+        @param window: window of the true range mean in number of candles
+        @@type window: integer
+        @param multiplier: number of ATRs the close price has to move
+        @@type multiplier: float
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
+        """
+        super().__init__("Average True Range",
+                         columns=['Close', 'True range', 'ATR', 'Signal'],
+                         history_size=history_size)
+        self.window = window
+        self.multiplier = multiplier
+        self.reset_state()
+
+    def update(self, data):
+        """
+        Update the data from the model.
+
+        @param data: data used to generate the signals, with 'High', 'Low' and 'Close' prices
+        @@type data: pandas dataframe
+        """
+        high, low, close = (data[column].to_numpy(dtype=np.float64) for column in ['High', 'Low', 'Close'])
+        true_range = kernels.true_range(high, low, close)
+        atr = kernels.wilder_mean(true_range, self.window)[0]
+        move = close - np.concatenate([[np.nan], close[:-1]])
+        threshold = self.multiplier * np.concatenate([[np.nan], atr[:-1]])
+
+        signals = pd.DataFrame(index=data.index)
+        signals['Close'] = data['Close']
+        signals['True range'] = true_range
+        signals['ATR'] = atr
+        signals['Signal'] = np.where(move > threshold, BUY, np.where(move < -threshold, SELL, DO_NOTHING))
+        signals.fillna(0, inplace=True)
+
+        self.signals = signals
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on.
+
+        """
+        return {'window': self.window, 'multiplier': self.multiplier}
+
+    def on_bar(self, date, bar):
+        """
+        Update the model with a single new candle, giving the same values update would give for it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with 'High', 'Low' and 'Close' prices
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        high, low, close = bar['High'], bar['Low'], bar['Close']
+        if self._last_close is None:
+            true_range = high - low
+            move = math.nan
+        else:
+            true_range = max(high - low, abs(high - self._last_close), abs(low - self._last_close))
+            move = close - self._last_close
+        atr = self._atr.update(true_range)
+        threshold = self.multiplier * self._last_atr
+
+        if move > threshold:
+            signal = BUY
+        elif move < -threshold:
+            signal = SELL
+        else:
+            signal = DO_NOTHING
+
+        self._last_close = close
+        self._last_atr = atr
+        row = (close, true_range, atr, signal)
+        # NaN values are stored as 0, as update does
+        self._record(date, tuple(0.0 if value != value else value for value in row))
+
+        return signal
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar.
+
+        """
+        super().reset_state()
+        self._atr = ExponentialMean(self.window - 1.0, self.window)
+        self._last_close = None
+        self._last_atr = math.nan
@@ -0,0 +1,117 @@
+import math
+import numpy as np
+import pandas as pd
+from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from models.indicators.RollingMean import RollingMean
+from models.indicators.RollingStd import RollingStd
+from models.FeatureStore import FeatureStore
+from utils.constants import BUY, SELL, DO_NOTHING
+
+
+class BollingerBands(AbstractModelIndicator):
+    """
+    Model representing Bollinger bands (moving average plus and minus standard deviations).
+    When the close price drops below the lower band, send a signal for long.
+    When the close price rises above the upper band, send a signal for short.
+
+    """
+
+    def __init__(self, window=20, width=2.0, history_size=None):
+        """
+        Class constructor
+
+        @param window: period of the moving average and deviation in number of candles
+        @@type window: integer
+        @param width: number of standard deviations between the average and each band
+        @@type width: float
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
+        """
+        super().__init__("Bollinger Bands",
+                         columns=['Close', 'Middle band', 'Lower band', 'Upper band', 'Signal'],
+                         history_size=history_size)
+        self.window = window
+        self.width = width
+        self.reset_state()
+
+    def update(self, data):
+        """
+        Update the data from the model.
+
+        @param data: data used to generate the signals
+        @@type data: pandas dataframe
+        """
+        close = data['Close'].to_numpy(dtype=np.float64)
+        middle, deviation = (self._get_feature(data, 'Close', operator, self.window).to_numpy(dtype=np.float64)
+                             for operator in (FeatureStore.ROLLING_MEAN, FeatureStore.ROLLING_STD))
+        deviation = deviation * self.width
+        lower, upper = middle - deviation, middle + deviation
+        last_close, last_lower, last_upper = (np.concatenate([[np.nan], values[:-1]])
+                                              for values in (close, lower, upper))
+
+        signals = pd.DataFrame(index=data.index)
+        signals['Close'] = data['Close']
+        signals['Middle band'] = middle
+        signals['Lower band'] = lower
+        signals['Upper band'] = upper
+        signals['Signal'] = np.where((last_close >= last_lower) & (close < lower), BUY,
+                                     np.where((last_close <= last_upper) & (close > upper), SELL, DO_NOTHING))
+        signals.fillna(0, inplace=True)
+
+        self.signals = signals
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on.
+
+        """
+        return {'window': self.window, 'width': self.width}
+
+    def get_features(self):
+        """
+        Get the features the model uses.
+
+        """
+        return [('Close', FeatureStore.ROLLING_MEAN, self.window),
+                ('Close', FeatureStore.ROLLING_STD, self.window)]
+
+    def on_bar(self, date, bar):
+        """
+        Update the model with a single new candle, giving the same values update would give for it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        close = bar['Close']
+        middle = self._mean.update(close)
+        deviation = self._std.update(close) * self.width
+        lower, upper = middle - deviation, middle + deviation
+
+        if self._last_close >= self._last_lower and close < lower:
+            signal = BUY
+        elif self._last_close <= self._last_upper and close > upper:
+            signal = SELL
+        else:
+            signal = DO_NOTHING
+
+        self._last_close, self._last_lower, self._last_upper = close, lower, upper
+        row = (close, middle, lower, upper, signal)
+        # NaN values are stored as 0, as update does
+        self._record(date, tuple(0.0 if value != value else value for value in row))
+
+        return signal
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar.
+
+        """
+        super().reset_state()
+        self._mean = RollingMean(self.window)
+        self._std = RollingStd(self.window)
+        self._last_close = self._last_lower = self._last_upper = math.nan
@@ -0,0 +1,72 @@
+import math
+
+
+class ExponentialMean(object):
+    """
+    Running exponential mean, updated one value at a time.
+    It follows the same arithmetic pandas uses on ewm(com=center_of_mass, adjust=False).mean(),
+    so both give the very same numbers (see models.indicators.kernels.exponential_mean).
+
+    """
+
+    def __init__(self, center_of_mass, min_periods=0):
+        """
+        Class constructor.
+
+        @param center_of_mass: center of mass of the weights (span s is (s - 1) / 2, Wilder window n is n - 1)
+        @@type center_of_mass: float
+        @param min_periods: values needed before there is a mean
+        @@type min_periods: integer
+        """
+        self.alpha = 1. / (1. + center_of_mass)
+        self.min_periods = max(min_periods, 1)
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every value seen so far.
+
+        """
+        self._mean = None
+        self._old_weight = 1.
+        self._count = 0
+
+    def update(self, value):
+        """
+        Add a new value.
+
+        @param value: new value
+        @@type value: float
+
+        @return mean: exponential mean (NaN until min_periods values were seen)
+        @@@type mean: float
+        """
+        is_observation = value == value
+        self._count += is_observation
+
+        if self._mean is None:
+            self._mean = value
+        elif self._mean == self._mean:
+            self._old_weight *= 1. - self.alpha
+            if is_observation:
+                # Constant series stay exact
+                if self._mean != value:
+                    self._mean = self._old_weight * self._mean + self.alpha * value
+                    self._mean /= (self._old_weight + self.alpha)
+                self._old_weight = 1.
+        elif is_observation:
+            self._mean = value
+
+        return self.get_mean()
+
+    def get_mean(self):
+        """
+        Get the current mean.
+
+        @return mean: exponential mean (NaN until min_periods values were seen)
+        @@@type mean: float
+        """
+        if self._count < self.min_periods:
+            return math.nan
+
+        return self._mean
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from models.indicators.ExponentialMean import ExponentialMean
+from models.indicators import kernels
+from models.FeatureStore import FeatureStore
+from utils.constants import DO_NOTHING
+
+
+class MovingAverageConvergenceDivergence(AbstractModelIndicator):
+    """
+    Model representing a moving average convergence divergence (fast EMA minus slow EMA).
+    When the MACD line crosses above its signal line (an EMA of it), send a signal for long.
+    When it crosses below, send a signal for short.
+
+    """
+
+    def __init__(self, fast_factor=12, slow_factor=26, signal_factor=9, history_size=None):
+        """
+        Class constructor
+
+        @param fast_factor: span of the faster EMA in number of candles
+        @@type fast_factor: integer
+        @param slow_factor: span of the slower EMA in number of candles
+        @@type slow_factor: integer
+        @param signal_factor: span of the EMA of the MACD line in number of candles
+        @@type signal_factor: integer
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
+        """
+        super().__init__("Moving Average Convergence Divergence",
+                         columns=['Close', 'MACD', 'MACD signal', 'Difference', 'Signal'],
+                         history_size=history_size)
+        self.fast_factor = fast_factor
+        self.slow_factor = slow_factor
+        self.signal_factor = signal_factor
+        self.reset_state()
+
+    def update(self, data):
+        """
+        Update the data from the model.
+
+        @param data: data used to generate the signals
+        @@type data: pandas dataframe
+        """
+        fast_ema, slow_ema = (self._get_feature(data, 'Close', FeatureStore.EMA, span).to_numpy(dtype=np.float64)
+                              for span in (self.fast_factor, self.slow_factor))
+        line = fast_ema - slow_ema
+        signal_line = kernels.exponential_mean(line, (self.signal_factor - 1) / 2.0, self.signal_factor)
+        difference = (line > signal_line).astype(np.int64)
+
+        signals = pd.DataFrame(index=data.index)
+        signals['Close'] = data['Close']
+        signals['MACD'] = line
+        signals['MACD signal'] = signal_line
+        signals['Difference'] = difference
+        signals['Signal'] = np.diff(difference, prepend=difference[:1]).astype(np.float64)
+        signals.fillna(0, inplace=True)
+
+        self.signals = signals
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on.
+
+        """
+        return {'fast_factor': self.fast_factor, 'slow_factor': self.slow_factor, 'signal_factor': self.signal_factor}
+
+    def get_features(self):
+        """
+        Get the features the model uses.
+
+        """
+        return [('Close', FeatureStore.EMA, self.fast_factor), ('Close', FeatureStore.EMA, self.slow_factor)]
+
+    def on_bar(self, date, bar):
+        """
+        Update the model with a single new candle, giving the same values update would give for it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        close = bar['Close']
+        line = self._fast_ema.update(close) - self._slow_ema.update(close)
+        signal_line = self._signal_ema.update(line)
+        difference = 1 if line > signal_line else 0
+
+        if self._last_difference is None:
+            signal = DO_NOTHING
+        else:
+            signal = float(difference - self._last_difference)
+
+        self._last_difference = difference
+        row = (close, line, signal_line, difference, signal)
+        # NaN values are stored as 0, as update does
+        self._record(date, tuple(0.0 if value != value else value for value in row))
+
+        return signal
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar.
+
+        """
+        super().reset_state()
+        self._fast_ema = ExponentialMean((self.fast_factor - 1) / 2.0, self.fast_factor)
+        self._slow_ema = ExponentialMean((self.slow_factor - 1) / 2.0, self.slow_factor)
+        self._signal_ema = ExponentialMean((self.signal_factor - 1) / 2.0, self.signal_factor)
+        self._last_difference = None
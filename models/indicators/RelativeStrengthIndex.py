@@ -0,0 +1,116 @@
+import math
+import numpy as np
+import pandas as pd
+from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from models.indicators.ExponentialMean import ExponentialMean
+from models.FeatureStore import FeatureStore
+from utils.constants import BUY, SELL, DO_NOTHING
+
+
+class RelativeStrengthIndex(AbstractModelIndicator):
+    """
+    Model representing a relative strength index (with Wilder means of gains and losses).
+    When the index leaves the oversold zone upwards, send a signal for long.
+    When the index leaves the overbought zone downwards, send a signal for short.
+
+    """
+
+    def __init__(self, window=14, oversold=30, overbought=70, history_size=None):
+        """
+        Class constructor
+
+        @param window: window of the gain and loss means in number of candles
+        @@type window: integer
+        @param oversold: index under which the asset is oversold
+        @@type oversold: float
+        @param overbought: index above which the asset is overbought
+        @@type overbought: float
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
+        """
+        super().__init__("Relative Strength Index",
+                         columns=['Close', 'RSI', 'Signal'],
+                         history_size=history_size)
+        self.window = window
+        self.oversold = oversold
+        self.overbought = overbought
+        self.reset_state()
+
+    def update(self, data):
+        """
+        Update the data from the model.
+
+        @param data: data used to generate the signals
+        @@type data: pandas dataframe
+        """
+        rsi = self._get_feature(data, 'Close', FeatureStore.RSI, self.window).to_numpy(dtype=np.float64)
+        last_rsi = np.concatenate([[np.nan], rsi[:-1]])
+
+        signals = pd.DataFrame(index=data.index)
+        signals['Close'] = data['Close']
+        signals['RSI'] = rsi
+        signals['Signal'] = np.where((last_rsi <= self.oversold) & (rsi > self.oversold), BUY,
+                                     np.where((last_rsi >= self.overbought) & (rsi < self.overbought),
+                                              SELL, DO_NOTHING))
+        signals.fillna(0, inplace=True)
+
+        self.signals = signals
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on.
+
+        """
+        return {'window': self.window, 'oversold': self.oversold, 'overbought': self.overbought}
+
+    def get_features(self):
+        """
+        Get the features the model uses.
+
+        """
+        return [('Close', FeatureStore.RSI, self.window)]
+
+    def on_bar(self, date, bar):
+        """
+        Update the model with a single new candle, giving the same values update would give for it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        close = bar['Close']
+        change = math.nan if self._last_close is None else close - self._last_close
+        gain = self._gain.update(change if change > 0 else (0.0 if change == change else math.nan))
+        loss = self._loss.update(-change if -change > 0 else (0.0 if change == change else math.nan))
+        total = gain + loss
+        rsi = 50.0 if total == 0 else 100.0 * gain / total
+
+        if self._last_rsi <= self.oversold and rsi > self.oversold:
+            signal = BUY
+        elif self._last_rsi >= self.overbought and rsi < self.overbought:
+            signal = SELL
+        else:
+            signal = DO_NOTHING
+
+        self._last_close = close
+        self._last_rsi = rsi
+        row = (close, rsi, signal)
+        # NaN values are stored as 0, as update does
+        self._record(date, tuple(0.0 if value != value else value for value in row))
+
+        return signal
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar.
+
+        """
+        super().reset_state()
+        self._gain = ExponentialMean(self.window - 1.0, self.window)
+        self._loss = ExponentialMean(self.window - 1.0, self.window)
+        self._last_close = None
+        self._last_rsi = math.nan
@@ -0,0 +1,104 @@
+import math
+from collections import deque
+
+
+class RollingMean(object):
+    """
+    Running mean over the last candles, updated one value at a time.
+    It follows the same summation pandas uses on rolling(window).mean() (Kahan compensated sums
+    and exact results over repeated values), so both give the very same numbers.
+
+    """
+
+    def __init__(self, window):
+        """
+        Class constructor.
+
+        @param window: number of values in the mean
+        @@type window: integer
+        """
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every value seen so far.
+
+        """
+        self._values = deque(maxlen=self.window)
+        self._sum = 0.0
+        self._compensation_add = 0.0
+        self._compensation_remove = 0.0
+        self._count = 0
+        self._negative_count = 0
+        self._consecutive_same_value = 0
+        self._previous_value = None
+
+    def update(self, value):
+        """
+        Add a new value, removing the oldest one if the window is full.
+
+        @param value: new value
+        @@type value: float
+
+        @return mean: mean of the window (NaN while it isn't full)
+        @@@type mean: float
+        """
+        if self.window == 1:
+            self.reset()
+        elif len(self._values) == self.window:
+            self._remove(self._values[0])
+
+        self._values.append(value)
+        self._add(value)
+
+        return self.get_mean()
+
+    def get_mean(self):
+        """
+        Get the mean of the current window.
+
+        @return mean: mean of the window (NaN while it isn't full)
+        @@@type mean: float
+        """
+        if self._count < self.window or self._count == 0:
+            return math.nan
+
+        mean = self._sum / self._count
+        if self._consecutive_same_value >= self._count:
+            mean = self._previous_value
+        elif self._negative_count == 0 and mean < 0:
+            mean = 0.0
+        elif self._negative_count == self._count and mean > 0:
+            mean = 0.0
+
+        return mean
+
+    def _add(self, value):
+        if self._previous_value is None:
+            self._previous_value = value
+        # NaN values don't count
+        if value == value:
+            self._count += 1
+            y = value - self._compensation_add
+            t = self._sum + y
+            self._compensation_add = t - self._sum - y
+            self._sum = t
+            if math.copysign(1, value) < 0:
+                self._negative_count += 1
+
+            if value == self._previous_value:
+                self._consecutive_same_value += 1
+            else:
+                self._consecutive_same_value = 1
+            self._previous_value = value
+
+    def _remove(self, value):
+        if value == value:
+            self._count -= 1
+            y = - value - self._compensation_remove
+            t = self._sum + y
+            self._compensation_remove = t - self._sum - y
+            self._sum = t
+            if math.copysign(1, value) < 0:
+                self._negative_count -= 1
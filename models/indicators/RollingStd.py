@@ -0,0 +1,106 @@
+import math
+from collections import deque
+
+
+class RollingStd(object):
+    """
+    Running (population) standard deviation over the last candles, updated one value at a time.
+    It follows the same online algorithm pandas uses on rolling(window).std(ddof=0) (Welford updates with
+    Kahan compensated means, values added and removed as the window moves, exact zero over repeated values),
+    so both give the very same numbers.
+
+    """
+
+    def __init__(self, window):
+        """
+        Class constructor.
+
+        @param window: number of values in the deviation
+        @@type window: integer
+        """
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every value seen so far.
+
+        """
+        self._values = deque(maxlen=self.window)
+        self._mean = 0.0
+        self._squares = 0.0
+        self._compensation_add = 0.0
+        self._compensation_remove = 0.0
+        self._count = 0
+        self._consecutive_same_value = 0
+        self._previous_value = None
+
+    def update(self, value):
+        """
+        Add a new value, removing the oldest one if the window is full.
+
+        @param value: new value
+        @@type value: float
+
+        @return std: standard deviation of the window (NaN while it isn't full)
+        @@@type std: float
+        """
+        if self.window == 1:
+            self.reset()
+        elif len(self._values) == self.window:
+            self._remove(self._values[0])
+
+        self._values.append(value)
+        self._add(value)
+
+        return self.get_std()
+
+    def get_std(self):
+        """
+        Get the standard deviation of the current window.
+
+        @return std: standard deviation of the window (NaN while it isn't full)
+        @@@type std: float
+        """
+        if self._count < self.window or self._count == 0:
+            return math.nan
+
+        if self._count == 1 or self._consecutive_same_value >= self._count:
+            return 0.0
+
+        variance = self._squares / self._count
+
+        return math.sqrt(variance) if variance >= 0 else 0.0
+
+    def _add(self, value):
+        if self._previous_value is None:
+            self._previous_value = value
+        # NaN values don't count
+        if value == value:
+            self._count += 1
+            if value == self._previous_value:
+                self._consecutive_same_value += 1
+            else:
+                self._consecutive_same_value = 1
+            self._previous_value = value
+
+            previous_mean = self._mean - self._compensation_add
+            y = value - self._compensation_add
+            t = y - self._mean
+            self._compensation_add = t + self._mean - y
+            self._mean = self._mean + t / self._count
+            self._squares = self._squares + (value - previous_mean) * (value - self._mean)
+
+    def _remove(self, value):
+        if value == value:
+            self._count -= 1
+            if self._count:
+                previous_mean = self._mean - self._compensation_remove
+                y = value - self._compensation_remove
+                t = y - self._mean
+                self._compensation_remove = t + self._mean - y
+                self._mean = self._mean - t / self._count
+                self._squares = self._squares - (value - previous_mean) * (value - self._mean)
+            else:
+                self._mean = 0.0
+                self._squares = 0.0
@@ -1,6 +1,9 @@
 import pandas as pd
 import numpy as np
 from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from models.indicators.RollingMean import RollingMean
+from models.FeatureStore import FeatureStore
+from utils.constants import DO_NOTHING
 
 
 class SimpleMovingAverageCrossover(AbstractModelIndicator):
@@ -11,7 +14,7 @@ class SimpleMovingAverageCrossover(AbstractModelIndicator):
 
     """
 
-    def __init__(self, fast_factor=8, slow_factor=20):
+    def __init__(self, fast_factor=8, slow_factor=20, history_size=None):
         """
         Class constructor
 
@@ -19,10 +22,15 @@ class SimpleMovingAverageCrossover(AbstractModelIndicator):
         @@type fast_factor: integer
         @param slow_factor: period of the slower SMA in number of candles
         @@type slow_factor: integer
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
         """
-        super().__init__("Simple Moving Average Crossover")
+        super().__init__("Simple Moving Average Crossover",
+                         columns=['Close', 'Fast SMA', 'Slow SMA', 'Difference', 'Signal', 'Change'],
+                         history_size=history_size)
         self.fast_factor = fast_factor
         self.slow_factor = slow_factor
+        self.reset_state()
 
     def update(self, data):
         """
@@ -33,15 +41,79 @@ class SimpleMovingAverageCrossover(AbstractModelIndicator):
         """
         signals = pd.DataFrame(index=data.index)
         signals['Close'] = data['Close']
-        signals['Fast SMA'] = data['Close'].rolling(
-            window=self.fast_factor).mean()
-        signals['Slow SMA'] = data['Close'].rolling(
-            window=self.slow_factor).mean()
+        signals['Fast SMA'] = self._get_feature(data, 'Close', FeatureStore.ROLLING_MEAN, self.fast_factor)
+        signals['Slow SMA'] = self._get_feature(data, 'Close', FeatureStore.ROLLING_MEAN, self.slow_factor)
         signals['Difference'] = np.where(
             signals['Fast SMA'] > signals['Slow SMA'], 1, 0)
         signals['Signal'] = signals['Difference'].diff()
         signals['Signal'][0:self.slow_factor + 1].replace(0)
-        signals['Change'] = data['Close'].pct_change()
+        signals['Change'] = self._get_feature(data, 'Close', FeatureStore.PCT_CHANGE)
         signals.fillna(0, inplace=True)
 
         self.signals = signals
+
+    def get_features(self):
+        """
+        Get the features the model uses.
+
+        """
+        return [('Close', FeatureStore.ROLLING_MEAN, self.fast_factor),
+                ('Close', FeatureStore.ROLLING_MEAN, self.slow_factor),
+                ('Close', FeatureStore.PCT_CHANGE, None)]
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on.
+
+        """
+        return {'fast_factor': self.fast_factor, 'slow_factor': self.slow_factor}
+
+    def on_bar(self, date, bar):
+        """
+        Update the model with a single new candle, giving the same values update would give for it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        close = bar['Close']
+        fast_sma = self._fast_sma.update(close)
+        slow_sma = self._slow_sma.update(close)
+        difference = 1 if fast_sma > slow_sma else 0
+
+        if self._last_difference is None:
+            signal = DO_NOTHING
+        else:
+            signal = float(difference - self._last_difference)
+
+        # Percentage change uses the last valid close, as pct_change does
+        change = 0.0
+        if close != close:
+            close = self._last_close
+        elif self._last_close is not None:
+            change = close / self._last_close - 1
+            if change != change:
+                change = 0.0
+
+        self._last_difference = difference
+        self._last_close = close
+        row = (bar['Close'], fast_sma, slow_sma, difference, signal, change)
+        # NaN values are stored as 0, as update does
+        self._record(date, tuple(0.0 if value != value else value for value in row))
+
+        return signal
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar.
+
+        """
+        super().reset_state()
+        self._fast_sma = RollingMean(self.fast_factor)
+        self._slow_sma = RollingMean(self.slow_factor)
+        self._last_difference = None
+        self._last_close = None
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from models.indicators.RollingMean import RollingMean
+from models.FeatureStore import FeatureStore
+from utils.constants import BUY, SELL, DO_NOTHING
+
+
+class TripleMovingAverageCrossover(AbstractModelIndicator):
+    """
+    Model representing a triple moving average crossover.
+    When the SMAs line up as fast > medium > slow, send a signal for long.
+    When they line up as fast < medium < slow, send a signal for short.
+
+    """
+
+    def __init__(self, fast_factor=4, medium_factor=9, slow_factor=18, history_size=None):
+        """
+        Class constructor
+
+        @param fast_factor: period of the faster SMA in number of candles
+        @@type fast_factor: integer
+        @param medium_factor: period of the medium SMA in number of candles
+        @@type medium_factor: integer
+        @param slow_factor: period of the slower SMA in number of candles
+        @@type slow_factor: integer
+        @param history_size: number of candles kept to rebuild the signals from on_bar (None keeps all of them)
+        @@type history_size: integer
+        """
+        super().__init__("Triple Moving Average Crossover",
+                         columns=['Close', 'Fast SMA', 'Medium SMA', 'Slow SMA', 'Trend', 'Signal'],
+                         history_size=history_size)
+        self.fast_factor = fast_factor
+        self.medium_factor = medium_factor
+        self.slow_factor = slow_factor
+        self.reset_state()
+
+    def update(self, data):
+        """
+        Update the data from the model.
+
+        @param data: data used to generate the signals
+        @@type data: pandas dataframe
+        """
+        fast_sma, medium_sma, slow_sma = (
+            self._get_feature(data, 'Close', FeatureStore.ROLLING_MEAN, window).to_numpy(dtype=np.float64)
+            for window in (self.fast_factor, self.medium_factor, self.slow_factor))
+        trend = np.where((fast_sma > medium_sma) & (medium_sma > slow_sma), 1,
+                         np.where((fast_sma < medium_sma) & (medium_sma < slow_sma), -1, 0))
+        last_trend = np.concatenate([trend[:1], trend[:-1]])
+
+        signals = pd.DataFrame(index=data.index)
+        signals['Close'] = data['Close']
+        signals['Fast SMA'] = fast_sma
+        signals['Medium SMA'] = medium_sma
+        signals['Slow SMA'] = slow_sma
+        signals['Trend'] = trend
+        signals['Signal'] = np.where((trend == 1) & (last_trend != 1), BUY,
+                                     np.where((trend == -1) & (last_trend != -1), SELL, DO_NOTHING))
+        signals.fillna(0, inplace=True)
+
+        self.signals = signals
+
+    def get_parameters(self):
+        """
+        Get the parameters the signals depend on.
+
+        """
+        return {'fast_factor': self.fast_factor, 'medium_factor': self.medium_factor, 'slow_factor': self.slow_factor}
+
+    def get_features(self):
+        """
+        Get the features the model uses.
+
+        """
+        return [('Close', FeatureStore.ROLLING_MEAN, window)
+                for window in (self.fast_factor, self.medium_factor, self.slow_factor)]
+
+    def on_bar(self, date, bar):
+        """
+        Update the model with a single new candle, giving the same values update would give for it.
+
+        @param date: date of the candle
+        @@type date: pandas timestamp
+        @param bar: candle data, with at least the 'Close' price
+        @@type bar: pandas series or dict
+
+        @return signal: signal of the candle
+        @@@type signal: BUY, SELL or DO_NOTHING constant
+        """
+        close = bar['Close']
+        fast_sma = self._fast_sma.update(close)
+        medium_sma = self._medium_sma.update(close)
+        slow_sma = self._slow_sma.update(close)
+
+        if fast_sma > medium_sma > slow_sma:
+            trend = 1
+        elif fast_sma < medium_sma < slow_sma:
+            trend = -1
+        else:
+            trend = 0
+
+        last_trend = trend if self._last_trend is None else self._last_trend
+        if trend == 1 and last_trend != 1:
+            signal = BUY
+        elif trend == -1 and last_trend != -1:
+            signal = SELL
+        else:
+            signal = DO_NOTHING
+
+        self._last_trend = trend
+        row = (close, fast_sma, medium_sma, slow_sma, trend, signal)
+        # NaN values are stored as 0, as update does
+        self._record(date, tuple(0.0 if value != value else value for value in row))
+
+        return signal
+
+    def reset_state(self):
+        """
+        Forget every candle received by on_bar.
+
+        """
+        super().reset_state()
+        self._fast_sma = RollingMean(self.fast_factor)
+        self._medium_sma = RollingMean(self.medium_factor)
+        self._slow_sma = RollingMean(self.slow_factor)
+        self._last_trend = None
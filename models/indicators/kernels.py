@@ -0,0 +1,231 @@
+"""
+Indicator kernels for many window lengths: each one takes a whole series and a list of windows, and gives
+one row per window. The rows come from one compiled pandas pass per window (per distinct window, for
+exponential means), stacked into a single array: the windows aren't computed together, the kernels only
+spare the callers a loop. The signal lines of MACD share their span, so they do go through a single pass.
+
+Rolling statistics are the compiled rolling windows of pandas, which add and remove values as the window
+moves (Kahan compensated sums for means, Welford updates for deviations): the error doesn't grow with the
+length of the series and a missing value (NaN) only leaves out the windows holding it. Exponential means
+follow pandas ewm(adjust=False) exactly, one compiled pass per distinct span. The incremental classes
+(RollingMean, RollingStd and ExponentialMean) do the very same arithmetic one value at a time, so the
+models give the same numbers on update and on_bar.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _to_windows(windows):
+    return np.atleast_1d(np.asarray(windows, dtype=np.int64))
+
+
+def _rolling(values, windows, statistic):
+    """
+    A rolling statistic of the values for each window (NaN while the window isn't full), one pandas
+    rolling pass per window.
+
+    """
+    rolling_values = pd.Series(values, dtype=np.float64)
+
+    return np.vstack([statistic(rolling_values.rolling(window=int(window))).to_numpy()
+                      for window in _to_windows(windows)])
+
+
+def rolling_mean(values, windows):
+    """
+    Simple moving averages.
+
+    @param values: series values
+    @@type values: numpy array
+    @param windows: number of values of each mean
+    @@type windows: integer or list of integers
+
+    @return means: one row per window (NaN while the window isn't full)
+    @@@type means: 2-D numpy array
+    """
+    return _rolling(values, windows, lambda window: window.mean())
+
+
+def rolling_std(values, windows):
+    """
+    Moving (population) standard deviations.
+
+    @param values: series values
+    @@type values: numpy array
+    @param windows: number of values of each deviation
+    @@type windows: integer or list of integers
+
+    @return deviations: one row per window (NaN while the window isn't full)
+    @@@type deviations: 2-D numpy array
+    """
+    return _rolling(values, windows, lambda window: window.std(ddof=0))
+
+
+def exponential_mean(values, center_of_mass, min_periods):
+    """
+    Exponential mean of a single series, as pandas ewm(com=center_of_mass, adjust=False) computes it.
+
+    @param values: series values
+    @@type values: numpy array
+    @param center_of_mass: center of mass of the weights
+    @@type center_of_mass: float
+    @param min_periods: values needed before there is a mean
+    @@type min_periods: integer
+
+    @return mean: exponential mean of each value
+    @@@type mean: numpy array
+    """
+    return pd.Series(values, dtype=np.float64).ewm(com=center_of_mass, adjust=False,
+                                                   min_periods=min_periods).mean().to_numpy()
+
+
+def ema(values, spans):
+    """
+    Exponential moving averages, with weights decaying as 2 / (span + 1).
+
+    @param values: series values
+    @@type values: numpy array
+    @param spans: span of each mean
+    @@type spans: integer or list of integers
+
+    @return means: one row per span (NaN until span values were seen)
+    @@@type means: 2-D numpy array
+    """
+    spans = _to_windows(spans)
+    # Each distinct span is only computed once
+    distinct, positions = np.unique(spans, return_inverse=True)
+    means = np.vstack([exponential_mean(values, (span - 1) / 2.0, span) for span in distinct.tolist()])
+
+    return means[positions]
+
+
+def wilder_mean(values, windows):
+    """
+    Wilder smoothing (exponential mean with weights decaying as 1 / window), used by RSI and ATR.
+
+    @param values: series values
+    @@type values: numpy array
+    @param windows: window of each mean
+    @@type windows: integer or list of integers
+
+    @return means: one row per window (NaN until window values were seen)
+    @@@type means: 2-D numpy array
+    """
+    # Each distinct window is only computed once
+    distinct, positions = np.unique(_to_windows(windows), return_inverse=True)
+    means = np.vstack([exponential_mean(values, window - 1.0, window) for window in distinct.tolist()])
+
+    return means[positions]
+
+
+def rsi_from_means(gain, loss):
+    """
+    Relative strength index from the mean gain and loss (50 when the price didn't move at all).
+
+    """
+    total = gain + loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total == 0, 50.0, 100.0 * gain / total)
+
+
+def rsi(close, windows):
+    """
+    Relative strength indexes, from Wilder means of gains and losses.
+
+    @param close: close prices
+    @@type close: numpy array
+    @param windows: window of each index
+    @@type windows: integer or list of integers
+
+    @return indexes: one row per window, between 0 and 100
+    @@@type indexes: 2-D numpy array
+    """
+    close = np.asarray(close, dtype=np.float64)
+    change = np.concatenate([[np.nan], np.diff(close)])
+    gain, loss = np.maximum(change, 0.0), np.maximum(-change, 0.0)
+
+    return rsi_from_means(wilder_mean(gain, windows), wilder_mean(loss, windows))
+
+
+def macd(close, fast_spans, slow_spans, signal_span=9):
+    """
+    Moving average convergence divergence lines and their signal lines.
+
+    @param close: close prices
+    @@type close: numpy array
+    @param fast_spans: span of the fast mean of each line
+    @@type fast_spans: integer or list of integers
+    @param slow_spans: span of the slow mean of each line (as many as the fast spans)
+    @@type slow_spans: integer or list of integers
+    @param signal_span: span of the mean of the lines
+    @@type signal_span: integer
+
+    @return lines: one row per pair of spans
+    @@@type lines: 2-D numpy array
+    @return signal_lines: one row per pair of spans
+    @@@type signal_lines: 2-D numpy array
+    """
+    fast_spans, slow_spans = _to_windows(fast_spans), _to_windows(slow_spans)
+    if len(fast_spans) != len(slow_spans):
+        raise ValueError("There must be as many fast spans as slow spans.")
+
+    # Each distinct span is only computed once
+    means = ema(close, np.concatenate([fast_spans, slow_spans]))
+    lines = means[:len(fast_spans)] - means[len(fast_spans):]
+    # Every line has the same signal span, so their means are computed together (one column per line)
+    signal_lines = pd.DataFrame(lines.T).ewm(com=(signal_span - 1) / 2.0, adjust=False,
+                                             min_periods=signal_span).mean().to_numpy().T
+
+    return lines, signal_lines
+
+
+def bollinger(close, windows, widths=2.0):
+    """
+    Bollinger bands: moving average plus and minus a number of standard deviations.
+
+    @param close: close prices
+    @@type close: numpy array
+    @param windows: window of each band
+    @@type windows: integer or list of integers
+    @param widths: number of standard deviations of each band (one for all of them or one per window)
+    @@type widths: float or list of floats
+
+    @return middle, lower, upper: one row per window
+    @@@type middle, lower, upper: 2-D numpy arrays
+    """
+    middle = rolling_mean(close, windows)
+    deviation = rolling_std(close, windows) * np.broadcast_to(np.asarray(widths, dtype=np.float64),
+                                                              (len(middle),))[:, None]
+
+    return middle, middle - deviation, middle + deviation
+
+
+def true_range(high, low, close):
+    """
+    Largest of the candle range and the gaps from the previous close (the range on the first candle).
+
+    """
+    high, low, close = (np.asarray(values, dtype=np.float64) for values in (high, low, close))
+    previous_close = np.concatenate([[np.nan], close[:-1]])
+    ranges = np.fmax(np.fmax(high - low, np.abs(high - previous_close)), np.abs(low - previous_close))
+
+    return ranges
+
+
+def atr(high, low, close, windows):
+    """
+    Average true ranges, Wilder means of the true range.
+
+    @param high: high prices
+    @@type high: numpy array
+    @param low: low prices
+    @@type low: numpy array
+    @param close: close prices
+    @@type close: numpy array
+    @param windows: window of each average
+    @@type windows: integer or list of integers
+
+    @return averages: one row per window
+    @@@type averages: 2-D numpy array
+    """
+    return wilder_mean(true_range(high, low, close), windows)
@@ -0,0 +1,102 @@
+import heapq
+
+
+class OperationBook(object):
+    """
+    Book of the open operations, indexed by the prices that close them.
+    Operations closing above a price (long take profits and short stop losses) are kept in a min-heap,
+    and the ones closing below a price (long stop losses and short take profits) in a max-heap, so each
+    candle only touches the operations it actually closes.
+
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        """
+        self._open = {}
+        self._upper = []
+        self._lower = []
+
+    def add(self, operation_id, lower_price, upper_price):
+        """
+        Add an open operation.
+
+        @param operation_id: operation id
+        @@type operation_id: integer
+        @param lower_price: the operation closes when the price goes below it
+        @@type lower_price: float
+        @param upper_price: the operation closes when the price goes above it
+        @@type upper_price: float
+        """
+        self._open[operation_id] = (lower_price, upper_price)
+        # NaN prices never close the operation
+        if upper_price == upper_price:
+            heapq.heappush(self._upper, (upper_price, operation_id))
+        if lower_price == lower_price:
+            heapq.heappush(self._lower, (-lower_price, operation_id))
+
+    def discard(self, operation_id):
+        """
+        Remove an operation from the book, if it is there.
+
+        @param operation_id: operation id
+        @@type operation_id: integer
+        """
+        if self._open.pop(operation_id, None) is not None:
+            self._compact()
+
+    def pop_triggered(self, high_price, low_price=None):
+        """
+        Remove and return the operations closed by a candle.
+
+        @param high_price: highest price of the candle
+        @@type high_price: float
+        @param low_price: lowest price of the candle (the high price is used if None)
+        @@type low_price: float
+
+        @return operation_ids: ids of the closed operations, in increasing order
+        @@@type operation_ids: list of integers
+        """
+        if low_price is None:
+            low_price = high_price
+
+        triggered = set()
+        while self._upper and self._upper[0][0] < high_price:
+            _, operation_id = heapq.heappop(self._upper)
+            if operation_id in self._open:
+                triggered.add(operation_id)
+        while self._lower and -self._lower[0][0] > low_price:
+            _, operation_id = heapq.heappop(self._lower)
+            if operation_id in self._open:
+                triggered.add(operation_id)
+
+        for operation_id in triggered:
+            del self._open[operation_id]
+        self._compact()
+
+        return sorted(triggered)
+
+    def get_open_ids(self):
+        """
+        Get the ids of the open operations.
+
+        @return operation_ids: ids of the open operations, in the order they were added
+        @@@type operation_ids: list of integers
+        """
+        return list(self._open)
+
+    def __len__(self):
+        return len(self._open)
+
+    def _compact(self):
+        """
+        Drop closed operations left on the heaps once they outnumber the open ones.
+
+        """
+        if len(self._upper) + len(self._lower) > 4 * len(self._open) + 64:
+            self._upper = [item for item in self._upper if item[1] in self._open]
+            self._lower = [item for item in self._lower if item[1] in self._open]
+            heapq.heapify(self._upper)
+            heapq.heapify(self._lower)
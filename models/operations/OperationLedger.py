@@ -0,0 +1,311 @@
+import numpy as np
+import pandas as pd
+from utils.constants import BUY
+
+
+class OperationLedger(object):
+    """
+    Columnar ledger of operations: one NumPy array per field and one row per operation.
+    Operations are only turned into the human-readable history when it is requested (at log time).
+
+    """
+
+    COLUMNS = {
+        'entry_index': np.int64,
+        'exit_index': np.int64,
+        'entry_date': np.int64,
+        'exit_date': np.int64,
+        'entry_price': np.float64,
+        'exit_price': np.float64,
+        'position': np.int8,
+        'asset': np.int32,
+        'invested_value': np.float64,
+        'profit': np.float64
+    }
+
+    def __init__(self, capacity=64):
+        """
+        Class constructor.
+
+        @param capacity: initial number of rows (it grows when needed)
+        @@type capacity: integer
+        """
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self._closed_order = np.zeros(capacity, dtype=np.int64)
+        self._length = 0
+        self._closed_length = 0
+        self._timezone = None
+
+    @staticmethod
+    def trigger_prices(entry_prices, positions, take_profit, stop_loss):
+        """
+        Get the prices that end operations (by take profit or stop loss).
+
+        @param entry_prices: prices the operations went in on
+        @@type entry_prices: float or numpy array
+        @param positions: positions the operations run on
+        @@type positions: BUY or SELL constant, or numpy array of them
+        @param take_profit: profit stop constant
+        @@type take_profit: float (is percentage)
+        @param stop_loss: loss stop constant
+        @@type stop_loss: float (is percentage)
+
+        @return lower_prices: the operations end when the price goes below them
+        @@@type lower_prices: float or numpy array
+        @return upper_prices: the operations end when the price goes above them
+        @@@type upper_prices: float or numpy array
+        """
+        buy = np.asarray(positions) == BUY
+        lower_prices = np.where(buy, (1 - stop_loss) * entry_prices, (1 - take_profit) * entry_prices)
+        upper_prices = np.where(buy, (1 + take_profit) * entry_prices, (1 + stop_loss) * entry_prices)
+
+        return lower_prices, upper_prices
+
+    @staticmethod
+    def fill_prices(positions, lower_prices, upper_prices, open_prices, high_prices, low_prices):
+        """
+        Get the prices operations are closed at, on the candle whose range crossed their endpoints.
+        A candle opening beyond an endpoint (a gap) fills at the open price. Otherwise the crossed endpoint
+        fills at its own price and, if the range crossed both of them, the stop loss is assumed to come first.
+
+        @param positions: positions the operations run on
+        @@type positions: BUY or SELL constant, or numpy array of them
+        @param lower_prices: lower endpoints of the operations (see trigger_prices)
+        @@type lower_prices: float or numpy array
+        @param upper_prices: upper endpoints of the operations (see trigger_prices)
+        @@type upper_prices: float or numpy array
+        @param open_prices: open price of the candle each operation is closed on
+        @@type open_prices: float or numpy array
+        @param high_prices: high price of the candle each operation is closed on
+        @@type high_prices: float or numpy array
+        @param low_prices: low price of the candle each operation is closed on
+        @@type low_prices: float or numpy array
+
+        @return prices: fill price of each operation
+        @@@type prices: float or numpy array
+        """
+        buy = np.asarray(positions) == BUY
+        gap = (open_prices < lower_prices) | (open_prices > upper_prices)
+        lower_crossed = low_prices < lower_prices
+        upper_crossed = high_prices > upper_prices
+        # The stop loss is the lower endpoint of long operations and the upper one of short operations
+        lower_first = np.where(buy, lower_crossed, np.logical_not(upper_crossed))
+
+        return np.where(gap, open_prices, np.where(lower_first, lower_prices, upper_prices))
+
+    def open(self, index, date, price, position, invested_value, asset=0):
+        """
+        Register a new operation.
+
+        @param index: index of the candle the operation went in on
+        @@type index: integer
+        @param date: date of the candle the operation went in on
+        @@type date: pandas timestamp
+        @param price: close price the operation went in on
+        @@type price: float
+        @param position: position the operation should run on
+        @@type position: BUY or SELL constant
+        @param invested_value: invested value on the operation
+        @@type invested_value: float
+        @param asset: asset the operation runs on
+        @@type asset: integer
+
+        @return operation_id: id of the new operation
+        @@@type operation_id: integer
+        """
+        if self._length == len(self._closed_order):
+            self._grow()
+
+        operation_id = self._length
+        columns = self._columns
+        columns['entry_index'][operation_id] = index
+        columns['exit_index'][operation_id] = -1
+        columns['entry_date'][operation_id] = self._to_nanoseconds(date)
+        columns['entry_price'][operation_id] = price
+        columns['exit_price'][operation_id] = price
+        columns['position'][operation_id] = position
+        columns['invested_value'][operation_id] = invested_value
+        columns['asset'][operation_id] = asset
+        self._length += 1
+
+        return operation_id
+
+    def close(self, operation_id, index, date, price):
+        """
+        Close an operation.
+
+        @param operation_id: id of the operation
+        @@type operation_id: integer
+        @param index: index of the candle the operation was closed on
+        @@type index: integer
+        @param date: date of the candle the operation was closed on
+        @@type date: pandas timestamp
+        @param price: price the operation was closed on
+        @@type price: float
+
+        @return invested_value: invested value on the operation
+        @@@type invested_value: float
+        @return profit: operation profit
+        @@@type profit: float
+        """
+        columns = self._columns
+        invested_value = columns['invested_value'][operation_id]
+        entry_price = columns['entry_price'][operation_id]
+        profit = invested_value * columns['position'][operation_id] * (price - entry_price) / entry_price
+
+        columns['exit_index'][operation_id] = index
+        columns['exit_date'][operation_id] = self._to_nanoseconds(date)
+        columns['exit_price'][operation_id] = price
+        columns['profit'][operation_id] = profit
+        self._closed_order[self._closed_length] = operation_id
+        self._closed_length += 1
+
+        return invested_value, profit
+
+    def get_column(self, name):
+        """
+        Get the values of a column for all the operations.
+
+        @param name: column name (one of OperationLedger.COLUMNS)
+        @@type name: string
+
+        @return values: values of the column, indexed by operation id
+        @@@type values: numpy array
+        """
+        return self._columns[name][:self._length]
+
+    def get_closed_ids(self):
+        """
+        Get the ids of the closed operations.
+
+        @return operation_ids: ids of the closed operations, in the order they were closed
+        @@@type operation_ids: numpy array of integers
+        """
+        return self._closed_order[:self._closed_length]
+
+    def get_successful(self):
+        """
+        Check which operations went in the right direction.
+
+        @return successful: whether each operation (by id) was successful
+        @@@type successful: numpy array of booleans
+        """
+        return (self.get_column('exit_price') - self.get_column('entry_price')) * self.get_column('position') > 0
+
+    def get_equity_curve(self, close_prices, initial_balance, first_index=0):
+        """
+        Mark the operations to market on every candle: the initial balance plus the profit of the closed
+        operations plus what the active ones would make if closed on the candle close price.
+        Operations are added to difference arrays on the candles they go in and out, so the whole curve
+        comes from cumulative sums. It can be computed a range of candles at a time: operations from
+        before the range start on its first candle.
+
+        @param close_prices: close price of each candle, one column per asset when there are many
+        @@type close_prices: numpy array (1-D or 2-D)
+        @param initial_balance: balance before the first operation
+        @@type initial_balance: float
+        @param first_index: index of the first candle of close_prices
+        @@type first_index: integer
+
+        @return equity: equity on each candle
+        @@@type equity: numpy array
+        @return exposed: number of operations active on each candle
+        @@@type exposed: numpy array of integers
+        """
+        close_prices = np.asarray(close_prices, dtype=np.float64)
+        if close_prices.ndim == 1:
+            close_prices = close_prices[:, None]
+        total_candles, total_assets = close_prices.shape
+
+        # Candles before the range go to its first one, and after it (or never) to the end
+        entries = np.clip(self.get_column('entry_index') - first_index, 0, total_candles)
+        exits = self.get_column('exit_index')
+        exits = np.where(exits < 0, total_candles, np.clip(exits - first_index, 0, total_candles))
+        closed_ids = self.get_closed_ids()
+        realized = np.bincount(exits[closed_ids], self.get_column('profit')[closed_ids], total_candles + 1)
+
+        # Only the operations active on some candle of the range are marked to market
+        live = np.flatnonzero(exits > entries)
+        entries, exits, assets = entries[live], exits[live], self.get_column('asset')[live]
+        invested = self.get_column('invested_value')[live] * self.get_column('position')[live]
+
+        # Active operations are worth close * invested / entry - invested, summed per asset
+        shares = np.zeros((total_candles + 1, total_assets))
+        np.add.at(shares, (entries, assets), invested / self.get_column('entry_price')[live])
+        np.subtract.at(shares, (exits, assets), invested / self.get_column('entry_price')[live])
+        costs = np.bincount(entries, invested, total_candles + 1) - np.bincount(exits, invested, total_candles + 1)
+        active = np.bincount(entries, minlength=total_candles + 1) - np.bincount(exits, minlength=total_candles + 1)
+
+        unrealized = (np.cumsum(shares, axis=0)[:total_candles] * close_prices).sum(axis=1) \
+            - np.cumsum(costs)[:total_candles]
+        equity = initial_balance + np.cumsum(realized)[:total_candles] + unrealized
+
+        return equity, np.cumsum(active)[:total_candles]
+
+    def to_history(self, asset_names=None):
+        """
+        Format the closed operations.
+
+        @param asset_names: name of each asset, added to the history if given
+        @@type asset_names: list of strings
+
+        @return history: one dict per closed operation, in the order they were closed
+        @@@type history: list of dicts
+        """
+        return [self.get_record(operation_id, asset_names) for operation_id in self.get_closed_ids().tolist()]
+
+    def get_record(self, operation_id, asset_names=None):
+        """
+        Format a closed operation.
+
+        @param operation_id: id of the operation
+        @@type operation_id: integer
+        @param asset_names: name of each asset, added to the record if given
+        @@type asset_names: list of strings
+
+        @return record: operation data, as it goes into the history
+        @@@type record: dict
+        """
+        columns = self._columns
+        entry_price = columns['entry_price'][operation_id]
+        exit_price = columns['exit_price'][operation_id]
+        position = columns['position'][operation_id]
+        profit_percentage = position * (exit_price - entry_price) / entry_price
+
+        record = {
+            'Operation id': operation_id,
+            'Result': 'Success' if (exit_price - entry_price) * position > 0 else 'Fail',
+            'Entered as': 'BUY' if position == BUY else 'SELL',
+            'Profit (R$)': round(columns['profit'][operation_id], 2),
+            'Profit (%)': f'{(profit_percentage * 100).round(2)} %',
+            'Invested value (R$)': columns['invested_value'][operation_id],
+            'Initial close price (R$)': entry_price,
+            'Final close price (R$)': exit_price,
+            'Initial date': self._format_date(columns['entry_date'][operation_id]),
+            'Final date': self._format_date(columns['exit_date'][operation_id])
+        }
+        if asset_names is not None:
+            record['Symbol'] = asset_names[columns['asset'][operation_id]]
+
+        return record
+
+    def __len__(self):
+        return self._length
+
+    def _grow(self):
+        """
+        Double the capacity of every column.
+
+        """
+        capacity = max(2 * len(self._closed_order), 1)
+        for name, values in self._columns.items():
+            self._columns[name] = np.resize(values, capacity)
+        self._closed_order = np.resize(self._closed_order, capacity)
+
+    def _to_nanoseconds(self, date):
+        timestamp = pd.Timestamp(date)
+        self._timezone = timestamp.tz
+        return timestamp.value
+
+    def _format_date(self, nanoseconds):
+        return str(pd.Timestamp(nanoseconds, tz=self._timezone))
@@ -0,0 +1,91 @@
+class AbstractDataProvider(object):
+    """
+    This class represents an abstract source of market data.
+
+    """
+
+    def __init__(self, provider_name="Abstract Provider"):
+        """
+        Class constructor.
+
+        @param provider_name: provider name
+        @@type provider_name: string
+        """
+        self._provider_name = provider_name
+
+    def get_description(self):
+        """
+        Describe what the data depends on, like the provider settings (used to key stored results).
+
+        @return description: provider name and settings
+        @@@type description: dict
+        """
+        return {
+            'Provider': self._provider_name,
+            **{name: value for name, value in vars(self).items()
+               if not name.startswith('_') and isinstance(value, (str, int, float, bool, tuple, type(None)))}
+        }
+
+    def get_data_version(self, symbol, interval='1d'):
+        """
+        Identify the current contents of the data of a symbol, for providers whose data can change while
+        their settings don't (used to key stored results).
+
+        @param symbol: symbol of the data
+        @@type symbol: string
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return version: what changes with the data (None if the provider can't tell)
+        @@@type version: dict
+        """
+        return None
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        """
+        Get the candles of a symbol.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        raise NotImplementedError(
+            "This method is abstract and must be implemented in derived classes.")
+
+    def get_chunks(self, symbol, initial_date, final_date, interval='1d', chunk_size=100000):
+        """
+        Get the candles of a symbol in blocks. Providers that can read from disk bit by bit override it,
+        so the whole range is never in memory; by default the range is fetched at once and then split.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param chunk_size: number of candles of each block
+        @@type chunk_size: integer
+
+        @return chunks: candles indexed by date, block by block
+        @@@type chunks: generator of pandas dataframes
+        """
+        data = self.get_data(symbol, initial_date, final_date, interval)
+        for begin in range(0, len(data), chunk_size):
+            yield data.iloc[begin:begin + chunk_size]
+
+    def get_name(self):
+        """
+        Get provider name.
+
+        """
+        return self._provider_name
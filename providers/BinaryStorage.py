@@ -0,0 +1,151 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+class BinaryStorage(object):
+    """
+    Columnar storage of candles on disk: one typed .npy file per column plus one for the dates,
+    memory-mapped when read, so only the requested range is actually loaded.
+
+    """
+
+    INDEX_FILE = 'index.npy'
+    META_FILE = 'meta.json'
+
+    def __init__(self, path):
+        """
+        Class constructor.
+
+        @param path: directory of the files
+        @@type path: string
+        """
+        self.path = path
+
+    def exists(self):
+        """
+        Check if there is data stored.
+
+        """
+        return os.path.isfile(os.path.join(self.path, self.META_FILE))
+
+    def write(self, data):
+        """
+        Store the candles, replacing anything stored before.
+
+        @param data: candles indexed by date
+        @@type data: pandas dataframe
+        """
+        os.makedirs(self.path, exist_ok=True)
+        index = pd.DatetimeIndex(data.index)
+        meta = {
+            'columns': [],
+            'index_name': data.index.name,
+            'timezone': str(index.tz) if index.tz is not None else None
+        }
+
+        np.save(os.path.join(self.path, self.INDEX_FILE), index.asi8)
+        for number, column in enumerate(data.columns):
+            values = data[column].to_numpy()
+            if values.dtype == object:
+                raise ValueError(f"Column '{column}' can't be stored as binary data.")
+            file_name = f'{number}.npy'
+            np.save(os.path.join(self.path, file_name), values)
+            meta['columns'].append({'name': column, 'file': file_name})
+
+        # Meta file goes last, so a storage is only valid once everything was written
+        with open(os.path.join(self.path, self.META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+    def read(self, initial_date=None, final_date=None):
+        """
+        Read the candles from a date range.
+
+        @param initial_date: first date (inclusive, None for the beginning)
+        @@type initial_date: datetime string or pandas timestamp
+        @param final_date: last date (exclusive, None for the end)
+        @@type final_date: datetime string or pandas timestamp
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        meta, dates, columns = self._open()
+        begin, end = self.get_bounds(dates, initial_date, final_date, meta['timezone'])
+
+        return self._slice(meta, dates, columns, begin, end)
+
+    def read_chunks(self, chunk_size, initial_date=None, final_date=None):
+        """
+        Read the candles from a date range in blocks, so only one block is in memory at a time.
+
+        @param chunk_size: number of candles of each block
+        @@type chunk_size: integer
+        @param initial_date: first date (inclusive, None for the beginning)
+        @@type initial_date: datetime string or pandas timestamp
+        @param final_date: last date (exclusive, None for the end)
+        @@type final_date: datetime string or pandas timestamp
+
+        @return chunks: candles indexed by date, block by block
+        @@@type chunks: generator of pandas dataframes
+        """
+        meta, dates, columns = self._open()
+        begin, end = self.get_bounds(dates, initial_date, final_date, meta['timezone'])
+
+        for chunk_begin in range(begin, end, chunk_size):
+            yield self._slice(meta, dates, columns, chunk_begin, min(chunk_begin + chunk_size, end))
+
+    def _open(self):
+        """
+        Memory-map the stored files.
+
+        @return meta, dates, columns: meta data, dates in nanoseconds and values of each column
+        @@@type meta, dates, columns: dict, numpy memmap and dict of numpy memmaps
+        """
+        with open(os.path.join(self.path, self.META_FILE)) as f:
+            meta = json.load(f)
+
+        dates = np.load(os.path.join(self.path, self.INDEX_FILE), mmap_mode='r')
+        columns = {column['name']: np.load(os.path.join(self.path, column['file']), mmap_mode='r')
+                   for column in meta['columns']}
+
+        return meta, dates, columns
+
+    def _slice(self, meta, dates, columns, begin, end):
+        """
+        Load the candles between two positions.
+
+        """
+        index = pd.DatetimeIndex(np.asarray(dates[begin:end]).view('datetime64[ns]'), name=meta['index_name'])
+        if meta['timezone'] is not None:
+            index = index.tz_localize('UTC').tz_convert(meta['timezone'])
+
+        return pd.DataFrame({name: np.asarray(values[begin:end]) for name, values in columns.items()}, index=index)
+
+    @staticmethod
+    def get_bounds(dates, initial_date, final_date, timezone=None):
+        """
+        Find the positions of a date range on sorted dates.
+
+        @param dates: sorted dates in nanoseconds
+        @@type dates: numpy array of int64
+        @param initial_date: first date (inclusive, None for the beginning)
+        @@type initial_date: datetime string or pandas timestamp
+        @param final_date: last date (exclusive, None for the end)
+        @@type final_date: datetime string or pandas timestamp
+        @param timezone: timezone naive dates are in
+        @@type timezone: string
+
+        @return begin, end: positions of the first date and after the last date
+        @@@type begin, end: integers
+        """
+        def to_nanoseconds(date):
+            timestamp = pd.Timestamp(date)
+            if timezone is not None and timestamp.tz is None:
+                timestamp = timestamp.tz_localize(timezone)
+            return timestamp.value
+
+        begin = 0 if initial_date is None else int(np.searchsorted(dates, to_nanoseconds(initial_date), side='left'))
+        end = len(dates) if final_date is None else int(np.searchsorted(dates, to_nanoseconds(final_date), side='left'))
+
+        return begin, max(begin, end)
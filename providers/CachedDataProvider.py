@@ -0,0 +1,171 @@
+import json
+import os
+import pandas as pd
+from providers.AbstractDataProvider import AbstractDataProvider
+from providers.BinaryStorage import BinaryStorage
+
+
+class CachedDataProvider(AbstractDataProvider):
+    """
+    Keeps a local binary cache of the data given by another provider.
+    The cache stores, for each symbol and interval, the date ranges already fetched, so a request
+    only fetches the dates that are still missing and merges them with what is stored.
+
+    """
+
+    COVERAGE_FILE = 'coverage.json'
+
+    def __init__(self, provider, path='cache'):
+        """
+        Class constructor.
+
+        @param provider: provider used to fetch data missing on the cache
+        @@type provider: class derived from providers.AbstractDataProvider class
+        @param path: directory of the cache
+        @@type path: string
+        """
+        super().__init__(f"Cached {provider.get_name()}")
+        self.provider = provider
+        self.path = path
+
+    def get_description(self):
+        """
+        Describe what the data depends on. The cache holds the data of its provider, so it is the same.
+
+        """
+        return self.provider.get_description()
+
+    def get_data_version(self, symbol, interval='1d'):
+        """
+        Identify the current contents of the data of a symbol, as its provider does.
+
+        """
+        return self.provider.get_data_version(symbol, interval)
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        """
+        Get the candles of a symbol, fetching only what isn't cached yet.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        storage, uncached = self._fill(symbol, initial_date, final_date, interval)
+        if storage is None:
+            return uncached
+
+        return storage.read(initial_date, final_date)
+
+    def get_chunks(self, symbol, initial_date, final_date, interval='1d', chunk_size=100000):
+        """
+        Get the candles of a symbol in blocks, fetching only what isn't cached yet.
+        The blocks are read from the cache one by one.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param chunk_size: number of candles of each block
+        @@type chunk_size: integer
+
+        @return chunks: candles indexed by date, block by block
+        @@@type chunks: generator of pandas dataframes
+        """
+        storage, uncached = self._fill(symbol, initial_date, final_date, interval)
+        if storage is None:
+            yield from (uncached.iloc[begin:begin + chunk_size] for begin in range(0, len(uncached), chunk_size))
+            return
+
+        yield from storage.read_chunks(chunk_size, initial_date, final_date)
+
+    def _fill(self, symbol, initial_date, final_date, interval):
+        """
+        Fetch the dates of a range that aren't cached yet and add them to the cache.
+
+        @return storage: storage of the cache (None if nothing could be cached)
+        @@@type storage: providers.BinaryStorage
+        @return uncached: data fetched, only when nothing could be cached
+        @@@type uncached: pandas dataframe
+        """
+        directory = os.path.join(self.path, symbol, interval)
+        storage = BinaryStorage(directory)
+        coverage = self._read_coverage(directory) if storage.exists() else []
+
+        initial_date, final_date = pd.Timestamp(initial_date), pd.Timestamp(final_date)
+        missing = self._get_missing_ranges(coverage, initial_date, final_date)
+
+        if missing:
+            fetched = [self.provider.get_data(symbol, begin, end, interval) for begin, end in missing]
+            frames = [frame for frame in fetched if len(frame)]
+            if not frames and not storage.exists():
+                # Nothing to cache
+                return None, fetched[0]
+            if storage.exists():
+                frames.insert(0, storage.read())
+            data = pd.concat(frames)
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            storage.write(data)
+
+            # Don't mark dates that haven't happened yet as fetched
+            today = pd.Timestamp.today().normalize()
+            for begin, end in missing:
+                if begin < today:
+                    coverage.append((begin, min(end, today)))
+            self._write_coverage(directory, self._merge_ranges(coverage))
+
+        return storage, None
+
+    def _get_missing_ranges(self, coverage, initial_date, final_date):
+        """
+        Subtract the covered ranges from a range.
+
+        @return missing: ranges (begin inclusive, end exclusive) still missing
+        @@@type missing: list of tuples of timestamps
+        """
+        missing = []
+        cursor = initial_date
+        for begin, end in self._merge_ranges(coverage):
+            if end <= cursor:
+                continue
+            if begin >= final_date:
+                break
+            if begin > cursor:
+                missing.append((cursor, begin))
+            cursor = max(cursor, end)
+        if cursor < final_date:
+            missing.append((cursor, final_date))
+
+        return missing
+
+    def _merge_ranges(self, ranges):
+        merged = []
+        for begin, end in sorted(ranges):
+            if merged and begin <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((begin, end))
+
+        return merged
+
+    def _read_coverage(self, directory):
+        path = os.path.join(directory, self.COVERAGE_FILE)
+        if not os.path.isfile(path):
+            return []
+        with open(path) as f:
+            return [(pd.Timestamp(begin), pd.Timestamp(end)) for begin, end in json.load(f)]
+
+    def _write_coverage(self, directory, coverage):
+        with open(os.path.join(directory, self.COVERAGE_FILE), 'w') as f:
+            json.dump([(str(begin), str(end)) for begin, end in coverage], f)
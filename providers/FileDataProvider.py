@@ -0,0 +1,139 @@
+import os
+import pandas as pd
+from providers.AbstractDataProvider import AbstractDataProvider
+from providers.BinaryStorage import BinaryStorage
+
+
+class FileDataProvider(AbstractDataProvider):
+    """
+    Gets data from local files, without any network access.
+    Each symbol and interval is either a CSV file or a binary directory (see BinaryStorage)
+    named after file_name.
+
+    """
+
+    CSV = 'csv'
+    BINARY = 'binary'
+
+    def __init__(self, path, file_format=CSV, file_name='{symbol}_{interval}'):
+        """
+        Class constructor.
+
+        @param path: directory of the files
+        @@type path: string
+        @param file_format: format of the files
+        @@type file_format: FileDataProvider.CSV or FileDataProvider.BINARY
+        @param file_name: name of the file (without extension), formatted with the symbol and the interval
+        @@type file_name: string
+        """
+        super().__init__("File")
+
+        if file_format not in [self.CSV, self.BINARY]:
+            raise ValueError(f"Unknown file format '{file_format}'.")
+
+        self.path = path
+        self.file_format = file_format
+        self.file_name = file_name
+
+    def get_data_version(self, symbol, interval='1d'):
+        """
+        Identify the current contents of the file of a symbol by its size and modification time.
+
+        @param symbol: symbol of the data
+        @@type symbol: string
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return version: size in bytes and last modification time in nanoseconds (None if there is no file)
+        @@@type version: dict
+        """
+        file_path = os.path.join(self.path, self.file_name.format(symbol=symbol, interval=interval))
+        if self.file_format == self.CSV:
+            paths = [f'{file_path}.csv']
+        else:
+            # Binary data is a directory with a file per column
+            paths = [os.path.join(file_path, name) for name in sorted(os.listdir(file_path))] \
+                if os.path.isdir(file_path) else []
+
+        stats = [os.stat(path) for path in paths if os.path.isfile(path)]
+        if not stats:
+            return None
+
+        return {'Size': sum(stat.st_size for stat in stats), 'Modified': max(stat.st_mtime_ns for stat in stats)}
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        """
+        Get the candles of a symbol.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        file_path = os.path.join(self.path, self.file_name.format(symbol=symbol, interval=interval))
+
+        if self.file_format == self.BINARY:
+            storage = BinaryStorage(file_path)
+            if not storage.exists():
+                raise FileNotFoundError(f"No binary data for {symbol} ({interval}) on {file_path}.")
+            return storage.read(initial_date, final_date)
+
+        data = pd.read_csv(f'{file_path}.csv', index_col=0, parse_dates=True).sort_index()
+        begin, end = BinaryStorage.get_bounds(data.index.asi8, initial_date, final_date,
+                                              data.index.tz)
+
+        return data.iloc[begin:end]
+
+    def get_chunks(self, symbol, initial_date, final_date, interval='1d', chunk_size=100000):
+        """
+        Get the candles of a symbol in blocks. Binary files are read block by block.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param chunk_size: number of candles of each block
+        @@type chunk_size: integer
+
+        @return chunks: candles indexed by date, block by block
+        @@@type chunks: generator of pandas dataframes
+        """
+        if self.file_format != self.BINARY:
+            yield from super().get_chunks(symbol, initial_date, final_date, interval, chunk_size)
+            return
+
+        file_path = os.path.join(self.path, self.file_name.format(symbol=symbol, interval=interval))
+        storage = BinaryStorage(file_path)
+        if not storage.exists():
+            raise FileNotFoundError(f"No binary data for {symbol} ({interval}) on {file_path}.")
+        yield from storage.read_chunks(chunk_size, initial_date, final_date)
+
+    def save(self, symbol, data, interval='1d'):
+        """
+        Store candles so they can be read by this provider later.
+
+        @param symbol: symbol of the data
+        @@type symbol: string
+        @param data: candles indexed by date
+        @@type data: pandas dataframe
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        """
+        file_path = os.path.join(self.path, self.file_name.format(symbol=symbol, interval=interval))
+
+        if self.file_format == self.BINARY:
+            BinaryStorage(file_path).write(data)
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            data.to_csv(f'{file_path}.csv')
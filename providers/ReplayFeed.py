@@ -0,0 +1,30 @@
+import asyncio
+
+
+class ReplayFeed(object):
+    """
+    Asynchronous feed of candles replayed from data already available, standing in for a live source.
+    Iterating it (async for) gives a (date, bar) pair per candle, where bar is a dict of the candle values.
+
+    """
+
+    def __init__(self, data, delay=0.0):
+        """
+        Class constructor.
+
+        @param data: candles to be replayed
+        @@type data: pandas dataframe
+        @param delay: seconds waited before each candle (0 only gives control back to the event loop)
+        @@type delay: float
+        """
+        self.data = data
+        self.delay = delay
+
+    def __len__(self):
+        return len(self.data)
+
+    async def __aiter__(self):
+        columns = list(self.data.columns)
+        for date, values in zip(self.data.index, self.data.itertuples(index=False, name=None)):
+            await asyncio.sleep(self.delay)
+            yield date, dict(zip(columns, values))
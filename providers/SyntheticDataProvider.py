@@ -0,0 +1,145 @@
+import zlib
+import numpy as np
+import pandas as pd
+from providers.AbstractDataProvider import AbstractDataProvider
+from utils.constants import PERIODS_PER_YEAR
+
+
+class SyntheticDataProvider(AbstractDataProvider):
+    """
+    Generates seeded synthetic candles, so backtests and benchmarks run without any real data.
+    Close prices follow a geometric brownian motion, optionally switching between regimes
+    (each with its own drift and volatility) after random durations.
+
+    """
+
+    GBM = 'gbm'
+    REGIME_SWITCHING = 'regime_switching'
+
+    FREQUENCIES = {'1m': 'T', '2m': '2T', '5m': '5T', '15m': '15T', '30m': '30T', '60m': 'H', '90m': '90T',
+                   '1h': 'H', '1d': 'B', '5d': '5B', '1wk': 'W', '1mo': 'BM', '3mo': 'BQ'}
+
+    def __init__(self, model=GBM, seed=0, initial_price=100.0, drift=0.05, volatility=0.2,
+                 regimes=((0.3, 0.15), (-0.3, 0.35), (0.0, 0.1)), mean_regime_length=250,
+                 periods_per_year=None):
+        """
+        Class constructor.
+
+        @param model: price model
+        @@type model: SyntheticDataProvider.GBM or SyntheticDataProvider.REGIME_SWITCHING
+        @param seed: seed of the generator (combined with the symbol)
+        @@type seed: integer
+        @param initial_price: price of the first candle
+        @@type initial_price: float
+        @param drift: annual drift of the GBM model
+        @@type drift: float
+        @param volatility: annual volatility of the GBM model
+        @@type volatility: float
+        @param regimes: annual drift and volatility of each regime of the regime switching model
+        @@type regimes: tuple of (float, float)
+        @param mean_regime_length: mean number of candles a regime lasts
+        @@type mean_regime_length: integer
+        @param periods_per_year: number of candles in a year, to scale drift and volatility
+        (None takes it from the interval)
+        @@type periods_per_year: integer
+        """
+        super().__init__("Synthetic")
+
+        if model not in [self.GBM, self.REGIME_SWITCHING]:
+            raise ValueError(f"Unknown price model '{model}'.")
+
+        self.model = model
+        self.seed = seed
+        self.initial_price = initial_price
+        self.drift = drift
+        self.volatility = volatility
+        self.regimes = regimes
+        self.mean_regime_length = mean_regime_length
+        self.periods_per_year = periods_per_year
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        """
+        Get the candles of a symbol.
+
+        @param symbol: symbol to get data from (changes the seed)
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        index = pd.date_range(initial_date, final_date, freq=self._get_frequency(interval), inclusive='left')
+
+        return self._generate(index, symbol, interval)
+
+    def generate(self, length, symbol='SYNTHETIC', initial_date='2000-01-03', interval='1d'):
+        """
+        Generate a fixed number of candles.
+
+        @param length: number of candles
+        @@type length: integer
+        @param symbol: symbol of the data (changes the seed)
+        @@type symbol: string
+        @param initial_date: date of the first candle
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        index = pd.date_range(initial_date, periods=length, freq=self._get_frequency(interval))
+
+        return self._generate(index, symbol, interval)
+
+    def _generate(self, index, symbol, interval):
+        length = len(index)
+        generator = np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+        time_step = 1 / (self.periods_per_year or PERIODS_PER_YEAR[interval])
+
+        if self.model == self.GBM:
+            drift = np.full(length, self.drift)
+            volatility = np.full(length, self.volatility)
+        else:
+            # Regimes last a geometric number of candles, drawn until the series is covered
+            durations = generator.geometric(1 / self.mean_regime_length,
+                                            size=length // self.mean_regime_length + 16)
+            while durations.sum() < length:
+                durations = np.concatenate([durations, generator.geometric(1 / self.mean_regime_length,
+                                                                           size=len(durations))])
+            states = generator.integers(len(self.regimes), size=len(durations))
+            regime = np.repeat(states, durations)[:length]
+            drift = np.array([regime_drift for regime_drift, _ in self.regimes])[regime]
+            volatility = np.array([regime_volatility for _, regime_volatility in self.regimes])[regime]
+
+        returns = ((drift - volatility ** 2 / 2) * time_step +
+                   volatility * np.sqrt(time_step) * generator.standard_normal(length))
+        close = self.initial_price * np.exp(np.cumsum(returns))
+
+        # Candles open near the previous close, and high/low go a bit beyond open and close
+        previous_close = np.concatenate([[self.initial_price], close[:-1]])
+        candle_volatility = volatility * np.sqrt(time_step)
+        open_price = previous_close * np.exp(candle_volatility * 0.2 * generator.standard_normal(length))
+        high = np.maximum(open_price, close) * np.exp(candle_volatility * np.abs(generator.standard_normal(length)) / 2)
+        low = np.minimum(open_price, close) * np.exp(-candle_volatility * np.abs(generator.standard_normal(length)) / 2)
+        volume = np.round(generator.lognormal(13, 0.5, length)).astype(np.int64)
+
+        return pd.DataFrame({
+            'Open': open_price,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Adj Close': close,
+            'Volume': volume
+        }, index=pd.DatetimeIndex(index, name='Date'))
+
+    def _get_frequency(self, interval):
+        if interval not in self.FREQUENCIES:
+            raise ValueError(f"Unknown interval '{interval}'.")
+
+        return self.FREQUENCIES[interval]
@@ -0,0 +1,37 @@
+from providers.AbstractDataProvider import AbstractDataProvider
+
+
+class YahooDataProvider(AbstractDataProvider):
+    """
+    Gets data online using yahoo finance api. The api packages are only imported on the first request.
+
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        """
+        super().__init__("Yahoo")
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        """
+        Get the candles of a symbol.
+
+        @param symbol: symbol to get data from
+        @@type symbol: string
+        @param initial_date: first date (inclusive)
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: last date (exclusive)
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+
+        @return data: candles indexed by date
+        @@@type data: pandas dataframe
+        """
+        import yfinance as yf
+        from pandas_datareader import data as pdr
+        yf.pdr_override()
+
+        return pdr.get_data_yahoo(symbol, start=initial_date, end=final_date, interval=interval)
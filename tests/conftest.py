@@ -0,0 +1,45 @@
+import pytest
+from providers.FileDataProvider import FileDataProvider
+from providers.SyntheticDataProvider import SyntheticDataProvider
+from tools.BacktestTool import BacktestTool
+
+
+@pytest.fixture(autouse=True)
+def work_directory(tmp_path, monkeypatch):
+    # Logs, checkpoints and stores are written to a temporary directory
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def provider():
+    return SyntheticDataProvider(model=SyntheticDataProvider.REGIME_SWITCHING, seed=7)
+
+
+@pytest.fixture
+def data(provider):
+    return provider.get_data('SYNTHETIC', '2016-01-01', '2017-07-01')
+
+
+@pytest.fixture
+def file_provider(data):
+    """
+    The data of the data fixture saved to a binary file, so any range of it can be read back unchanged.
+
+    """
+    provider = FileDataProvider('data', file_format=FileDataProvider.BINARY)
+    provider.save('SYNTHETIC', data)
+
+    return provider
+
+
+@pytest.fixture
+def make_backtest(provider):
+    """
+    Backtests on the synthetic data of the data fixture.
+
+    """
+    def make_backtest(**parameters):
+        return BacktestTool(symbol='SYNTHETIC', initial_date='2016-01-01', final_date='2017-07-01',
+                            provider=provider, **parameters)
+
+    return make_backtest
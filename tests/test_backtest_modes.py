@@ -0,0 +1,52 @@
+import pytest
+from agents.BasicAgent import BasicAgent
+from tools.BacktestTool import BacktestTool
+from utils.constants import CHUNKED, INTRABAR_EXITS, LOOP, VECTORIZED
+
+EXITS = [(0.03, 0.01), (0.01, 0.02), (0.05, 0.05)]
+
+
+def run(backtest, data, take_profit, stop_loss):
+    agent = BasicAgent(balance=10000, take_profit=take_profit, stop_loss=stop_loss)
+    return backtest.evaluate(agent, data)
+
+
+@pytest.mark.parametrize('take_profit, stop_loss', EXITS)
+def test_vectorized_mode_gives_the_same_results_as_loop(make_backtest, data, take_profit, stop_loss):
+    loop = run(make_backtest(mode=LOOP), data, take_profit, stop_loss)
+    vectorized = run(make_backtest(mode=VECTORIZED), data, take_profit, stop_loss)
+
+    assert loop['Operations']['Total closed'] > 10
+    assert vectorized == loop
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 10000])
+def test_chunked_mode_gives_the_same_results_as_vectorized(make_backtest, data, monkeypatch, chunk_size):
+    # Blocks of the metrics smaller than the data, so they go across chunks
+    monkeypatch.setattr(BacktestTool, 'METRICS_BLOCK_SIZE', 64)
+    vectorized_backtest = make_backtest(mode=VECTORIZED)
+    vectorized = run(vectorized_backtest, data, 0.03, 0.01)
+    chunked_backtest = make_backtest(mode=CHUNKED, chunk_size=chunk_size)
+    chunked = run(chunked_backtest, data, 0.03, 0.01)
+
+    assert chunked == vectorized
+    assert len(vectorized_backtest.equity_curve) == len(data)
+    assert chunked_backtest.equity_curve is None
+
+
+@pytest.mark.parametrize('take_profit, stop_loss', EXITS)
+def test_intrabar_exits_give_the_same_results_on_every_mode(make_backtest, data, take_profit, stop_loss):
+    loop = run(make_backtest(mode=LOOP, exits=INTRABAR_EXITS), data, take_profit, stop_loss)
+    vectorized = run(make_backtest(mode=VECTORIZED, exits=INTRABAR_EXITS), data, take_profit, stop_loss)
+    chunked = run(make_backtest(mode=CHUNKED, chunk_size=50, exits=INTRABAR_EXITS), data, take_profit, stop_loss)
+
+    assert loop['Operations']['Total closed'] > 10
+    assert vectorized == loop
+    assert chunked == loop
+    assert loop != run(make_backtest(mode=LOOP), data, take_profit, stop_loss)
+
+
+def test_compare_modes(make_backtest):
+    comparison = make_backtest().compare_modes(BasicAgent())
+
+    assert comparison['Speedup'] > 0
@@ -0,0 +1,58 @@
+import numpy as np
+from agents.BasicAgent import BasicAgent
+from models.indicators import SimpleMovingAverageCrossover as crossover
+from tools.BatchBacktestTool import BatchBacktestTool
+from utils.constants import VECTORIZED
+
+AGENTS = [
+    lambda: BasicAgent(take_profit=0.03, stop_loss=0.01),
+    lambda: BasicAgent(take_profit=0.02, stop_loss=0.02),
+    lambda: BasicAgent(take_profit=0.03, stop_loss=0.01, fast_factor=4, slow_factor=15)
+]
+
+
+def make_batch(provider):
+    return BatchBacktestTool(symbol='SYNTHETIC', initial_date='2016-01-01', final_date='2017-07-01',
+                             provider=provider)
+
+
+def test_batch_gives_the_same_results_as_single_backtests(make_backtest, provider, data):
+    rows = make_batch(provider).evaluate([make_agent() for make_agent in AGENTS], data)
+
+    for row, make_agent in zip(rows, AGENTS):
+        result = make_backtest(mode=VECTORIZED).evaluate(make_agent(), data)
+        assert row['Final balance (R$)'] == result['Balance']['Final (R$)']
+        assert row['Total operations'] == result['Operations']['Total']
+        assert {name: row[name] for name in result['Metrics']} == result['Metrics']
+
+
+def test_cached_signals_are_not_shared(data):
+    first, second = BasicAgent(), BasicAgent()
+    cache = {}
+    first.generate_signals(data, cache)
+    second.generate_signals(data, cache)
+
+    first_signals, second_signals = first.get_models()[0].get_signals(), second.get_models()[0].get_signals()
+    assert first_signals is not second_signals
+    second_signals['Signal'] = 0
+
+    assert np.array_equal(first_signals['Signal'], cache[first.get_models()[0].get_parameter_key()]['Signal'])
+    assert first_signals['Signal'].abs().sum() > 0
+
+
+def test_classes_with_the_same_name_are_not_mixed_up(data):
+    class SimpleMovingAverageCrossover(crossover.SimpleMovingAverageCrossover):
+        # Same name and parameters as the model it derives from, but the opposite signals
+        def update(self, data):
+            super().update(data)
+            self.signals['Signal'] = -self.signals['Signal']
+
+    original, derived = BasicAgent(), BasicAgent()
+    derived.remove_model(derived.get_models()[0])
+    derived.add_model(SimpleMovingAverageCrossover(fast_factor=5, slow_factor=12))
+    cache = {}
+    original.generate_signals(data, cache)
+    signals = derived.generate_signals(data, cache)
+
+    assert len(cache) == 2
+    assert np.array_equal(signals['Signal'], -original.generate_signals(data)['Signal'])
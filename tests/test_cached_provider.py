@@ -0,0 +1,56 @@
+import pandas as pd
+from providers.AbstractDataProvider import AbstractDataProvider
+from providers.CachedDataProvider import CachedDataProvider
+
+
+class CountingProvider(AbstractDataProvider):
+    """
+    Serves slices of fixed data, recording every range it is asked for.
+
+    """
+
+    def __init__(self, data):
+        super().__init__("Counting")
+        self._data = data
+        self.requests = []
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        self.requests.append((pd.Timestamp(initial_date), pd.Timestamp(final_date)))
+        index = self._data.index
+        return self._data[(index >= pd.Timestamp(initial_date)) & (index < pd.Timestamp(final_date))]
+
+
+def test_overlapping_request_only_fetches_the_missing_dates(data):
+    source = CountingProvider(data)
+    provider = CachedDataProvider(source, path='cache')
+
+    provider.get_data('SYNTHETIC', '2016-03-01', '2016-09-01')
+    merged = provider.get_data('SYNTHETIC', '2016-01-01', '2017-01-01')
+
+    assert source.requests[1:] == [(pd.Timestamp('2016-01-01'), pd.Timestamp('2016-03-01')),
+                                   (pd.Timestamp('2016-09-01'), pd.Timestamp('2017-01-01'))]
+    pd.testing.assert_frame_equal(merged, source.get_data('SYNTHETIC', '2016-01-01', '2017-01-01'),
+                                  check_freq=False)
+
+
+def test_covered_range_isnt_fetched_again(data):
+    source = CountingProvider(data)
+    provider = CachedDataProvider(source, path='cache')
+    provider.get_data('SYNTHETIC', '2016-01-01', '2017-01-01')
+
+    chunks = list(provider.get_chunks('SYNTHETIC', '2016-02-01', '2016-06-01', chunk_size=10))
+
+    assert len(source.requests) == 1
+    pd.testing.assert_frame_equal(pd.concat(chunks), data['2016-02-01':'2016-05-31'], check_freq=False)
+
+
+def test_coverage_persists_across_instances(data):
+    first = CountingProvider(data)
+    CachedDataProvider(first, path='cache').get_data('SYNTHETIC', '2016-01-01', '2016-07-01')
+
+    second = CountingProvider(data)
+    provider = CachedDataProvider(second, path='cache')
+    provider.get_data('SYNTHETIC', '2016-02-01', '2016-05-01')
+    provider.get_data('SYNTHETIC', '2016-06-01', '2016-08-01')
+
+    assert second.requests == [(pd.Timestamp('2016-07-01'), pd.Timestamp('2016-08-01'))]
@@ -0,0 +1,103 @@
+import os
+import pytest
+from agents.BasicAgent import BasicAgent
+from tools.BacktestTool import BacktestTool
+from utils.constants import CHUNKED, LOOP, VECTORIZED
+
+# Candle the next backtest is interrupted on (None runs it through)
+INTERRUPTION = {'candle': None}
+
+
+class Interruption(Exception):
+    pass
+
+
+class InterruptedAgent(BasicAgent):
+    """
+    Stops the backtest on the candle of INTERRUPTION, as if the process was killed.
+
+    """
+
+    def update(self, data):
+        self._interrupt(len(data))
+        super().update(data)
+
+    def on_bar(self, date, bar):
+        self._interrupt(self._total_bars + 1)
+        return super().on_bar(date, bar)
+
+    @staticmethod
+    def _interrupt(candle):
+        if candle == INTERRUPTION['candle']:
+            raise Interruption()
+
+
+@pytest.fixture
+def make_resumable_backtest(make_backtest):
+    def make_resumable_backtest(mode, **parameters):
+        return make_backtest(mode=mode, chunk_size=64, checkpoint_path='run.ckpt', checkpoint_interval=0,
+                             resume=True, **parameters)
+
+    yield make_resumable_backtest
+    INTERRUPTION['candle'] = None
+
+
+def interrupt(backtest, agent, data, candle=200):
+    INTERRUPTION['candle'] = candle
+    with pytest.raises(Interruption):
+        backtest.evaluate(agent, data)
+    INTERRUPTION['candle'] = None
+
+
+@pytest.mark.parametrize('mode', [LOOP, CHUNKED])
+def test_interrupted_backtest_resumes_with_the_same_results(make_backtest, make_resumable_backtest, data, mode):
+    expected = make_backtest(mode=mode, chunk_size=64).evaluate(InterruptedAgent(), data)
+    backtest = make_resumable_backtest(mode)
+
+    interrupt(backtest, InterruptedAgent(), data)
+    assert os.path.isfile('run.ckpt')
+
+    assert backtest.evaluate(InterruptedAgent(), data) == expected
+    assert not os.path.isfile('run.ckpt')
+
+
+@pytest.mark.parametrize('changed', [{'take_profit': 0.05}, {'percentage': 0.2}, {'fast_factor': 4}])
+def test_checkpoint_of_another_agent_is_not_resumed(make_resumable_backtest, data, changed):
+    backtest = make_resumable_backtest(CHUNKED)
+    interrupt(backtest, InterruptedAgent(), data)
+
+    agent = InterruptedAgent(**changed)
+    with pytest.raises(ValueError, match='Agent'):
+        backtest.evaluate(agent, data)
+    # The agent wasn't touched
+    assert agent.get_description() == InterruptedAgent(**changed).get_description()
+
+
+def test_checkpoint_of_another_mode_is_not_resumed(make_resumable_backtest, data):
+    interrupt(make_resumable_backtest(LOOP), InterruptedAgent(), data)
+
+    with pytest.raises(ValueError, match='Mode'):
+        make_resumable_backtest(CHUNKED).evaluate(InterruptedAgent(), data)
+
+
+@pytest.mark.parametrize('mode', [LOOP, CHUNKED])
+def test_extended_backtest_gives_the_same_results_as_a_full_one(file_provider, mode):
+    def make(final_date, **parameters):
+        return BacktestTool(symbol='SYNTHETIC', initial_date='2016-01-01', final_date=final_date, mode=mode,
+                            provider=file_provider, chunk_size=64, **parameters)
+
+    expected = make('2017-07-01').execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    make('2017-01-01', checkpoint_path='run.ckpt', keep_state=True).execute_agent(
+        BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+    extended = make('2017-07-01', checkpoint_path='run.ckpt', keep_state=True, resume=True).execute_agent(
+        BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    assert extended == expected
+
+
+@pytest.mark.parametrize('parameters', [{'checkpoint_path': 'run.ckpt'}, {'keep_state': True},
+                                        {'checkpoint_path': 'run.ckpt', 'resume': True}])
+def test_vectorized_mode_has_no_checkpoints(make_backtest, parameters):
+    with pytest.raises(ValueError):
+        make_backtest(mode=VECTORIZED, **parameters)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from agents.BasicAgent import BasicAgent
+from agents.combiners.MajorityCombiner import MajorityCombiner
+from agents.combiners.UnanimousCombiner import UnanimousCombiner
+from agents.combiners.WeightedVoteCombiner import WeightedVoteCombiner
+from models.indicators.SimpleMovingAverageCrossover import SimpleMovingAverageCrossover
+from utils.constants import BUY, SELL, DO_NOTHING
+
+# One row per model, one column per candle
+SIGNALS = np.array([[1, 1, -1, 0, 1, -1],
+                    [1, 0, -1, 0, -1, -1],
+                    [1, 1, 0, 0, 1, 1]], dtype=np.int8)
+
+
+def test_unanimous_combiner():
+    expected = [BUY, DO_NOTHING, DO_NOTHING, DO_NOTHING, DO_NOTHING, DO_NOTHING]
+
+    assert UnanimousCombiner().combine(SIGNALS).tolist() == expected
+
+
+def test_majority_combiner():
+    expected = [BUY, BUY, SELL, DO_NOTHING, BUY, SELL]
+
+    assert MajorityCombiner().combine(SIGNALS).tolist() == expected
+
+
+def test_weighted_vote_combiner():
+    combiner = WeightedVoteCombiner(weights=[3, 1, 1], threshold=0.5)
+    # Scores: 1, 0.8, -0.8, 0, 0.6, -0.6
+    expected = [BUY, BUY, SELL, DO_NOTHING, BUY, SELL]
+
+    assert combiner.combine(SIGNALS).tolist() == expected
+
+
+def test_weighted_vote_combiner_checks_the_weights():
+    with pytest.raises(ValueError):
+        WeightedVoteCombiner(weights=[1, 1]).combine(SIGNALS)
+
+
+@pytest.mark.parametrize('make_combiner', [MajorityCombiner, lambda: WeightedVoteCombiner(weights=[2, 1, 1], threshold=0.4)])
+def test_combined_agent_on_bar_gives_the_same_operations_as_update_all(make_combiner, data):
+    agents = []
+    for _ in range(2):
+        agent = BasicAgent(take_profit=0.02, stop_loss=0.02)
+        agent.add_model(SimpleMovingAverageCrossover(fast_factor=5, slow_factor=13))
+        agent.add_model(SimpleMovingAverageCrossover(fast_factor=4, slow_factor=12))
+        agent.set_combiner(make_combiner())
+        agents.append(agent)
+
+    agents[0].update_all(data[:-1])
+    for date, bar in zip(data.index[:-1], data.to_dict('records')):
+        agents[1].on_bar(date, bar)
+
+    assert len(agents[0].get_history()) > 3
+    assert agents[0].get_history() == agents[1].get_history()
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from utils.downsample import downsample, LTTB, MIN_MAX
+
+
+def make_series(length, seed=4):
+    generator = np.random.default_rng(seed)
+    x = np.arange(length, dtype=np.float64) * 60e9
+    y = np.cumsum(generator.normal(size=length))
+
+    return x, y
+
+
+@pytest.mark.parametrize('method', [LTTB, MIN_MAX])
+@pytest.mark.parametrize('length, points', [(1000, 10), (1000, 101), (12345, 500), (50, 49), (7, 4)])
+def test_first_and_last_points_are_kept_within_the_points(method, length, points):
+    x, y = make_series(length)
+    positions = downsample(x, y, points, method)
+
+    assert positions[0] == 0
+    assert positions[-1] == length - 1
+    assert len(positions) <= points
+    assert np.all(np.diff(positions) > 0)
+
+
+@pytest.mark.parametrize('points', [10, 64, 300])
+def test_min_max_keeps_the_extremes_of_every_bucket(points):
+    x, y = make_series(5000)
+    positions = set(downsample(x, y, points, MIN_MAX).tolist())
+
+    # Buckets of equal size (but the last one), as many as fit in the points besides the first and last
+    bucket_size = -(-len(y) // ((points - 2) // 2))
+    for begin in range(0, len(y), bucket_size):
+        bucket = y[begin:begin + bucket_size]
+        assert begin + np.argmin(bucket) in positions
+        assert begin + np.argmax(bucket) in positions
+    assert np.argmin(y) in positions
+    assert np.argmax(y) in positions
+
+
+@pytest.mark.parametrize('method', [LTTB, MIN_MAX])
+def test_short_series_pass_through(method):
+    x, y = make_series(20)
+    y[[3, 11]] = np.nan
+
+    np.testing.assert_array_equal(downsample(x, y, 20, method), np.flatnonzero(~np.isnan(y)))
+    np.testing.assert_array_equal(downsample(x, y, 18, method), np.flatnonzero(~np.isnan(y)))
+
+
+@pytest.mark.parametrize('method', [LTTB, MIN_MAX])
+def test_missing_values_are_never_chosen(method):
+    x, y = make_series(1000)
+    y[::7] = np.nan
+
+    positions = downsample(x, y, 50, method)
+
+    assert not np.isnan(y[positions]).any()
+    assert len(positions) <= 50
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        downsample(*make_series(10), 5, 'median')
@@ -0,0 +1,113 @@
+import pickle
+import pandas as pd
+import pytest
+from agents.BasicAgent import BasicAgent
+from models.FeatureStore import FeatureStore
+from models.indicators.SimpleMovingAverageCrossover import SimpleMovingAverageCrossover
+
+
+def test_models_share_their_features(data):
+    agent = BasicAgent()
+    first = SimpleMovingAverageCrossover(fast_factor=5, slow_factor=12)
+    second = SimpleMovingAverageCrossover(fast_factor=5, slow_factor=20)
+    agent.add_model(first)
+    agent.add_model(second)
+    store = agent.get_feature_store()
+
+    agent.update(data)
+
+    # Rolling means of 5, 12 and 20 candles and the change, the mean of 5 candles only once
+    assert len(store) == 4
+    assert store.get(('Close', FeatureStore.ROLLING_MEAN, 5)) is store.get(('Close', FeatureStore.ROLLING_MEAN, 5))
+
+    alone = SimpleMovingAverageCrossover(fast_factor=5, slow_factor=20)
+    alone.update(data)
+    pd.testing.assert_frame_equal(second.get_signals(), alone.get_signals())
+
+
+def test_features_are_evicted_with_their_last_model(data):
+    agent = BasicAgent()
+    first = SimpleMovingAverageCrossover(fast_factor=5, slow_factor=12)
+    second = SimpleMovingAverageCrossover(fast_factor=5, slow_factor=20)
+    agent.add_model(first)
+    agent.add_model(second)
+    agent.update(data)
+    store = agent.get_feature_store()
+
+    agent.remove_model(second)
+
+    assert sorted(key[2] or 0 for key in store.get_keys()) == [0, 5, 12]
+    assert len(store) == 3
+
+
+def test_features_are_dropped_with_their_data(data):
+    store = FeatureStore()
+    key = store.register('Close', FeatureStore.ROLLING_MEAN, 3)
+    store.update(data)
+    feature = store.get(key)
+
+    head = data[:10]
+    store.update(head)
+
+    assert store.get(key) is not feature
+    assert len(store.get(key)) == 10
+
+
+def test_saved_store_leaves_the_data_out(data):
+    store = FeatureStore()
+    key = store.register('Close', FeatureStore.ROLLING_MEAN, 3)
+    store.update(data)
+    store.get(key)
+
+    loaded = pickle.loads(pickle.dumps(store))
+
+    assert len(loaded) == 0
+    assert loaded.get_keys() == [key]
+
+
+def test_unknown_operator_or_key():
+    store = FeatureStore()
+
+    with pytest.raises(ValueError):
+        store.register('Close', 'median', 3)
+    with pytest.raises(KeyError):
+        store.get(('Close', FeatureStore.ROLLING_MEAN, 3))
+
+
+def test_features_are_dropped_when_the_data_changes_in_place(data):
+    store = FeatureStore()
+    key = store.register('Close', FeatureStore.ROLLING_MEAN, 3)
+    frame = data.copy()
+    store.update(frame)
+    store.get(key)
+
+    # The last candle changes while it forms
+    frame.iloc[-1, frame.columns.get_loc('Close')] += 1.0
+    store.update(frame)
+    assert store.get(key).iloc[-1] == frame['Close'].iloc[-3:].mean()
+
+    # A candle is appended to the same frame
+    frame.loc[frame.index[-1] + pd.Timedelta(days=1)] = frame.iloc[-1] * 2
+    store.update(frame)
+    assert len(store.get(key)) == len(frame)
+    assert store.get(key).iloc[-1] == frame['Close'].iloc[-3:].mean()
+
+    # Earlier candles need an explicit invalidation
+    frame.iloc[-2, frame.columns.get_loc('Close')] += 1.0
+    store.update(frame)
+    store.invalidate()
+    assert store.get(key).iloc[-1] == frame['Close'].iloc[-3:].mean()
+
+
+def test_store_doesnt_keep_the_data_alive(data):
+    store = FeatureStore()
+    key = store.register('Close', FeatureStore.ROLLING_MEAN, 3)
+    frame = data.copy()
+    store.update(frame)
+    store.get(key)
+
+    del frame
+    store.invalidate()
+
+    with pytest.raises(RuntimeError):
+        store.get(key)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from agents.BasicAgent import BasicAgent
+from models.FeatureStore import FeatureStore
+from models.indicators import kernels
+from models.indicators.BollingerBands import BollingerBands
+from models.indicators.RollingStd import RollingStd
+
+
+def random_walk(length, seed=0):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.001, length)))
+
+
+def test_rolling_statistics_stay_precise_on_long_series():
+    close = random_walk(1000000)
+
+    means, deviations = kernels.rolling_mean(close, 5)[0], kernels.rolling_std(close, 5)[0]
+
+    windows = sliding_window_view(close, 5)
+    assert np.max(np.abs(means[4:] - windows.mean(axis=1)) / windows.mean(axis=1)) < 1e-12
+    assert np.max(np.abs(deviations[4:] - windows.std(axis=1)) / windows.std(axis=1)) < 1e-3
+
+
+def test_missing_value_only_affects_its_windows():
+    close = random_walk(200)
+    close[50] = np.nan
+
+    deviations = kernels.rolling_std(close, 10)[0]
+
+    assert np.isnan(deviations[50:60]).all()
+    assert not np.isnan(deviations[60:]).any()
+    assert np.allclose(deviations[60:], sliding_window_view(close[51:], 10).std(axis=1))
+
+
+def test_incremental_deviation_gives_the_same_numbers():
+    close = random_walk(2000)
+    close[300:320] = close[300]
+    close[700] = np.nan
+
+    for window in [1, 2, 20]:
+        deviation = RollingStd(window)
+        streamed = np.array([deviation.update(value) for value in close])
+
+        assert np.array_equal(streamed, kernels.rolling_std(close, window)[0], equal_nan=True)
+
+
+def test_batches_give_the_same_rows_as_single_windows():
+    close = random_walk(500)
+
+    assert np.array_equal(kernels.rolling_std(close, [3, 9])[1], kernels.rolling_std(close, 9)[0], equal_nan=True)
+    assert np.array_equal(kernels.ema(close, [9, 4, 9])[2], kernels.ema(close, 9)[0], equal_nan=True)
+
+    lines, signal_lines = kernels.macd(close, [3, 6], [8, 13], 5)
+    for line, signal_line in zip(lines, signal_lines):
+        assert np.array_equal(signal_line, kernels.exponential_mean(line, 2.0, 5), equal_nan=True)
+
+
+def test_models_get_their_features_from_the_store(data):
+    agent = BasicAgent()
+    bands = BollingerBands(window=10)
+    agent.add_model(bands)
+
+    agent.update(data)
+
+    keys = agent.get_feature_store().get_keys()
+    assert ('Close', FeatureStore.ROLLING_MEAN, 10) in keys and ('Close', FeatureStore.ROLLING_STD, 10) in keys
+    pd.testing.assert_series_equal(bands.get_signals()['Middle band'],
+                                   data['Close'].rolling(10).mean().fillna(0), check_names=False)
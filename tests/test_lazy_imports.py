@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+import pytest
+from benchmarks.startup import HEAVY_PACKAGES, MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_heavy_packages_arent_imported(module):
+    # A fresh interpreter, since this one may already have imported them
+    code = f"import sys, {module}; print(','.join(package for package in {HEAVY_PACKAGES} if package in sys.modules))"
+    process = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip() == ''
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from log.ResultStore import ResultStore
+from tools.MonteCarloTool import MonteCarloTool
+from tools.SweepTool import SweepTool
+
+PROFITS = np.array([120.0, -80.0, 45.5, -300.0, 210.0, -15.25, 60.0, -95.0, 30.0, 5.0])
+
+
+def test_shuffle_keeps_the_final_balance():
+    final_balances, _, _ = MonteCarloTool(simulations=500, method=MonteCarloTool.SHUFFLE,
+                                          seed=3).simulate(PROFITS, 1000.0)
+
+    np.testing.assert_allclose(final_balances, 1000.0 + PROFITS.sum())
+
+
+@pytest.mark.parametrize('method', [MonteCarloTool.BOOTSTRAP, MonteCarloTool.SHUFFLE])
+def test_batches_dont_change_the_results(method):
+    # One simulation per batch, a few per batch and all of them together
+    results = [MonteCarloTool(simulations=200, method=method, seed=11, max_cells=max_cells).simulate(PROFITS, 1000.0)
+               for max_cells in [1, 3 * len(PROFITS), 1 << 22]]
+
+    for result in results[1:]:
+        for values, expected in zip(result, results[0]):
+            np.testing.assert_array_equal(values, expected)
+
+
+@pytest.mark.parametrize('profit, drawdown, ruin', [(200.0, 0.0, False), (-400.0, 0.4, False),
+                                                    (-500.0, 0.5, True), (-600.0, 0.6, True)])
+def test_drawdown_and_ruin_of_a_single_operation(profit, drawdown, ruin):
+    # A single operation is drawn the same way by every resample
+    final_balances, max_drawdowns, ruined = MonteCarloTool(simulations=3, ruin_fraction=0.5,
+                                                           seed=0).simulate([profit], 1000.0)
+
+    np.testing.assert_allclose(final_balances, 1000.0 + profit)
+    # The initial balance is the first peak
+    np.testing.assert_allclose(max_drawdowns, drawdown)
+    np.testing.assert_array_equal(ruined, ruin)
+
+
+def test_drawdown_and_ruin_of_every_order():
+    profits = np.array([200.0, -600.0])
+    final_balances, max_drawdowns, ruined = MonteCarloTool(simulations=400, method=MonteCarloTool.SHUFFLE,
+                                                           ruin_fraction=0.5, seed=5).simulate(profits, 1000.0)
+
+    np.testing.assert_allclose(final_balances, 600.0)
+    # Up first: 1200, 600 (half of the peak, 600 isn't ruin). Down first: 400 (ruin), 600
+    assert set(np.round(max_drawdowns, 10)) == {0.5, 0.6}
+    np.testing.assert_array_equal(ruined, np.isclose(max_drawdowns, 0.6))
+
+
+def test_stored_analysis_needs_a_seed():
+    with pytest.raises(ValueError, match='seed'):
+        SweepTool({'take_profit': [0.02]}, monte_carlo=MonteCarloTool(), result_store=ResultStore('store'))
+
+    SweepTool({'take_profit': [0.02]}, monte_carlo=MonteCarloTool(seed=1), result_store=ResultStore('store'))
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+from agents.BasicAgent import BasicAgent
+from models.indicators.AverageTrueRange import AverageTrueRange
+from models.indicators.BollingerBands import BollingerBands
+from models.indicators.ExponentialMovingAverageCrossover import ExponentialMovingAverageCrossover
+from models.indicators.MovingAverageConvergenceDivergence import MovingAverageConvergenceDivergence
+from models.indicators.RelativeStrengthIndex import RelativeStrengthIndex
+from models.indicators.SimpleMovingAverageCrossover import SimpleMovingAverageCrossover
+from models.indicators.TripleMovingAverageCrossover import TripleMovingAverageCrossover
+
+MODELS = [
+    lambda: SimpleMovingAverageCrossover(fast_factor=5, slow_factor=12),
+    lambda: SimpleMovingAverageCrossover(fast_factor=1, slow_factor=3),
+    lambda: TripleMovingAverageCrossover(fast_factor=3, medium_factor=7, slow_factor=15),
+    lambda: BollingerBands(window=10, width=1.5),
+    lambda: BollingerBands(window=1),
+    lambda: RelativeStrengthIndex(window=7),
+    lambda: ExponentialMovingAverageCrossover(fast_factor=5, slow_factor=12),
+    lambda: MovingAverageConvergenceDivergence(fast_factor=6, slow_factor=13, signal_factor=5),
+    lambda: AverageTrueRange(window=7)
+]
+
+
+def stream(model, data):
+    for date, bar in zip(data.index, data.to_dict('records')):
+        model.on_bar(date, bar)
+
+    return model.get_signals()
+
+
+@pytest.mark.parametrize('make_model', MODELS)
+def test_on_bar_gives_the_same_signals_as_update(make_model, data):
+    model = make_model()
+    model.update(data)
+    expected = model.get_signals()
+
+    model.reset_state()
+    streamed = stream(model, data)
+
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False, check_freq=False, check_names=False)
+
+
+def test_history_size_keeps_the_latest_candles(data):
+    model = SimpleMovingAverageCrossover(history_size=50)
+    streamed = stream(model, data)
+
+    assert len(streamed) == 50
+    assert streamed.index[-1] == data.index[-1]
+
+
+def test_agent_on_bar_creates_the_same_operations_as_update(data):
+    updated = BasicAgent(take_profit=0.02, stop_loss=0.02)
+    for end in range(1, len(data)):
+        updated.update(data[0:end])
+
+    streamed = BasicAgent(take_profit=0.02, stop_loss=0.02)
+    for date, bar in zip(data.index[:-1], data.to_dict('records')):
+        streamed.on_bar(date, bar)
+
+    assert len(streamed.get_history()) > 10
+    assert streamed.get_history() == updated.get_history()
+    assert streamed.get_balance() == updated.get_balance()
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from models.operations.OperationBook import OperationBook
+from models.operations.OperationLedger import OperationLedger
+from utils.constants import BUY, SELL
+
+
+def test_book_pops_only_the_triggered_operations():
+    book = OperationBook()
+    book.add(0, 95.0, 105.0)
+    book.add(1, 90.0, 110.0)
+    book.add(2, 98.0, 102.0)
+
+    assert book.pop_triggered(101.0) == []
+    assert book.pop_triggered(106.0) == [0, 2]
+    assert book.get_open_ids() == [1]
+    assert book.pop_triggered(100.0, 89.0) == [1]
+    assert len(book) == 0
+
+
+def test_book_discard_and_nan_prices():
+    book = OperationBook()
+    book.add(0, np.nan, 105.0)
+    book.add(1, 95.0, 105.0)
+    book.discard(1)
+    book.discard(7)
+
+    assert book.pop_triggered(1e9, -1e9) == [0]
+
+
+def test_book_compacts_closed_operations():
+    book = OperationBook()
+    for operation_id in range(1000):
+        book.add(operation_id, 50.0, 150.0 + operation_id)
+        book.discard(operation_id)
+
+    assert len(book._upper) + len(book._lower) <= 64
+
+
+def test_ledger_profits_and_history():
+    ledger = OperationLedger(capacity=1)
+    dates = pd.date_range('2020-01-01', periods=4)
+    long_id = ledger.open(0, dates[0], 100.0, BUY, 1000.0)
+    short_id = ledger.open(1, dates[1], 100.0, SELL, 500.0)
+    ledger.open(2, dates[2], 100.0, BUY, 200.0)
+
+    assert ledger.close(short_id, 2, dates[2], 110.0) == (500.0, -50.0)
+    assert ledger.close(long_id, 3, dates[3], 103.0) == (1000.0, 30.0)
+    assert len(ledger) == 3
+    assert ledger.get_closed_ids().tolist() == [short_id, long_id]
+    assert ledger.get_successful()[[short_id, long_id]].tolist() == [False, True]
+
+    history = ledger.to_history()
+    assert [record['Operation id'] for record in history] == [short_id, long_id]
+    assert history[0]['Entered as'] == 'SELL' and history[0]['Result'] == 'Fail'
+    assert history[1]['Profit (R$)'] == 30.0
+    assert history[1]['Final date'] == str(dates[3])
+
+
+def test_trigger_and_fill_prices():
+    lower, upper = OperationLedger.trigger_prices(np.array([100.0, 100.0]), np.array([BUY, SELL]), 0.05, 0.02)
+    assert np.allclose(lower, [98.0, 95.0]) and np.allclose(upper, [105.0, 102.0])
+
+
+    positions = np.array([BUY, BUY, BUY, SELL])
+    lower, upper = np.full(4, 98.0), np.full(4, 105.0)
+    # A gap fills at the open, a single endpoint at its price and both endpoints at the stop loss
+    prices = OperationLedger.fill_prices(positions, lower, upper,
+                                         open_prices=np.array([97.0, 100.0, 100.0, 100.0]),
+                                         high_prices=np.array([99.0, 106.0, 106.0, 106.0]),
+                                         low_prices=np.array([96.0, 99.0, 97.0, 97.0]))
+    assert prices.tolist() == [97.0, 105.0, 98.0, 105.0]
+
+
+def test_equity_curve_marks_operations_to_market():
+    ledger = OperationLedger()
+    close = np.array([100.0, 102.0, 101.0, 105.0, 104.0, 103.0])
+    dates = pd.date_range('2020-01-01', periods=len(close))
+    first = ledger.open(0, dates[0], close[0], BUY, 1000.0)
+    ledger.open(1, dates[1], close[1], SELL, 500.0)
+    ledger.close(first, 3, dates[3], close[3])
+
+    equity, exposed = ledger.get_equity_curve(close, 10000.0)
+
+    # Brute force: closed profits plus the value of the active operations on every close
+    expected = []
+    for index, price in enumerate(close):
+        value = 10000.0 + 1000.0 * (close[3] if index >= 3 else price) / 100.0 - 1000.0
+        if index >= 1:
+            value += 500.0 * (close[1] - price) / close[1]
+        expected.append(value)
+
+    assert np.allclose(equity, expected)
+    assert exposed.tolist() == [1, 2, 2, 1, 1, 1]
+
+
+def test_equity_curve_by_ranges():
+    ledger = OperationLedger()
+    close = 100 + np.cumsum(np.random.default_rng(3).normal(0, 1, 40))
+    dates = pd.date_range('2020-01-01', periods=len(close))
+    for entry, exit in [(0, 12), (5, 6), (9, 30), (20, -1), (33, -1)]:
+        operation_id = ledger.open(entry, dates[entry], close[entry], BUY if entry % 2 else SELL, 100.0 + entry)
+        if exit >= 0:
+            ledger.close(operation_id, exit, dates[exit], close[exit])
+
+    equity, exposed = ledger.get_equity_curve(close, 1000.0)
+    ranges = [ledger.get_equity_curve(close[begin:begin + 7], 1000.0, begin) for begin in range(0, 40, 7)]
+
+    assert np.allclose(np.concatenate([values for values, _ in ranges]), equity)
+    assert np.concatenate([active for _, active in ranges]).tolist() == exposed.tolist()
+
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+from agents.BasicAgent import BasicAgent
+from providers.AbstractDataProvider import AbstractDataProvider
+from tools.BacktestTool import BacktestTool
+from tools.PortfolioBacktestTool import PortfolioBacktestTool
+from utils.constants import LOOP
+
+
+class FrameProvider(AbstractDataProvider):
+    """
+    Serves fixed data for each symbol.
+
+    """
+
+    def __init__(self, frames):
+        super().__init__("Frames")
+        self._frames = frames
+
+    def get_data(self, symbol, initial_date, final_date, interval='1d'):
+        return self._frames[symbol]
+
+
+def run_portfolio(frames, agent=None):
+    tool = PortfolioBacktestTool(list(frames), initial_date='2016-01-01', final_date='2017-07-01',
+                                 provider=FrameProvider(frames), processes=2)
+    agent = agent or BasicAgent()
+    result = tool.execute_agent(agent, agent.initial_balance, agent.active_balance_percentage,
+                                agent.take_profit, agent.stop_loss, save_log=False)
+
+    return result, agent
+
+
+def test_single_symbol_gives_the_same_result_as_a_backtest(data):
+    result, _ = run_portfolio({'SYNTHETIC': data})
+
+    backtest = BacktestTool(symbol='SYNTHETIC', initial_date='2016-01-01', final_date='2017-07-01', mode=LOOP,
+                            provider=FrameProvider({'SYNTHETIC': data}))
+    expected = backtest.execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    assert expected['Operations']['Total closed'] > 10
+    assert result['Balance'] == expected['Balance']
+    assert [{name: value for name, value in record.items() if name != 'Symbol'}
+            for record in result['History']] == expected['Operations']['History']
+
+
+def test_missing_candles_arent_traded(data):
+    # The second symbol misses every third candle
+    sparse = data[np.arange(len(data)) % 3 != 0]
+    result, _ = run_portfolio({'FULL': data, 'SPARSE': sparse})
+
+    sparse_dates = set(str(date) for date in sparse.index)
+    history = [record for record in result['History'] if record['Symbol'] == 'SPARSE']
+    assert len(history) > 5
+    assert all(record['Initial date'] in sparse_dates and record['Final date'] in sparse_dates
+               for record in history)
+
+
+def test_symbols_share_one_balance(data):
+    agent = BasicAgent(percentage=0.5)
+    result, agent = run_portfolio({'FIRST': data, 'SECOND': data.copy()}, agent)
+
+    ledger = agent.get_ledger()
+    entries, assets = ledger.get_column('entry_index'), ledger.get_column('asset')
+    invested = ledger.get_column('invested_value')
+    # Both symbols enter on the same candles, the second one with half of what the first one left
+    first = np.flatnonzero(assets == 0)
+    second = np.flatnonzero(assets == 1)
+    assert np.array_equal(entries[first], entries[second])
+    assert invested[second[0]] == round((10000 - invested[first[0]]) * 0.5, 2)
+
+    profits = ledger.get_column('profit')[ledger.get_closed_ids()].sum()
+    total_active, active_value = agent.get_active_operation_data(None)
+    assert result['Balance']['Final (R$)'] == round(10000 + profits, 2)
+    assert result['Active']['Total (#)'] == total_active
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from agents.BasicAgent import BasicAgent
+from providers.ReplayFeed import ReplayFeed
+from tools.PredictionTool import PredictionEngine
+from utils.constants import LOOP
+
+
+class CountingFeed(ReplayFeed):
+    """
+    Replay feed counting how many candles were read from it.
+
+    """
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.total_read = 0
+
+    async def __aiter__(self):
+        async for date, bar in super().__aiter__():
+            self.total_read += 1
+            yield date, bar
+
+
+def run(engine, agent):
+    return asyncio.run(engine.run(agent))
+
+
+def test_events_match_the_backtest_operations(make_backtest, data):
+    expected = make_backtest(mode=LOOP).evaluate(BasicAgent(), data)['Operations']['History']
+    events = []
+    agent = BasicAgent()
+    run(PredictionEngine(ReplayFeed(data), on_event=events.append), agent)
+
+    signals = [event for event in events if event['Event'] == 'Signal']
+    assert [event['Date'] for event in signals] == list(data.index)
+
+    opened = [event for event in events if event['Event'] == 'Open']
+    closed = [{name: value for name, value in event.items() if name not in ['Event', 'Date']}
+              for event in events if event['Event'] == 'Close']
+    assert len(closed) > 0
+    assert closed == expected
+    assert [event['Operation id'] for event in opened] == list(range(len(agent.get_ledger())))
+    assert len(opened) >= len(expected)
+
+
+def test_slow_handler_holds_the_feed_back(data):
+    feed = CountingFeed(data.iloc[:80])
+    lags = []
+
+    async def handle(event):
+        if event['Event'] == 'Signal':
+            lags.append(feed.total_read - len(lags) - 1)
+        await asyncio.sleep(0.001)
+
+    queue_size = 2
+    run(PredictionEngine(feed, queue_size=queue_size, on_event=handle), BasicAgent())
+
+    assert len(lags) == 80
+    # Each queue and each task holds a few candles at most, however far behind the handler is
+    assert max(lags) <= 2 * queue_size + 3
+
+
+def test_latency_report_has_the_percentiles(data):
+    result = PredictionEngine(ReplayFeed(data)).execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    assert result['Candles'] == len(data)
+    latency = result['Latency (us)']
+    assert list(latency) == [f'p{percentile:g}' for percentile in PredictionEngine.PERCENTILES] + ['max']
+    values = list(latency.values())
+    assert values == sorted(values)
+    assert values[0] > 0
+
+
+def test_history_size_bounds_the_kept_candles(data):
+    agent = BasicAgent()
+    run(PredictionEngine(ReplayFeed(data), history_size=50), agent)
+
+    for model in agent.get_models():
+        assert len(model.get_signals()) == 50
@@ -0,0 +1,34 @@
+import pytest
+from agents.BasicAgent import BasicAgent
+from utils.constants import VECTORIZED
+from utils.Profiler import PROFILER
+
+
+class FailingAgent(BasicAgent):
+
+    def update_all(self, data, cache=None):
+        with PROFILER.phase('agent.update_all'):
+            raise RuntimeError("Failed on purpose.")
+
+
+def test_backtest_profile(make_backtest):
+    result = make_backtest(mode=VECTORIZED, profile=True).execute_agent(
+        BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    assert result['Profile']['tool.get_data']['Calls'] == 1
+    assert 'agent.update_all' in result['Profile']
+    assert not PROFILER.enabled
+
+
+def test_failed_run_doesnt_leak_into_the_next_one(make_backtest):
+    with pytest.raises(RuntimeError):
+        make_backtest(mode=VECTORIZED, profile=True).execute_agent(
+            FailingAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    assert not PROFILER.enabled
+    assert PROFILER.get_report() == {}
+
+    result = make_backtest(mode=VECTORIZED, profile=True).execute_agent(
+        BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+    assert result['Profile']['tool.get_data']['Calls'] == 1
+    assert result['Profile']['agent.update_all']['Calls'] == 1
@@ -0,0 +1,66 @@
+from agents.BasicAgent import BasicAgent
+from log.ResultStore import ResultStore
+from tools.BacktestTool import BacktestTool
+from tools.MonteCarloTool import MonteCarloTool
+from utils.constants import VECTORIZED
+
+
+def test_identical_backtest_is_answered_by_the_store(make_backtest):
+    store = ResultStore('results.sqlite')
+    first = BasicAgent().run_tool(make_backtest(mode=VECTORIZED, result_store=store, profile=True), save_log=False)
+    second = BasicAgent().run_tool(make_backtest(mode=VECTORIZED, result_store=store, profile=True), save_log=False)
+
+    assert 'Profile' in first and 'Cached' not in first
+    assert second.pop('Cached') is True
+    assert 'Profile' not in second
+    assert second['Metrics'] == first['Metrics'] and second['Balance'] == first['Balance']
+    assert len(store) == 1
+
+    other = BasicAgent(take_profit=0.05).run_tool(make_backtest(mode=VECTORIZED, result_store=store), save_log=False)
+    assert 'Cached' not in other and len(store) == 2
+
+
+def test_monte_carlo_runs_the_agent_of_a_stored_backtest(make_backtest):
+    store = ResultStore('results.sqlite')
+    BasicAgent().run_tool(make_backtest(mode=VECTORIZED, result_store=store), save_log=False)
+
+    tool = MonteCarloTool(simulations=100, seed=1, backtest=make_backtest(mode=VECTORIZED, result_store=store))
+    result = BasicAgent().run_tool(tool, save_log=False)
+
+    expected = MonteCarloTool(simulations=100, seed=1, backtest=make_backtest(mode=VECTORIZED)).execute_agent(
+        BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+    assert result['Operations'] > 10
+    assert result == expected
+
+
+def test_changed_file_isnt_answered_by_the_store(file_provider, data):
+    store = ResultStore('results.sqlite')
+
+    def run():
+        backtest = BacktestTool(symbol='SYNTHETIC', initial_date='2016-01-01', final_date='2017-07-01',
+                                mode=VECTORIZED, provider=file_provider, result_store=store)
+        return BasicAgent().run_tool(backtest, save_log=False)
+
+    first = run()
+    assert run().get('Cached')
+
+    changed = data.copy()
+    changed['Close'] = changed['Close'] * 1.5
+    file_provider.save('SYNTHETIC', changed)
+
+    second = run()
+    assert 'Cached' not in second
+    assert second['Balance'] != first['Balance'] or second['Operations'] != first['Operations']
+
+
+def test_query_ranks_stored_runs(make_backtest):
+    store = ResultStore('results.sqlite')
+    for take_profit in [0.01, 0.03, 0.05]:
+        BasicAgent(take_profit=take_profit).run_tool(make_backtest(mode=VECTORIZED, result_store=store),
+                                                      save_log=False)
+
+    runs = store.query(order_by='Sharpe ratio', tool='Backtest')
+
+    assert len(runs) == 3
+    assert runs['sharpe_ratio'].is_monotonic_decreasing
+    assert set(store.get_many(runs['key'].tolist())) == set(runs['key'])
@@ -0,0 +1,33 @@
+import numpy as np
+from utils.RiskMetrics import RiskMetrics
+
+
+def reference(equity, exposed, traded_value, periods_per_year=252):
+    # Metrics of the whole curve at once
+    returns = equity[1:] / equity[:-1] - 1
+    annualization = np.sqrt(periods_per_year)
+    return {
+        'Sharpe ratio': returns.mean() / returns.std() * annualization,
+        'Sortino ratio': returns.mean() / np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2)) * annualization,
+        'Max drawdown (%)': np.max(1 - equity / np.maximum.accumulate(equity)) * 100,
+        'Exposure (%)': np.count_nonzero(exposed) / len(equity) * 100,
+        'Turnover': traded_value / equity.mean()
+    }
+
+
+def test_blocks_give_the_metrics_of_the_whole_curve():
+    generator = np.random.default_rng(5)
+    equity = 10000 * np.cumprod(1 + generator.normal(0.0002, 0.01, 5000))
+    exposed = generator.integers(0, 3, len(equity))
+
+    metrics = RiskMetrics()
+    for begin in range(0, len(equity), 333):
+        metrics.update(equity[begin:begin + 333], exposed[begin:begin + 333])
+
+    expected = reference(equity, exposed, 50000.0)
+    for name, value in metrics.get_metrics(50000.0).items():
+        assert abs(value - expected[name]) < 1e-3, name
+
+
+def test_no_candles():
+    assert set(RiskMetrics().get_metrics(100.0).values()) == {0.0}
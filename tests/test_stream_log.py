@@ -0,0 +1,76 @@
+import glob
+import gzip
+import json
+import pytest
+from agents.BasicAgent import BasicAgent
+from utils.constants import CHUNKED, LOOP, VECTORIZED
+
+
+class Failure(Exception):
+    pass
+
+
+class FailingAgent(BasicAgent):
+    """
+    Raises on the candle given, after some operations are closed.
+
+    """
+
+    def __init__(self, candle, **parameters):
+        super().__init__(**parameters)
+        self.candle = candle
+
+    def update(self, data):
+        self._fail(len(data))
+        super().update(data)
+
+    def on_bar(self, date, bar):
+        self._fail(self._total_bars + 1)
+        return super().on_bar(date, bar)
+
+    def _fail(self, candle):
+        if candle == self.candle:
+            raise Failure()
+
+
+def read_stream():
+    file_name, = glob.glob('tmp/*.jsonl*')
+    opener = gzip.open if file_name.endswith('.gz') else open
+    with opener(file_name, 'rt') as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+@pytest.mark.parametrize('mode', [LOOP, VECTORIZED, CHUNKED])
+def test_stream_has_every_operation_and_the_summary(make_backtest, mode, compress):
+    expected = make_backtest(mode=mode, chunk_size=64).execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01,
+                                                                     save_log=False)
+    backtest = make_backtest(mode=mode, chunk_size=64, stream_log=True, compress_log=compress)
+    result = backtest.execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01)
+
+    assert glob.glob('tmp/*.jsonl.gz' if compress else 'tmp/*.jsonl')
+    records = read_stream()
+    history = expected['Operations']['History']
+    assert len(history) > 0
+    assert records[:-1] == [{'Operation': operation} for operation in json.loads(json.dumps(history))]
+
+    # The summary is the result, without the history
+    summary = records[-1]['Summary']
+    assert summary['Balance'] == expected['Balance'] == result['Balance']
+    assert 'History' not in summary['Operations']
+
+
+@pytest.mark.parametrize('mode', [LOOP, CHUNKED])
+def test_failed_run_keeps_the_closed_operations(make_backtest, mode):
+    backtest = make_backtest(mode=mode, chunk_size=64, stream_log=True)
+    with pytest.raises(Failure):
+        backtest.execute_agent(FailingAgent(300), 10000, 0.1, 0.03, 0.01)
+
+    records = read_stream()
+    assert len(records) > 0
+    assert all(list(record) == ['Operation'] for record in records)
+
+    # They are the operations the full run closed first
+    history = make_backtest(mode=mode).execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01,
+                                                     save_log=False)['Operations']['History']
+    assert [record['Operation'] for record in records] == json.loads(json.dumps(history[:len(records)]))
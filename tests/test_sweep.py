@@ -0,0 +1,41 @@
+from multiprocessing import shared_memory
+import pytest
+from agents.BasicAgent import BasicAgent
+from tools.SweepTool import SweepTool
+from utils.SharedArray import SharedArray
+from utils.constants import VECTORIZED
+
+GRID = {'take_profit': [0.01, 0.03], 'stop_loss': [0.01, 0.02], 'fast_factor': [4, 5]}
+
+
+def test_sweep_ranks_the_backtest_of_every_combination(make_backtest, provider, monkeypatch):
+    created = []
+    create = SharedArray.create
+
+    def record(values):
+        created.append(create(values))
+        return created[-1]
+
+    monkeypatch.setattr(SharedArray, 'create', staticmethod(record))
+    sweep = SweepTool(GRID, symbol='SYNTHETIC', initial_date='2016-01-01', final_date='2017-07-01',
+                      provider=provider, processes=2, rank_by='Sharpe ratio')
+
+    results = sweep.execute_agent(BasicAgent(), 10000, 0.1, 0.03, 0.01, save_log=False)
+
+    assert len(results) == 8
+    assert results['Sharpe ratio'].is_monotonic_decreasing
+
+    backtest = make_backtest(mode=VECTORIZED)
+    data = backtest.get_data()
+    for row in results.to_dict('records'):
+        parameters = {name: row[name] for name in GRID}
+        result = backtest.evaluate(BasicAgent(**parameters), data, include_history=False)
+        assert row['Final balance (R$)'] == result['Balance']['Final (R$)']
+        assert row['Total operations'] == result['Operations']['Total']
+        assert {name: row[name] for name in result['Metrics']} == result['Metrics']
+
+    # The price series was shared, and nothing is left on shared memory
+    assert len(created) == 2
+    for shared in created:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=shared.name)
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from providers.SyntheticDataProvider import SyntheticDataProvider
+from utils.constants import PERIODS_PER_YEAR
+
+
+@pytest.mark.parametrize('interval', list(PERIODS_PER_YEAR))
+def test_every_interval_generates_candles(interval):
+    data = SyntheticDataProvider(seed=3).generate(100, interval=interval)
+
+    assert len(data) == 100
+    assert data.index.is_monotonic_increasing
+    assert (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
+    assert (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
+
+
+def test_same_seed_gives_the_same_candles():
+    first = SyntheticDataProvider(seed=3).get_data('SYNTHETIC', '2020-01-01', '2020-02-01', '60m')
+    second = SyntheticDataProvider(seed=3).get_data('SYNTHETIC', '2020-01-01', '2020-02-01', '60m')
+
+    assert len(first) > 0
+    assert np.array_equal(first.to_numpy(), second.to_numpy())
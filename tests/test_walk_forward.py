@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from agents.AbstractAgent import AbstractAgent
+from models.indicators.AbstractModelIndicator import AbstractModelIndicator
+from tools.BacktestTool import BacktestTool
+from tools.WalkForwardTool import WalkForwardTool
+from utils.constants import BUY, SELL, VECTORIZED
+
+
+class CandleModel(AbstractModelIndicator):
+    """
+    Buys candles closing above their open and sells the others, so signals don't need any warm-up.
+
+    """
+
+    def __init__(self):
+        super().__init__("Candle", columns=['Close', 'Signal'])
+
+    def update(self, data):
+        signals = pd.DataFrame(index=data.index)
+        signals['Close'] = data['Close']
+        signals['Signal'] = np.where(data['Close'] > data['Open'], BUY, SELL)
+        self.signals = signals
+
+
+class CandleAgent(AbstractAgent):
+
+    def __init__(self, balance=10000, percentage=0.1, take_profit=0.02, stop_loss=0.02):
+        super().__init__('Candle Agent', balance, percentage, take_profit, stop_loss)
+        self.add_model(CandleModel())
+
+
+def make_tool(provider, **parameters):
+    return WalkForwardTool({'take_profit': [0.01, 0.03], 'stop_loss': [0.01, 0.03]},
+                           symbol='SYNTHETIC', initial_date='2016-01-01', final_date='2017-07-01',
+                           provider=provider, **parameters)
+
+
+def test_out_of_sample_scores_match_a_backtest_of_the_same_range(file_provider, data):
+    tool = make_tool(file_provider, in_sample_length=120, out_of_sample_length=60)
+    results = tool.execute_agent(CandleAgent(), 10000, 0.1, 0.02, 0.02, save_log=False)
+
+    assert len(results) == (len(data) - 180) // 60 + 1
+    for row in results.to_dict('records'):
+        agent = CandleAgent(take_profit=row['take_profit'], stop_loss=row['stop_loss'])
+        final_date = row['Out of sample final date'] + pd.Timedelta(days=1)
+        backtest = BacktestTool(symbol='SYNTHETIC', initial_date=str(row['Out of sample initial date']),
+                                final_date=str(final_date), mode=VECTORIZED, provider=file_provider)
+        result = backtest.evaluate(agent, backtest.get_data())
+
+        assert row['Out of sample profit (R$)'] == result['Profit']['Total profit (R$)']
+        assert row['Out of sample operations'] == result['Operations']['Total']
+        assert row['Out of sample Sharpe ratio'] == result['Metrics']['Sharpe ratio']
+        assert row['Out of sample max drawdown (%)'] == result['Metrics']['Max drawdown (%)']
+
+
+def test_data_shorter_than_a_window(file_provider, data):
+    tool = make_tool(file_provider, in_sample_length=len(data), out_of_sample_length=10)
+
+    with pytest.raises(ValueError):
+        tool.execute_agent(CandleAgent(), 10000, 0.1, 0.02, 0.02, save_log=False)
@@ -1,4 +1,7 @@
+import contextlib
 from log.Logger import Logger
+from utils.Profiler import PROFILER
+from utils.constants import DETAILED_PROFILE
 
 
 class AbstractTool(object):
@@ -7,7 +10,7 @@ class AbstractTool(object):
 
     """
 
-    def __init__(self, tool_name=None, path_for_log_file='tmp/', parameters=None):
+    def __init__(self, tool_name=None, path_for_log_file='tmp/', parameters=None, profile=False):
         """
         Class constructor
 
@@ -15,9 +18,13 @@ class AbstractTool(object):
         @@type tool_name: string
         @param path_for_log_file: path to save the logs generated by the tool.
         @@type path_for_log_file: string
+        @param profile: False, True to time every phase of a run or DETAILED_PROFILE to also
+        record allocations and per call latency histograms
+        @@type profile: boolean or DETAILED_PROFILE constant
         """
         self.tool_name = tool_name
         self.log = Logger(tool_name, path_for_log_file)
+        self.profile = profile
 
     def execute_agent(self, agent):
         """
@@ -39,6 +46,34 @@ class AbstractTool(object):
         raise NotImplementedError(
             "This method is abstract and must be implemented in derived classes.")
 
+    @contextlib.contextmanager
+    def _profiling(self):
+        """
+        Record the phases of the run inside the context, if the tool profiles. The profiler is stopped even
+        if the run fails, and the phases of a failed run are dropped, so they never show up on another one.
+
+        @return profile: gets the phases under 'Profile' once the run finishes, to be added to the log data
+        (empty if the tool doesn't profile)
+        @@@type profile: dict
+        """
+        profile = {}
+        if not self.profile:
+            yield profile
+            return
+
+        PROFILER.reset()
+        PROFILER.enable(detailed=self.profile == DETAILED_PROFILE)
+        try:
+            yield profile
+        except BaseException:
+            PROFILER.reset()
+            raise
+        finally:
+            PROFILER.disable()
+
+        profile['Profile'] = PROFILER.get_report()
+        print(PROFILER.get_summary())
+
     def _create_log(self, data):
         print('Saving log...')
         self.log.log(data)
\ No newline at end of file
@@ -1,13 +1,15 @@
-import yfinance as yf
 import numpy as np
 import pandas as pd
-from pandas_datareader import data as pdr
-from matplotlib import pyplot as plt
-import matplotlib.dates as mdates
+import os
+import pickle
 from datetime import date
+import time
 from tools.AbstractTool import AbstractTool
-from utils.constants import BUY, SELL, DO_NOTHING
-from tqdm import tqdm
+from log.ResultStore import ResultStore
+from providers.YahooDataProvider import YahooDataProvider
+from utils.constants import BUY, SELL, DO_NOTHING, LOOP, VECTORIZED, CHUNKED, PERIODS_PER_YEAR
+from utils.Profiler import PROFILER
+from utils.RiskMetrics import RiskMetrics
 
 
 class BacktestTool(AbstractTool):
@@ -15,12 +17,27 @@ class BacktestTool(AbstractTool):
     This class represents a tool for backtesting purposes.
 
     """
-    yf.pdr_override()
+
+    # Candles of each block of the equity curve added to the risk metrics (aligned to the first candle)
+    METRICS_BLOCK_SIZE = 1 << 16
 
     def __init__(self,
                  symbol='AAPL',
                  initial_date="2019-01-01",
-                 final_date="2020-01-01"
+                 final_date="2020-01-01",
+                 mode=LOOP,
+                 interval='1d',
+                 provider=None,
+                 profile=False,
+                 stream_log=False,
+                 compress_log=False,
+                 chunk_size=100000,
+                 exits=None,
+                 checkpoint_path=None,
+                 checkpoint_interval=300,
+                 resume=False,
+                 keep_state=False,
+                 result_store=None
                  ):
         """
         Class constructor.
@@ -37,61 +54,547 @@ class BacktestTool(AbstractTool):
         @@type take_profit: float
         @param stop_loss: stop loss constant (where stop the operation for loss)
         @@type stop_loss
+        @param mode: LOOP updates the agent candle by candle, VECTORIZED updates it with the whole series at once
+        and CHUNKED streams the candles to the agent on_bar, reading them from the provider block by block
+        @@type mode: LOOP, VECTORIZED or CHUNKED constant
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param provider: where the data comes from (yahoo finance api by default)
+        @@type provider: class derived from providers.AbstractDataProvider class
+        @param profile: False, True to time every phase of the backtest (added to the log under 'Profile') or
+        DETAILED_PROFILE to also record allocations and per candle latency histograms
+        @@type profile: boolean or DETAILED_PROFILE constant
+        @param stream_log: whether the log is a JSON Lines file, with each operation appended as it is closed
+        and the summary (without the history) on the last line
+        @@type stream_log: boolean
+        @param compress_log: whether the streamed log is compressed with gzip
+        @@type compress_log: boolean
+        @param chunk_size: number of candles of each block read on CHUNKED mode (and of models history kept)
+        @@type chunk_size: integer
+        @param exits: prices the operations endpoints are checked against, set on the agent before running it
+        (None keeps the agent's, see AbstractAgent.set_exits)
+        @@type exits: CLOSE_EXITS or INTRABAR_EXITS constant
+        @param checkpoint_path: file the agent state is periodically saved to on LOOP and CHUNKED modes
+        (None doesn't save it). It is removed once the backtest finishes. Resuming it with another agent
+        (other parameters or models) or another backtest raises a ValueError.
+        @@type checkpoint_path: string
+        @param checkpoint_interval: seconds between checkpoints
+        @@type checkpoint_interval: float
+        @param resume: whether the backtest continues from the checkpoint file, if there is one
+        @@type resume: boolean
+        @param keep_state: whether the state of the finished backtest is kept on the checkpoint file, so a
+        later one with a later final date only runs the new candles (with resume)
+        @@type keep_state: boolean
+        @param result_store: where results are stored, and looked up before running (None doesn't store them)
+        @@type result_store: log.ResultStore
         """
 
-        super().__init__(tool_name="Backtest")
+        super().__init__(tool_name="Backtest", profile=profile)
+
+        if mode not in [LOOP, VECTORIZED, CHUNKED]:
+            raise ValueError(f"Unknown backtest mode '{mode}'.")
+
+        if checkpoint_path is not None and stream_log:
+            raise ValueError("Checkpoints can't be used with a streamed log.")
+
+        if mode == VECTORIZED and (checkpoint_path is not None or resume or keep_state):
+            raise ValueError("Checkpoints can only be used on LOOP and CHUNKED modes.")
+
+        if checkpoint_path is None and (resume or keep_state):
+            raise ValueError("Resuming or keeping the state needs a checkpoint path.")
 
         self.symbol = symbol
         self.data = None
         self.initial_date = initial_date
         self.final_date = final_date
+        self.mode = mode
+        self.interval = interval
+        self.provider = provider or YahooDataProvider()
+        self.stream_log = stream_log
+        self.compress_log = compress_log
+        self.chunk_size = chunk_size
+        self.exits = exits
+        self.equity_curve = None
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.keep_state = keep_state
+        self.result_store = result_store
+        self._last_checkpoint = None
 
-    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True, use_store=True):
         """
         Runs the backtest tool.
 
         @param agent: the agent the method should be executed on.
         @@type agent: class Agent
+        @param use_store: whether a result found on the result store is returned. The agent doesn't run then,
+        so whoever needs its operations afterwards (like MonteCarloTool) must not use it.
+        @@type use_store: boolean
+
+        @return data: the data that goes into the log file, with 'Cached' if it came from the result store
+        @@@type data: dict
         """
         self.initial_balance = balance
+
+        # Identical backtests are answered by the result store
+        description = self.get_description(agent) if self.result_store is not None else None
+        if description is not None and use_store:
+            key = ResultStore.get_key(description)
+            result = self.result_store.get(key)
+            if result is not None:
+                print(f'Found result of agent {agent.get_name()} on the result store')
+                # Nothing ran, so there is nothing profiled
+                result.pop('Profile', None)
+                result['Cached'] = True
+                return result
+
         print(f'Running backtest on agent {agent.get_name()}...')
 
-        data = self.get_data()
+        with self._profiling() as profile:
+            # On CHUNKED mode, the data is only read while the agent runs
+            data = None
+            if self.mode != CHUNKED:
+                with PROFILER.phase('tool.get_data'):
+                    data = self.get_data()
 
-        total_length = len(data)
-        for i in tqdm(range(1, total_length)):
-            agent.update(data[0:i])
+            if save_log and self.stream_log:
+                data = self._evaluate_streaming(agent, data)
+            else:
+                data = self.evaluate(agent, data)
+        data.update(profile)
+
+        # Save log file
+        log_file = None
+        if save_log and self.stream_log:
+            log_file = self.log.close_stream(data)
+        elif save_log:
+            log_file = self.log.log(data)
+
+        if description is not None:
+            self.result_store.put(ResultStore.get_key(description), description,
+                                  {name: value for name, value in data.items() if name != 'Profile'}, log_file)
+
+        return data
+
+    def get_description(self, agent, strict=True):
+        """
+        Describe everything the backtest result of an agent depends on, to key the result store.
+        The mode is left out, since every mode gives the same result.
+
+        @param agent: the agent the backtest runs on
+        @@type agent: class Agent
+        @param strict: whether an agent with models whose parameters are unknown is left undescribed
+        (see AbstractAgent.get_description)
+        @@type strict: boolean
+
+        @return description: backtest and agent settings (None if the agent can't be described)
+        @@@type description: dict
+        """
+        agent_description = agent.get_description(strict)
+        if agent_description is None:
+            return None
+
+        if self.exits is not None:
+            agent_description['Exits'] = self.exits
+
+        return {
+            'Tool': 'Backtest',
+            'Agent': agent_description,
+            'Symbol': self.symbol,
+            'Initial date': str(self.initial_date),
+            'Final date': str(self.final_date),
+            'Interval': self.interval,
+            'Provider': self.provider.get_description(),
+            # Files can change under the same provider settings
+            'Data': self.provider.get_data_version(self.symbol, self.interval),
+            # Streamed logs leave the history out of the result
+            'Stream log': bool(self.stream_log)
+        }
+
+    def evaluate(self, agent, data, include_history=True):
+        """
+        Runs the agent on data already available, without saving any log.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        @param data: data used on the backtest (None reads it block by block on CHUNKED mode)
+        @@type data: pandas dataframe
+        @param include_history: whether the operations history goes into the result
+        @@type include_history: boolean
+
+        @return data: the data that would go into the log file
+        @@@type data: dict
+        """
+        self.initial_balance = agent.initial_balance
+        if self.exits is not None:
+            agent.set_exits(self.exits)
+
+        with PROFILER.phase('tool.run'):
+            metrics = self._run_agent(agent, data, self.mode)
+
+        with PROFILER.phase('tool.report'):
+            if metrics is not None:
+                return self.report(agent, None, include_history, metrics)
 
+            return self.report(agent, data['Close'].to_numpy(dtype=np.float64), include_history)
 
+    def report(self, agent, close_prices, include_history=True, metrics=None):
+        """
+        Creates the results of an agent that already ran.
+
+        @param agent: the agent that ran
+        @@type agent: class Agent
+        @param close_prices: close price of each candle of the backtest (None if the metrics are given)
+        @@type close_prices: numpy array
+        @param include_history: whether the operations history goes into the result
+        @@type include_history: boolean
+        @param metrics: risk metrics already added while the agent ran (like on CHUNKED mode)
+        @@type metrics: utils.RiskMetrics
+
+        @return data: the data that would go into the log file
+        @@@type data: dict
+        """
+        self.initial_balance = agent.initial_balance
         active_operation_data = agent.get_active_operation_data(
-            data['Close'][-1])
-        operation_history = agent.get_history()
+            close_prices[-1] if close_prices is not None and len(close_prices) else None)
+        operation_history = agent.get_history() if include_history else None
         balance = agent.get_balance()
 
         data = self._create_backtest_log_data(
             agent, active_operation_data, balance, operation_history)
+        if metrics is None:
+            data['Metrics'] = self.get_metrics(agent, close_prices)
+        else:
+            data['Metrics'] = metrics.get_metrics(self._get_traded_value(agent))
 
-        # Save log file
-        if save_log:
-            self.log.log(data)
+        return data
+
+    def get_metrics(self, agent, close_prices):
+        """
+        Computes the equity curve of an agent that already ran and its risk metrics.
+        The curve is kept on the tool (equity_curve attribute).
+
+        @param agent: the agent that ran
+        @@type agent: class Agent
+        @param close_prices: close price of each candle the agent ran on
+        @@type close_prices: numpy array
+
+        @return metrics: Sharpe and Sortino ratios, max drawdown, exposure and turnover
+        @@@type metrics: dict
+        """
+        metrics = RiskMetrics(PERIODS_PER_YEAR.get(self.interval, 252))
+        curve = []
+        self._add_equity(agent, metrics, [close_prices], 0, curve=curve)
+        self.equity_curve = np.concatenate(curve) if curve else np.zeros(0)
+
+        return metrics.get_metrics(self._get_traded_value(agent))
+
+    def _add_equity(self, agent, metrics, close_prices, first_index, last_index=None, curve=None):
+        """
+        Mark the operations to market on the candles from first_index on, adding the equity to the risk
+        metrics in blocks of METRICS_BLOCK_SIZE candles. Blocks are aligned to the first candle, so every
+        mode adds the very same blocks and gets the very same metrics.
+
+        @param agent: the agent that ran
+        @@type agent: class Agent
+        @param metrics: where the equity is added
+        @@type metrics: utils.RiskMetrics
+        @param close_prices: close prices from first_index on (the ones added are removed from the list)
+        @@type close_prices: list of numpy arrays
+        @param first_index: index of the first candle of close_prices, the start of a block
+        @@type first_index: integer
+        @param last_index: only whole blocks before it are added (None adds every candle)
+        @@type last_index: integer
+        @param curve: where the equity of each block is appended, if given
+        @@type curve: list
+
+        @return first_index: index of the first candle not added yet
+        @@@type first_index: integer
+        """
+        prices = np.concatenate(close_prices) if close_prices else np.zeros(0)
+        ledger = agent.get_ledger()
+        position = 0
+        while position < len(prices):
+            size = min(self.METRICS_BLOCK_SIZE, len(prices) - position)
+            if last_index is not None and (size < self.METRICS_BLOCK_SIZE or first_index + size > last_index):
+                break
+
+            equity, exposed = ledger.get_equity_curve(prices[position:position + size], agent.initial_balance,
+                                                      first_index)
+            metrics.update(equity, exposed)
+            if curve is not None:
+                curve.append(equity)
+            position += size
+            first_index += size
+
+        close_prices[:] = [prices[position:]]
+
+        return first_index
+
+    @staticmethod
+    def _get_traded_value(agent):
+        """
+        Value that went in and out of the operations of an agent.
+
+        """
+        # Value goes in when an operation opens and out when it closes
+        ledger = agent.get_ledger()
+        invested = ledger.get_column('invested_value')
+
+        return invested.sum() + invested[ledger.get_closed_ids()].sum()
+
+    def _evaluate_streaming(self, agent, data):
+        """
+        Runs the agent writing each operation to the log stream as soon as it is closed.
+        If the run fails, the operations closed until then are kept on the log.
+
+        """
+        self.log.open_stream(compress=self.compress_log)
+        listener = self._stream_operation
+        agent.add_close_listener(listener)
+        try:
+            return self.evaluate(agent, data, include_history=False)
+        except BaseException:
+            self.log.close_stream()
+            raise
+        finally:
+            agent.remove_close_listener(listener)
+
+    def _stream_operation(self, ledger, operation_id):
+        self.log.write({'Operation': ledger.get_record(operation_id)})
+
+    def compare_modes(self, agent):
+        """
+        Runs the agent with both modes on the same data, checking they produce the same operations
+        and reporting how much faster the vectorized mode is.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+
+        @return comparison: elapsed time (in seconds) of each mode and the speedup
+        @@@type comparison: dict
+        """
+        data = self.get_data()
+        elapsed, histories = {}, {}
+
+        for mode in [LOOP, VECTORIZED]:
+            agent.reset()
+            start = time.perf_counter()
+            self._run_agent(agent, data, mode)
+            elapsed[mode] = time.perf_counter() - start
+            histories[mode] = agent.get_history()
+
+        if histories[LOOP] != histories[VECTORIZED]:
+            raise RuntimeError("Loop and vectorized modes generated different operations.")
+
+        speedup = elapsed[LOOP] / elapsed[VECTORIZED]
+        print(f'Loop: {elapsed[LOOP]:.3f}s, vectorized: {elapsed[VECTORIZED]:.3f}s ({speedup:.1f}x faster)')
+
+        return {
+            'Loop (s)': elapsed[LOOP],
+            'Vectorized (s)': elapsed[VECTORIZED],
+            'Speedup': speedup
+        }
+
+    def _run_agent(self, agent, data, mode):
+        """
+        Feeds the data to the agent, candle by candle or at once depending on the mode.
+        The last candle is left out in both modes.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        @param data: data used on the backtest
+        @@type data: pandas dataframe
+        @param mode: how the agent should be updated
+        @@type mode: LOOP, VECTORIZED or CHUNKED constant
+
+        @return metrics: risk metrics added while the agent ran on CHUNKED mode (None otherwise)
+        @@@type metrics: utils.RiskMetrics
+        """
+        if mode == CHUNKED:
+            return self._run_chunked(agent, data)
+
+        total_length = len(data)
+        if mode == VECTORIZED:
+            if total_length > 1:
+                agent.update_all(data[0:total_length - 1])
+        else:
+            from tqdm import tqdm
+            first = self._load_checkpoint(agent, mode, 1)
+            if first > max(total_length, 1):
+                raise ValueError(f"Checkpoint '{self.checkpoint_path}' goes beyond the final date.")
+            for i in tqdm(range(first, total_length), initial=first - 1, total=max(total_length - 1, 0)):
+                agent.update(data[0:i])
+                self._save_checkpoint(agent, mode, i + 1)
+            self._finish_checkpoint(agent, mode, max(first, total_length))
+
+    def _run_chunked(self, agent, data=None):
+        """
+        Streams the candles to the agent block by block, so memory doesn't depend on how many there are.
+        Models keep their running state (like the lookback of moving averages) between blocks, and each candle
+        is only sent once the next one is read, so the last candle is left out as in the other modes.
+        The equity curve is added to the risk metrics as the candles are done with, and isn't kept.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        @param data: data used on the backtest (None reads it from the provider)
+        @@type data: pandas dataframe
+
+        @return metrics: risk metrics of the run
+        @@@type metrics: utils.RiskMetrics
+        """
+        from tqdm import tqdm
+
+        if data is None:
+            chunks = self.provider.get_chunks(self.symbol, self.initial_date, self.final_date,
+                                              self.interval, self.chunk_size)
+        else:
+            chunks = (data.iloc[begin:begin + self.chunk_size] for begin in range(0, len(data), self.chunk_size))
+
+        agent.set_history_size(self.chunk_size)
+        # Candles sent to the agent before the checkpoint are read again, but skipped
+        skipped = self._load_checkpoint(agent, CHUNKED, 0)
+        processed = skipped
+        pending = None
+        metrics = RiskMetrics(PERIODS_PER_YEAR.get(self.interval, 252))
+        # Close prices of the candles whose equity wasn't added to the metrics yet
+        close_prices, added = [], 0
+        with tqdm(unit='candles') as progress:
+            for chunk in chunks:
+                close_prices.append(chunk['Close'].to_numpy(dtype=np.float64))
+                if skipped >= len(chunk):
+                    skipped -= len(chunk)
+                    progress.update(len(chunk))
+                else:
+                    chunk = chunk.iloc[skipped:]
+                    columns = list(chunk.columns)
+                    for date, values in zip(chunk.index, chunk.itertuples(index=False, name=None)):
+                        if pending is not None:
+                            agent.on_bar(*pending)
+                            processed += 1
+                            self._save_checkpoint(agent, CHUNKED, processed)
+                        pending = (date, dict(zip(columns, values)))
+                    progress.update(len(chunk) + skipped)
+                    skipped = 0
+
+                # Operations don't change anymore on the candles the agent went through
+                added = self._add_equity(agent, metrics, close_prices, added, processed)
+
+        if skipped:
+            raise ValueError(f"Checkpoint '{self.checkpoint_path}' goes beyond the final date.")
+        self._finish_checkpoint(agent, CHUNKED, processed)
+
+        self._add_equity(agent, metrics, close_prices, added)
+        self.equity_curve = None
+
+        return metrics
+
+    def _load_checkpoint(self, agent, mode, position):
+        """
+        Restore the agent from the checkpoint file when resuming.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        @param mode: mode of the backtest
+        @@type mode: LOOP or CHUNKED constant
+        @param position: where the backtest starts without a checkpoint
+        @@type position: integer
+
+        @return position: where the backtest continues from
+        @@@type position: integer
+        """
+        self._last_checkpoint = time.monotonic()
+        if self.checkpoint_path is None or not self.resume or not os.path.isfile(self.checkpoint_path):
+            return position
+
+        with open(self.checkpoint_path, 'rb') as f:
+            checkpoint = pickle.load(f)
+
+        key = self._get_checkpoint_key(agent, mode)
+        if checkpoint['Backtest'] != key:
+            differences = sorted(name for name in set(key) | set(checkpoint['Backtest'])
+                                 if key.get(name) != checkpoint['Backtest'].get(name))
+            raise ValueError(f"Checkpoint '{self.checkpoint_path}' is from another backtest "
+                             f"(different {', '.join(differences)}).")
+
+        agent.set_state(checkpoint['Agent'])
+        print(f"Resuming from candle {checkpoint['Position']}...")
+
+        return checkpoint['Position']
+
+    def _save_checkpoint(self, agent, mode, position, force=False):
+        """
+        Save the agent state if the checkpoint interval has passed since the last one. The file is
+        replaced atomically, so an interruption never leaves a broken checkpoint behind.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        @param mode: mode of the backtest
+        @@type mode: LOOP or CHUNKED constant
+        @param position: where the backtest would continue from
+        @@type position: integer
+        @param force: whether it is saved even before the checkpoint interval
+        @@type force: boolean
+        """
+        if self.checkpoint_path is None:
+            return
+        if not force and time.monotonic() - self._last_checkpoint < self.checkpoint_interval:
+            return
+
+        checkpoint = {
+            'Backtest': self._get_checkpoint_key(agent, mode),
+            'Position': position,
+            'Agent': agent.get_state()
+        }
+        temporary_path = f'{self.checkpoint_path}.tmp'
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.checkpoint_path)
+        self._last_checkpoint = time.monotonic()
+
+    def _finish_checkpoint(self, agent, mode, position):
+        """
+        Save the state of the finished backtest if it is kept, remove the checkpoint otherwise.
+
+        """
+        if self.keep_state:
+            self._save_checkpoint(agent, mode, position, force=True)
+        elif self.checkpoint_path is not None and os.path.isfile(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def _get_checkpoint_key(self, agent, mode):
+        """
+        What a checkpoint must have been saved from to be resumed: the description of the backtest (with the
+        agent and model parameters) and how it runs. The final date is left out, so the backtest can be
+        extended. Models whose parameters are unknown are only checked by their class and name.
+
+        """
+        key = self.get_description(agent, strict=False)
+        # Extending a backtest adds data, so its version changes too
+        del key['Final date'], key['Data']
+        key['Mode'] = mode
+        key['Chunk size'] = self.chunk_size if mode == CHUNKED else None
+
+        return key
 
     def get_data(self):
         """
-        Method to get data online using yahoo finance api.
+        Method to get data from the tool provider.
 
-        @return data: data achieved online
-        @@@type data: list of dataframes
+        @return data: data achieved
+        @@@type data: pandas dataframe
         """
         if self.initial_date and self.final_date:
-            # Get stock data from yahoo
-            self.data = pdr.get_data_yahoo(
-                self.symbol, start=self.initial_date, end=self.final_date)
+            # Get stock data from the provider
+            self.data = self.provider.get_data(
+                self.symbol, self.initial_date, self.final_date, self.interval)
 
             self.data['Change'] = self.data['Close'].pct_change()
 
             return self.data
 
-        elif not initial_date:
+        elif not self.initial_date:
             raise ValueError("Initial date can't be an empty value.")
 
         else:
@@ -100,23 +603,21 @@ class BacktestTool(AbstractTool):
     def _create_backtest_log_data(self, agent, active_operation_data, balance, operation_history):
         """
         Method to create the data that goes into the log file.
+        The history is left out if operation_history is None.
 
         """
-        count_buy_operations, count_buy_success_operations, count_sell_operations, count_sell_success_operations, count_successful_operations, count_failed_operations = 0, 0, 0, 0, 0, 0
+        # Count straight from the ledger columns
+        ledger = agent.get_ledger()
+        closed_ids = ledger.get_closed_ids()
+        buy = ledger.get_column('position')[closed_ids] == BUY
+        successful = ledger.get_successful()[closed_ids]
 
-        for history in operation_history:
-            if history['Entered as'].upper() == 'BUY':
-                if history['Result'].upper() == 'SUCCESS':
-                    count_buy_success_operations += 1
-                count_buy_operations += 1
-            else:
-                if history['Result'].upper() == 'SUCCESS':
-                    count_sell_success_operations += 1
-                count_sell_operations += 1
-            if history['Result'].upper() == 'SUCCESS':
-                count_successful_operations += 1
-            else:
-                count_failed_operations += 1
+        count_buy_operations = int(np.count_nonzero(buy))
+        count_buy_success_operations = int(np.count_nonzero(buy & successful))
+        count_sell_operations = len(closed_ids) - count_buy_operations
+        count_successful_operations = int(np.count_nonzero(successful))
+        count_sell_success_operations = count_successful_operations - count_buy_success_operations
+        count_failed_operations = len(closed_ids) - count_successful_operations
 
         total_balance = balance + active_operation_data[1]
         initial_balance = self.initial_balance
@@ -133,7 +634,7 @@ class BacktestTool(AbstractTool):
         }
         data['Profit'] = {
             'Total profit (R$)': round(total_balance - initial_balance, 2),
-            'Total profit (%)': f'{((total_balance - initial_balance) / initial_balance * 100).round(2)} %'
+            'Total profit (%)': f'{round((total_balance - initial_balance) / initial_balance * 100, 2)} %'
         }
         data['Active'] = {
             'Total (#)': round(active_operation_data[0], 2),
@@ -147,8 +648,9 @@ class BacktestTool(AbstractTool):
             'Total sell closed': count_sell_operations,
             'Total sell closed successful': count_sell_success_operations,
             'Total successful': count_successful_operations,
-            'Total failed': count_failed_operations,
-            'History': operation_history
+            'Total failed': count_failed_operations
         }
+        if operation_history is not None:
+            data['Operations']['History'] = operation_history
 
         return data
@@ -0,0 +1,153 @@
+import pandas as pd
+from tools.AbstractTool import AbstractTool
+from tools.BacktestTool import BacktestTool
+from utils.constants import VECTORIZED
+from utils.Profiler import PROFILER
+
+
+class BatchBacktestTool(AbstractTool):
+    """
+    This class represents a backtest of many agents on the same data, like the same agent class with
+    different take profits and stop losses. The data is read once and the signals of each distinct model
+    (same class and parameters, see AbstractModel.get_parameters) are generated once, whatever the number
+    of agents using it. Only the operations of each agent are simulated on their own.
+
+    """
+
+    def __init__(self,
+                 symbol='AAPL',
+                 initial_date="2019-01-01",
+                 final_date="2020-01-01",
+                 interval='1d',
+                 provider=None,
+                 exits=None,
+                 profile=False
+                 ):
+        """
+        Class constructor.
+
+        @param symbol: symbol that should be used while backtesting
+        @@type symbol: string
+        @param initial_date: initial date to get data
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: final date to get data
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param provider: where the data comes from (yahoo finance api by default)
+        @@type provider: class derived from providers.AbstractDataProvider class
+        @param exits: prices the operations exits are checked against (None keeps the agents setting)
+        @@type exits: CLOSE_EXITS or INTRABAR_EXITS constant
+        @param profile: whether the run is profiled (DETAILED_PROFILE also records memory and latencies)
+        @@type profile: boolean or DETAILED_PROFILE constant
+        """
+        super().__init__(tool_name="Batch Backtest", profile=profile)
+
+        self._backtest = BacktestTool(symbol=symbol,
+                                      initial_date=initial_date,
+                                      final_date=final_date,
+                                      mode=VECTORIZED,
+                                      interval=interval,
+                                      provider=provider,
+                                      exits=exits)
+
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+        """
+        Runs the backtest tool on a single agent.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        """
+        return self.run([agent], save_log)
+
+    def run(self, agents, save_log=True):
+        """
+        Runs the backtest of every agent.
+
+        @param agents: agents to be backtested
+        @@type agents: list of classes derived from agents.AbstractAgent class
+        @param save_log: whether the results are saved to a log file
+        @@type save_log: boolean
+
+        @return results: one row per agent, in the same order
+        @@@type results: pandas dataframe
+        """
+        print(f'Running batch backtest of {len(agents)} agents...')
+        with self._profiling() as profile:
+            with PROFILER.phase('tool.get_data'):
+                data = self._backtest.get_data()
+
+            rows = self.evaluate(agents, data)
+        results = pd.DataFrame(rows)
+        results.index.name = 'Agent'
+
+        if save_log:
+            self.log.log({
+                'Symbol': self._backtest.symbol,
+                'Initial date': self._backtest.initial_date,
+                'Final date': self._backtest.final_date,
+                'Results': rows,
+                **profile
+            }, custom_name='batch_')
+
+        return results
+
+    def evaluate(self, agents, data):
+        """
+        Backtest every agent on data already available. The last candle is left out, as in BacktestTool.
+
+        @param agents: agents to be backtested
+        @@type agents: list of classes derived from agents.AbstractAgent class
+        @param data: data used on the backtests
+        @@type data: pandas dataframe
+
+        @return rows: agent, its parameters and its results, for each agent
+        @@@type rows: list of dicts
+        """
+        close_prices = data['Close'].to_numpy()
+        data = data[0:max(len(data) - 1, 0)]
+
+        # Signals of each distinct model, generated on the first agent using it
+        cache = {}
+        rows = []
+        for agent in agents:
+            agent.reset()
+            if self._backtest.exits is not None:
+                agent.set_exits(self._backtest.exits)
+
+            with PROFILER.phase('tool.run'):
+                if len(data):
+                    agent.update_all(data, cache)
+
+            with PROFILER.phase('tool.report'):
+                report = self._backtest.report(agent, close_prices, include_history=False)
+
+            rows.append({
+                'Used on': agent.get_name(),
+                'Models': ', '.join(self._describe(model) for model in agent.get_models()),
+                'Take profit': agent.take_profit,
+                'Stop loss': agent.stop_loss,
+                'Percentage': agent.active_balance_percentage,
+                'Final balance (R$)': report['Balance']['Final (R$)'],
+                'Total profit (R$)': report['Profit']['Total profit (R$)'],
+                'Total operations': report['Operations']['Total'],
+                'Total successful': report['Operations']['Total successful'],
+                'Total failed': report['Operations']['Total failed'],
+                **report['Metrics']
+            })
+
+        print(f'{len(cache)} distinct models generated signals for {len(agents)} agents')
+
+        return rows
+
+    @staticmethod
+    def _describe(model):
+        """
+        Name of a model with its parameters.
+
+        """
+        parameters = model.get_parameters()
+        if not parameters:
+            return model.get_name()
+
+        return f"{model.get_name()} ({', '.join(f'{name}={value}' for name, value in parameters.items())})"
@@ -0,0 +1,192 @@
+import numpy as np
+from tools.AbstractTool import AbstractTool
+
+
+class MonteCarloTool(AbstractTool):
+    """
+    This class represents a robustness analysis of the operations of an agent: the sequence of operation
+    profits is resampled many times (with replacement, or shuffled) to see which final balances and drawdowns
+    the same operations could have given. All the resamples are computed together, in batches of arrays.
+
+    """
+
+    BOOTSTRAP = 'bootstrap'
+    SHUFFLE = 'shuffle'
+
+    PERCENTILES = [5, 25, 50, 75, 95]
+
+    def __init__(self,
+                 simulations=10000,
+                 method=BOOTSTRAP,
+                 ruin_fraction=0.5,
+                 seed=None,
+                 backtest=None,
+                 max_cells=1 << 22
+                 ):
+        """
+        Class constructor.
+
+        @param simulations: number of resamples
+        @@type simulations: integer
+        @param method: BOOTSTRAP draws the operations with replacement, SHUFFLE only changes their order
+        @@type method: MonteCarloTool.BOOTSTRAP or MonteCarloTool.SHUFFLE
+        @param ruin_fraction: fraction of the initial balance whose loss counts as ruin
+        @@type ruin_fraction: float
+        @param seed: seed of the generator (None gives different results on every run, so they can't be stored)
+        @@type seed: integer
+        @param backtest: tool the agent runs on first (None analyzes the operations it already has)
+        @@type backtest: class derived from tools.AbstractTool class
+        @param max_cells: maximum number of simulated operations held at once (bounds memory usage)
+        @@type max_cells: integer
+        """
+        super().__init__(tool_name="Monte Carlo")
+
+        if method not in [self.BOOTSTRAP, self.SHUFFLE]:
+            raise ValueError(f"Unknown resampling method '{method}'.")
+
+        self.simulations = simulations
+        self.method = method
+        self.ruin_fraction = ruin_fraction
+        self.seed = seed
+        self.backtest = backtest
+        self.max_cells = max_cells
+
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+        """
+        Runs the analysis on the closed operations of an agent.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        """
+        if self.backtest is not None:
+            result = agent.run_tool(self.backtest, save_log=False)
+            if isinstance(result, dict) and result.get('Cached'):
+                # Stored results don't run the agent, and its operations are needed
+                self.backtest.execute_agent(agent, agent.initial_balance, agent.active_balance_percentage,
+                                            agent.take_profit, agent.stop_loss, save_log=False, use_store=False)
+
+        profits = self.get_profits(agent)
+        print(f'Resampling {len(profits)} operations of agent {agent.get_name()} {self.simulations} times...')
+
+        data = {
+            'Used on': agent.get_name(),
+            'Method': self.method,
+            'Simulations': self.simulations,
+            'Operations': len(profits),
+            **self.evaluate(profits, agent.initial_balance)
+        }
+
+        print(f"Final balance (median): {data['Final balance (R$)']['p50']:.2f}, "
+              f"max drawdown (p95): {data['Max drawdown (%)']['p95']:.2f} %, "
+              f"risk of ruin: {data['Risk of ruin (%)']:.2f} %")
+
+        if save_log:
+            self.log.log(data, custom_name='monte_carlo_')
+
+        return data
+
+    def get_description(self):
+        """
+        Describe the settings the results depend on (used to key stored results).
+
+        @return description: resampling settings
+        @@@type description: dict
+        """
+        return {
+            'Simulations': self.simulations,
+            'Method': self.method,
+            'Ruin fraction': self.ruin_fraction,
+            'Seed': self.seed,
+            'Max cells': self.max_cells
+        }
+
+    @staticmethod
+    def get_profits(agent):
+        """
+        Get the profits of the closed operations of an agent.
+
+        @param agent: agent that already ran
+        @@type agent: class derived from agents.AbstractAgent class
+
+        @return profits: profit of each closed operation, in the order they were closed
+        @@@type profits: numpy array
+        """
+        ledger = agent.get_ledger()
+
+        return ledger.get_column('profit')[ledger.get_closed_ids()]
+
+    def evaluate(self, profits, initial_balance):
+        """
+        Resample a sequence of operation profits.
+
+        @param profits: profit of each operation, in order
+        @@type profits: numpy array
+        @param initial_balance: balance before the first operation
+        @@type initial_balance: float
+
+        @return results: distributions of the final balance and max drawdown, risk of ruin and of loss
+        @@@type results: dict
+        """
+        final_balances, max_drawdowns, ruined = self.simulate(profits, initial_balance)
+
+        return {
+            'Final balance (R$)': self._describe(final_balances),
+            'Max drawdown (%)': self._describe(max_drawdowns * 100),
+            'Risk of ruin (%)': float(ruined.mean() * 100),
+            'Probability of loss (%)': float((final_balances < initial_balance).mean() * 100)
+        }
+
+    def simulate(self, profits, initial_balance):
+        """
+        Resample a sequence of operation profits.
+
+        @param profits: profit of each operation, in order
+        @@type profits: numpy array
+        @param initial_balance: balance before the first operation
+        @@type initial_balance: float
+
+        @return final_balances: final balance of each resample
+        @@@type final_balances: numpy array
+        @return max_drawdowns: largest drop from a peak of each resample, as a fraction of the peak
+        @@@type max_drawdowns: numpy array
+        @return ruined: whether each resample lost the ruin fraction of the initial balance
+        @@@type ruined: numpy array of booleans
+        """
+        profits = np.asarray(profits, dtype=np.float64)
+        total_operations = len(profits)
+        generator = np.random.default_rng(self.seed)
+
+        final_balances = np.full(self.simulations, float(initial_balance))
+        max_drawdowns = np.zeros(self.simulations)
+        ruined = np.zeros(self.simulations, dtype=bool)
+        if not total_operations:
+            return final_balances, max_drawdowns, ruined
+
+        ruin_balance = initial_balance * (1 - self.ruin_fraction)
+        batch_size = max(1, self.max_cells // total_operations)
+        for begin in range(0, self.simulations, batch_size):
+            end = min(begin + batch_size, self.simulations)
+            if self.method == self.BOOTSTRAP:
+                samples = profits[generator.integers(0, total_operations, size=(end - begin, total_operations))]
+            else:
+                samples = generator.permuted(np.tile(profits, (end - begin, 1)), axis=1)
+
+            balances = initial_balance + np.cumsum(samples, axis=1)
+            # Peaks start at the initial balance
+            peaks = np.maximum.accumulate(np.maximum(balances, initial_balance), axis=1)
+            final_balances[begin:end] = balances[:, -1]
+            max_drawdowns[begin:end] = np.max(1 - balances / peaks, axis=1)
+            ruined[begin:end] = balances.min(axis=1) <= ruin_balance
+
+        return final_balances, max_drawdowns, ruined
+
+    def _describe(self, values):
+        """
+        Summarize a distribution.
+
+        """
+        summary = {f'p{percentile}': float(value)
+                   for percentile, value in zip(self.PERCENTILES, np.percentile(values, self.PERCENTILES))}
+        summary['Mean'] = float(values.mean())
+
+        return summary
@@ -0,0 +1,219 @@
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from tools.AbstractTool import AbstractTool
+from providers.YahooDataProvider import YahooDataProvider
+from utils.SharedArray import SharedArray
+from utils.constants import BUY
+
+# State of each worker process, set once by _initialize_worker
+_worker = {}
+
+
+def _initialize_worker(agent, panel, dates, fields):
+    """
+    Attach a worker process to the shared panel.
+
+    """
+    _worker['shared'] = (panel, dates)
+    _worker['agent'] = agent
+    _worker['panel'] = panel.get_array()
+    _worker['index'] = pd.DatetimeIndex(dates.get_array().view('datetime64[ns]'))
+    _worker['fields'] = fields
+
+
+def _generate_signals(asset):
+    """
+    Generate the agent signals of a single symbol, only on the candles it has.
+
+    @return signals: agent signal on every candle of the calendar (DO_NOTHING where the symbol has no candle)
+    @@@type signals: numpy array of int8
+    """
+    values = _worker['panel'][asset]
+    available = ~np.isnan(values[:, _worker['fields'].index('Close')])
+    data = pd.DataFrame(values[available], index=_worker['index'][available], columns=_worker['fields'])
+
+    signals = np.zeros(len(values), dtype=np.int8)
+    if len(data):
+        with contextlib.redirect_stdout(io.StringIO()):
+            signals[available] = _worker['agent'].generate_signals(data)['Signal'].to_numpy()
+
+    return signals
+
+
+class PortfolioBacktestTool(AbstractTool):
+    """
+    This class represents a tool for backtesting an agent on many symbols at once, sharing a single balance.
+    The symbols are aligned on one calendar, in a panel (symbols x candles x fields), and the signals of
+    each symbol are generated in parallel before all of them are traded together, candle by candle.
+
+    """
+
+    FIELDS = ['Open', 'High', 'Low', 'Close']
+
+    def __init__(self,
+                 symbols,
+                 initial_date="2019-01-01",
+                 final_date="2020-01-01",
+                 interval='1d',
+                 provider=None,
+                 processes=None
+                 ):
+        """
+        Class constructor.
+
+        @param symbols: symbols that should be used while backtesting
+        @@type symbols: list of strings
+        @param initial_date: initial date to get data
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: final date to get data
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param provider: where the data comes from (yahoo finance api by default)
+        @@type provider: class derived from providers.AbstractDataProvider class
+        @param processes: number of processes generating signals (None uses all the cores)
+        @@type processes: integer
+        """
+        super().__init__(tool_name="Portfolio Backtest")
+
+        self.symbols = list(symbols)
+        self.initial_date = initial_date
+        self.final_date = final_date
+        self.interval = interval
+        self.provider = provider or YahooDataProvider()
+        self.processes = processes or os.cpu_count()
+        self.panel = None
+        self.dates = None
+
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+        """
+        Runs the portfolio backtest.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        """
+        print(f'Running portfolio backtest of {len(self.symbols)} symbols on agent {agent.get_name()}...')
+        self.initial_balance = balance
+
+        panel, dates = self.get_data()
+        signals = self._generate_signals(agent, panel, dates)
+
+        agent.reset()
+        open_price, high, low, close = (panel[:, :, self.FIELDS.index(field)]
+                                        for field in ['Open', 'High', 'Low', 'Close'])
+        total_length = len(dates)
+        # All the symbols advance together, leaving the last candle out as BacktestTool does
+        for index in range(total_length - 1):
+            date = dates[index]
+            for asset in np.flatnonzero(~np.isnan(close[:, index])):
+                agent.step(index, date, close[asset, index], float(signals[asset, index]), int(asset),
+                           open_price[asset, index], high[asset, index], low[asset, index])
+
+        data = self._create_log_data(agent)
+
+        if save_log:
+            self.log.log(data, custom_name='portfolio_')
+
+        return data
+
+    def get_data(self):
+        """
+        Get the data of every symbol, aligned on the union of their calendars.
+
+        @return panel: one row per symbol, one column per candle and one layer per field (NaN where missing)
+        @@@type panel: 3-D numpy array
+        @return dates: calendar of the panel
+        @@@type dates: pandas DatetimeIndex
+        """
+        frames = [self.provider.get_data(symbol, self.initial_date, self.final_date, self.interval)
+                  for symbol in self.symbols]
+        indexes = [pd.DatetimeIndex(frame.index) for frame in frames]
+        calendar = np.unique(np.concatenate([index.asi8 for index in indexes]))
+
+        self.panel = np.full((len(frames), len(calendar), len(self.FIELDS)), np.nan)
+        for asset, (frame, index) in enumerate(zip(frames, indexes)):
+            positions = np.searchsorted(calendar, index.asi8)
+            self.panel[asset, positions] = frame[self.FIELDS].to_numpy(dtype=np.float64)
+
+        self.dates = pd.DatetimeIndex(calendar.view('datetime64[ns]'))
+        timezone = indexes[0].tz if indexes else None
+        if timezone is not None:
+            self.dates = self.dates.tz_localize('UTC').tz_convert(timezone)
+
+        return self.panel, self.dates
+
+    def _generate_signals(self, agent, panel, dates):
+        """
+        Generate the agent signals of every symbol in parallel.
+
+        @return signals: one row per symbol and one column per candle
+        @@@type signals: 2-D numpy array of int8
+        """
+        shared_panel = SharedArray.create(panel)
+        shared_dates = SharedArray.create(dates.asi8)
+        try:
+            with ProcessPoolExecutor(max_workers=self.processes,
+                                     initializer=_initialize_worker,
+                                     initargs=(agent, shared_panel, shared_dates, self.FIELDS)) as executor:
+                signals = list(executor.map(_generate_signals, range(len(panel))))
+        finally:
+            shared_panel.unlink()
+            shared_dates.unlink()
+
+        return np.vstack(signals) if signals else np.zeros((0, len(dates)), dtype=np.int8)
+
+    def _create_log_data(self, agent):
+        """
+        Method to create the data that goes into the log file.
+
+        """
+        ledger = agent.get_ledger()
+        closed_ids = ledger.get_closed_ids()
+        assets = ledger.get_column('asset')
+        successful = ledger.get_successful()
+        total_assets = len(self.symbols)
+
+        closed = np.bincount(assets[closed_ids], minlength=total_assets)
+        closed_successful = np.bincount(assets[closed_ids], weights=successful[closed_ids], minlength=total_assets)
+        closed_buy = np.bincount(assets[closed_ids],
+                                 weights=ledger.get_column('position')[closed_ids] == BUY, minlength=total_assets)
+        profit = np.bincount(assets[closed_ids], weights=ledger.get_column('profit')[closed_ids],
+                             minlength=total_assets)
+        total_operations = np.bincount(assets, minlength=total_assets)
+
+        total_active, total_active_value = agent.get_active_operation_data(None)
+        total_balance = agent.get_balance() + total_active_value
+
+        data = {}
+        data['Used on'] = agent.get_name()
+        data['Symbols'] = self.symbols
+        data['Initial date'] = self.initial_date
+        data['Final date'] = self.final_date
+        data['Balance'] = {
+            'Initial (R$)': round(self.initial_balance, 2),
+            'Final (R$)': round(total_balance, 2)
+        }
+        data['Profit'] = {
+            'Total profit (R$)': round(total_balance - self.initial_balance, 2),
+            'Total profit (%)': f'{round((total_balance - self.initial_balance) / self.initial_balance * 100, 2)} %'
+        }
+        data['Active'] = {
+            'Total (#)': total_active,
+            'Total (R$)': total_active_value
+        }
+        data['Per symbol'] = {
+            symbol: {
+                'Total': int(total_operations[asset]),
+                'Total closed': int(closed[asset]),
+                'Total buy closed': int(closed_buy[asset]),
+                'Total successful': int(closed_successful[asset]),
+                'Closed profit (R$)': round(float(profit[asset]), 2)
+            } for asset, symbol in enumerate(self.symbols)
+        }
+        data['History'] = ledger.to_history(asset_names=self.symbols)
+
+        return data
@@ -1,4 +1,159 @@
+import asyncio
+import time
+import numpy as np
 from tools.AbstractTool import AbstractTool
 
+
 class PredictionEngine(AbstractTool):
-    pass
\ No newline at end of file
+    """
+    This class represents a real-time runner: candles come from an asynchronous feed and each one goes
+    through the agent incremental path (AbstractAgent.on_bar) as soon as it arrives.
+
+    The feed, the agent and the event handler run as separate tasks connected by bounded queues. When the
+    handler falls behind, the queues fill up and the feed is only read again once there is room (backpressure).
+    Events are dicts with an 'Event' key: 'Signal' for every candle, 'Open' and 'Close' for operations.
+
+    """
+
+    # Percentiles of the tick-to-signal latency reported
+    PERCENTILES = [50, 90, 99, 99.9]
+
+    def __init__(self, feed, queue_size=1024, on_event=None, history_size=1024):
+        """
+        Class constructor.
+
+        @param feed: asynchronous iterable of (date, bar) pairs
+        @@type feed: providers.ReplayFeed or any async iterable like it
+        @param queue_size: maximum number of candles (and of events) waiting to be processed
+        @@type queue_size: integer
+        @param on_event: called with every event, in order (a coroutine function is awaited)
+        @@type on_event: function
+        @param history_size: number of candles each model keeps to rebuild its signals (None keeps all of them,
+        growing without bound on a long feed)
+        @@type history_size: integer
+        """
+        super().__init__(tool_name="Prediction")
+
+        self.feed = feed
+        self.queue_size = queue_size
+        self.on_event = on_event
+        self.history_size = history_size
+
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+        """
+        Runs the agent on the feed until it ends.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+        """
+        print(f'Running agent {agent.get_name()} on the feed...')
+
+        data = asyncio.run(self.run(agent))
+
+        print(f"{data['Candles']} candles, tick-to-signal latency: "
+              + ', '.join(f'{name} {value:.1f}us' for name, value in data['Latency (us)'].items()))
+
+        if save_log:
+            self.log.log(data, custom_name='prediction_')
+
+        return data
+
+    async def run(self, agent):
+        """
+        Runs the agent on the feed, from inside a running event loop.
+
+        @param agent: the agent the method should be executed on.
+        @@type agent: class Agent
+
+        @return data: the data that goes into the log file
+        @@@type data: dict
+        """
+        bars = asyncio.Queue(maxsize=self.queue_size)
+        events = asyncio.Queue(maxsize=self.queue_size)
+        latencies = []
+
+        tasks = [asyncio.create_task(self._read_feed(bars)),
+                 asyncio.create_task(self._run_agent(agent, bars, events, latencies)),
+                 asyncio.create_task(self._handle_events(events))]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return self._create_log_data(agent, latencies)
+
+    async def _read_feed(self, bars):
+        """
+        Put the candles of the feed on the queue, with the time they were received.
+
+        """
+        async for date, bar in self.feed:
+            await bars.put((time.perf_counter_ns(), date, bar))
+        await bars.put(None)
+
+    async def _run_agent(self, agent, bars, events, latencies):
+        """
+        Update the agent with every candle of the queue, sending its signal and operations as events.
+
+        """
+        ledger = agent.get_ledger()
+        agent.set_history_size(self.history_size)
+        while True:
+            item = await bars.get()
+            if item is None:
+                break
+
+            received, date, bar = item
+            total_operations, total_closed = len(ledger), len(ledger.get_closed_ids())
+            signal = agent.on_bar(date, bar)
+            latencies.append(time.perf_counter_ns() - received)
+
+            await events.put({'Event': 'Signal', 'Date': date, 'Signal': signal})
+            for operation_id in range(total_operations, len(ledger)):
+                await events.put({'Event': 'Open', 'Date': date, 'Operation id': operation_id,
+                                  'Entered as': 'BUY' if ledger.get_column('position')[operation_id] > 0 else 'SELL',
+                                  'Price': float(ledger.get_column('entry_price')[operation_id])})
+            for operation_id in ledger.get_closed_ids()[total_closed:].tolist():
+                await events.put({'Event': 'Close', 'Date': date, **ledger.get_record(operation_id)})
+        await events.put(None)
+
+    async def _handle_events(self, events):
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+
+            if self.on_event is not None:
+                result = self.on_event(event)
+                if asyncio.iscoroutine(result):
+                    await result
+
+    def _create_log_data(self, agent, latencies):
+        """
+        Method to create the data that goes into the log file.
+
+        """
+        latencies = np.array(latencies, dtype=np.float64) / 1e3
+        total_active, total_active_value = agent.get_active_operation_data(None)
+        total_balance = agent.get_balance() + total_active_value
+
+        data = {}
+        data['Used on'] = agent.get_name()
+        data['Candles'] = len(latencies)
+        data['Balance'] = {
+            'Initial (R$)': round(agent.initial_balance, 2),
+            'Final (R$)': round(total_balance, 2)
+        }
+        data['Operations'] = {
+            'Total': len(agent.get_ledger()),
+            'Total closed': len(agent.get_ledger().get_closed_ids()),
+            'Total active': total_active
+        }
+        data['Latency (us)'] = {}
+        if len(latencies):
+            data['Latency (us)'] = {f'p{percentile:g}': float(value) for percentile, value
+                                    in zip(self.PERCENTILES, np.percentile(latencies, self.PERCENTILES))}
+            data['Latency (us)']['max'] = float(latencies.max())
+
+        return data
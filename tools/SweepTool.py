@@ -0,0 +1,275 @@
+import contextlib
+import copy
+import io
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from tools.AbstractTool import AbstractTool
+from tools.BacktestTool import BacktestTool
+from log.ResultStore import ResultStore
+from utils.SharedArray import SharedArray
+from utils.constants import VECTORIZED
+
+# State of each worker process, set once by _initialize_worker
+_worker = {}
+
+
+def _initialize_worker(backtest, agent_class, base_parameters, dates, values, columns, timezone, monte_carlo):
+    """
+    Attach a worker process to the shared price series.
+
+    """
+    index = pd.DatetimeIndex(dates.get_array().view('datetime64[ns]'))
+    if timezone is not None:
+        index = index.tz_localize('UTC').tz_convert(timezone)
+
+    # Keep the shared arrays attached for as long as the worker lives
+    _worker['shared'] = (dates, values)
+    _worker['data'] = pd.DataFrame(values.get_array(), index=index, columns=columns, copy=False)
+    _worker['backtest'] = backtest
+    _worker['agent_class'] = agent_class
+    _worker['base_parameters'] = base_parameters
+    _worker['monte_carlo'] = monte_carlo
+
+
+def _evaluate(parameters):
+    """
+    Backtest a single combination of parameters on the shared price series.
+
+    @return result: the combination and its backtest results
+    @@@type result: dict
+    """
+    # Agents print their models when created, which is just noise here
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = _worker['agent_class'](**{**_worker['base_parameters'], **parameters})
+        data = _worker['backtest'].evaluate(agent, _worker['data'], include_history=False)
+
+    result = {
+        **parameters,
+        'Final balance (R$)': data['Balance']['Final (R$)'],
+        'Total profit (R$)': data['Profit']['Total profit (R$)'],
+        'Total operations': data['Operations']['Total'],
+        'Total successful': data['Operations']['Total successful'],
+        'Total failed': data['Operations']['Total failed'],
+        **data['Metrics']
+    }
+
+    monte_carlo = _worker['monte_carlo']
+    if monte_carlo is not None:
+        robustness = monte_carlo.evaluate(monte_carlo.get_profits(agent), agent.initial_balance)
+        result['Final balance p5 (R$)'] = robustness['Final balance (R$)']['p5']
+        result['Max drawdown p95 (%)'] = robustness['Max drawdown (%)']['p95']
+        result['Risk of ruin (%)'] = robustness['Risk of ruin (%)']
+
+    return result
+
+
+class SweepTool(AbstractTool):
+    """
+    This class represents a tool that backtests every combination of a grid of agent parameters,
+    spreading them over a pool of processes. The price series is put on shared memory once,
+    instead of being pickled for every combination.
+
+    """
+
+    def __init__(self,
+                 parameters,
+                 symbol='AAPL',
+                 initial_date="2019-01-01",
+                 final_date="2020-01-01",
+                 interval='1d',
+                 provider=None,
+                 processes=None,
+                 rank_by='Total profit (R$)',
+                 monte_carlo=None,
+                 result_store=None
+                 ):
+        """
+        Class constructor.
+
+        @param parameters: values to be tried for each agent constructor parameter,
+        like {'fast_factor': [5, 8], 'take_profit': [0.02, 0.03]}
+        @@type parameters: dict of lists
+        @param symbol: symbol that should be used while backtesting
+        @@type symbol: string
+        @param initial_date: initial date to get data
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: final date to get data
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param provider: where the data comes from (yahoo finance api by default)
+        @@type provider: class derived from providers.AbstractDataProvider class
+        @param processes: number of processes (None uses all the cores)
+        @@type processes: integer
+        @param rank_by: result column the combinations are ranked by (higher is better), like 'Total profit (R$)'
+        or a metric like 'Sharpe ratio'
+        @@type rank_by: string
+        @param monte_carlo: resamples the operations of every combination, adding its robustness to the results
+        @@type monte_carlo: tools.MonteCarloTool
+        @param result_store: where the result of each combination is stored, and looked up before running it
+        (None doesn't store them). With a monte_carlo, it needs a seed, or the stored robustness couldn't be
+        reproduced
+        @@type result_store: log.ResultStore
+        """
+        super().__init__(tool_name="Sweep")
+
+        if result_store is not None and monte_carlo is not None and monte_carlo.seed is None:
+            raise ValueError("Storing the results of a Monte Carlo analysis needs a seed.")
+
+        self.parameters = parameters
+        self.processes = processes or os.cpu_count()
+        self.rank_by = rank_by
+        self.monte_carlo = monte_carlo
+        self.result_store = result_store
+        self._backtest = BacktestTool(symbol=symbol,
+                                      initial_date=initial_date,
+                                      final_date=final_date,
+                                      mode=VECTORIZED,
+                                      interval=interval,
+                                      provider=provider)
+
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+        """
+        Runs the sweep. Agents are created with the agent class, taking its values for the parameters
+        that aren't swept.
+
+        @param agent: the agent whose class and parameters are used.
+        @@type agent: class Agent
+
+        @return results: one row per combination, best first
+        @@@type results: pandas dataframe
+        """
+        combinations = self.get_combinations()
+        print(f'Running sweep of {len(combinations)} combinations on agent {agent.get_name()}...')
+
+        base_parameters = {
+            'balance': balance,
+            'percentage': percentage,
+            'take_profit': take_profit,
+            'stop_loss': stop_loss
+        }
+        if self.result_store is None:
+            results = self.evaluate(type(agent), base_parameters, self._backtest.get_data(), combinations)
+        else:
+            results = self._evaluate_stored(type(agent), base_parameters, combinations)
+
+        if save_log:
+            self.log.log({
+                'Used on': agent.get_name(),
+                'Symbol': self._backtest.symbol,
+                'Initial date': self._backtest.initial_date,
+                'Final date': self._backtest.final_date,
+                'Results': results.to_dict('records')
+            }, custom_name='sweep_')
+
+        return results
+
+    def evaluate(self, agent_class, base_parameters, data, combinations):
+        """
+        Backtest combinations of parameters on data already available.
+
+        @param agent_class: class used to create the agents
+        @@type agent_class: class derived from agents.AbstractAgent class
+        @param base_parameters: constructor parameters shared by all the agents
+        @@type base_parameters: dict
+        @param data: data used on the backtests
+        @@type data: pandas dataframe
+        @param combinations: constructor parameters of each agent
+        @@type combinations: list of dicts
+
+        @return results: one row per combination, best first
+        @@@type results: pandas dataframe
+        """
+        return self._rank(self._run(agent_class, base_parameters, data, combinations))
+
+    def _evaluate_stored(self, agent_class, base_parameters, combinations):
+        """
+        Backtest only the combinations whose results aren't on the result store yet, storing them.
+
+        @return results: one row per combination, best first
+        @@@type results: pandas dataframe
+        """
+        keys, descriptions = [], []
+        for combination in combinations:
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent = agent_class(**{**base_parameters, **combination})
+            description = self._backtest.get_description(agent)
+            if description is not None:
+                description.update({'Tool': 'Sweep', 'Monte Carlo': self.monte_carlo.get_description()
+                                    if self.monte_carlo is not None else None})
+            descriptions.append(description)
+            keys.append(ResultStore.get_key(description) if description is not None else None)
+
+        stored = self.result_store.get_many([key for key in keys if key is not None])
+        missing = [number for number, key in enumerate(keys) if key not in stored]
+        print(f'{len(combinations) - len(missing)} combinations found on the result store')
+
+        rows = [stored.get(key) for key in keys]
+        if missing:
+            new_rows = self._run(agent_class, base_parameters, self._backtest.get_data(),
+                                 [combinations[number] for number in missing])
+            for number, row in zip(missing, new_rows):
+                rows[number] = row
+            self.result_store.put_many([(keys[number], descriptions[number], rows[number]) for number in missing
+                                        if keys[number] is not None])
+
+        return self._rank(rows)
+
+    def _run(self, agent_class, base_parameters, data, combinations):
+        """
+        Backtest combinations of parameters on the pool of processes.
+
+        @return rows: the combination and its backtest results, in the same order as the combinations
+        @@@type rows: list of dicts
+        """
+        if not combinations:
+            return []
+
+        values = data.select_dtypes(include='number')
+        index = pd.DatetimeIndex(data.index)
+
+        shared_dates = SharedArray.create(index.asi8)
+        shared_values = SharedArray.create(values.to_numpy(dtype=np.float64))
+        try:
+            # Workers get the tool without its data, which is shared
+            backtest = copy.copy(self._backtest)
+            backtest.data = None
+            initializer_arguments = (backtest, agent_class, base_parameters, shared_dates, shared_values,
+                                     list(values.columns), str(index.tz) if index.tz is not None else None,
+                                     self.monte_carlo)
+            chunk_size = max(1, len(combinations) // (4 * self.processes))
+
+            with ProcessPoolExecutor(max_workers=self.processes,
+                                     initializer=_initialize_worker,
+                                     initargs=initializer_arguments) as executor:
+                rows = list(executor.map(_evaluate, combinations, chunksize=chunk_size))
+        finally:
+            shared_dates.unlink()
+            shared_values.unlink()
+
+        return rows
+
+    def _rank(self, rows):
+        """
+        Sort the results, best first.
+
+        """
+        results = pd.DataFrame(rows)
+        if len(results):
+            results = results.sort_values(self.rank_by, ascending=False, kind='stable').reset_index(drop=True)
+        results.index.name = 'Rank'
+
+        return results
+
+    def get_combinations(self):
+        """
+        Get every combination of the parameters grid.
+
+        @return combinations: constructor parameters of each agent
+        @@@type combinations: list of dicts
+        """
+        names = list(self.parameters)
+        return [dict(zip(names, values)) for values in itertools.product(*self.parameters.values())]
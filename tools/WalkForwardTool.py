@@ -0,0 +1,191 @@
+import contextlib
+import io
+import itertools
+import numpy as np
+import pandas as pd
+from tools.AbstractTool import AbstractTool
+from tools.BacktestTool import BacktestTool
+from utils.constants import VECTORIZED
+
+
+class WalkForwardTool(AbstractTool):
+    """
+    This class represents a walk-forward optimization: the data is split into rolling windows, the best
+    agent parameters are chosen on each in-sample window and scored on the out-of-sample window right after it.
+
+    Signals only depend on past candles, so each distinct set of signal parameters is generated once over
+    the whole series and sliced for every window, which also gives each window the warm-up of the candles
+    before it. Only the operations are simulated again for each window.
+
+    """
+
+    # Agent parameters that change the operations, but not the signals
+    TRADING_PARAMETERS = ['balance', 'percentage', 'take_profit', 'stop_loss']
+
+    def __init__(self,
+                 parameters,
+                 in_sample_length,
+                 out_of_sample_length,
+                 step=None,
+                 symbol='AAPL',
+                 initial_date="2010-01-01",
+                 final_date="2020-01-01",
+                 interval='1d',
+                 provider=None,
+                 rank_by='Total profit (R$)'
+                 ):
+        """
+        Class constructor.
+
+        @param parameters: values to be tried for each agent constructor parameter,
+        like {'fast_factor': [5, 8], 'take_profit': [0.02, 0.03]}
+        @@type parameters: dict of lists
+        @param in_sample_length: number of candles the parameters are chosen on
+        @@type in_sample_length: integer
+        @param out_of_sample_length: number of candles the chosen parameters are scored on
+        @@type out_of_sample_length: integer
+        @param step: number of candles between windows (the out of sample length by default)
+        @@type step: integer
+        @param symbol: symbol that should be used while backtesting
+        @@type symbol: string
+        @param initial_date: initial date to get data
+        @@type initial_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param final_date: final date to get data
+        @@type final_date: datetime string in the format "%YYYY-%MM-%DD"
+        @param interval: candle interval, like '1d' or '1m'
+        @@type interval: string
+        @param provider: where the data comes from (yahoo finance api by default)
+        @@type provider: class derived from providers.AbstractDataProvider class
+        @param rank_by: result the parameters are chosen by (higher is better)
+        @@type rank_by: 'Total profit (R$)', 'Final balance (R$)' or a metric, like 'Sharpe ratio'
+        """
+        super().__init__(tool_name="Walk Forward")
+
+        self.parameters = parameters
+        self.in_sample_length = in_sample_length
+        self.out_of_sample_length = out_of_sample_length
+        self.step = step or out_of_sample_length
+        self.rank_by = rank_by
+        self._backtest = BacktestTool(symbol=symbol,
+                                      initial_date=initial_date,
+                                      final_date=final_date,
+                                      mode=VECTORIZED,
+                                      interval=interval,
+                                      provider=provider)
+
+    def execute_agent(self, agent, balance, percentage, take_profit, stop_loss, save_log=True):
+        """
+        Runs the walk-forward optimization. Agents are created with the agent class, taking its values for the
+        parameters that aren't optimized.
+
+        @param agent: the agent whose class and parameters are used.
+        @@type agent: class Agent
+
+        @return results: one row per window, with the chosen parameters and their scores
+        @@@type results: pandas dataframe
+        """
+        print(f'Running walk-forward on agent {agent.get_name()}...')
+
+        base_parameters = {
+            'balance': balance,
+            'percentage': percentage,
+            'take_profit': take_profit,
+            'stop_loss': stop_loss
+        }
+        results = self.evaluate(type(agent), base_parameters, self._backtest.get_data())
+
+        print(f"Out of sample profit: {results['Out of sample profit (R$)'].sum():.2f} "
+              f"over {len(results)} windows")
+
+        if save_log:
+            self.log.log({
+                'Used on': agent.get_name(),
+                'Symbol': self._backtest.symbol,
+                'Initial date': self._backtest.initial_date,
+                'Final date': self._backtest.final_date,
+                'Windows': results.astype({column: str for column in results.columns
+                                           if column.endswith('date')}).to_dict('records')
+            }, custom_name='walk_forward_')
+
+        return results
+
+    def evaluate(self, agent_class, base_parameters, data):
+        """
+        Runs the walk-forward optimization on data already available.
+
+        @param agent_class: class used to create the agents
+        @@type agent_class: class derived from agents.AbstractAgent class
+        @param base_parameters: constructor parameters shared by all the agents
+        @@type base_parameters: dict
+        @param data: data used on the backtests
+        @@type data: pandas dataframe
+
+        @return results: one row per window, with the chosen parameters and their scores
+        @@@type results: pandas dataframe
+        """
+        window_length = self.in_sample_length + self.out_of_sample_length
+        if len(data) < window_length:
+            raise ValueError(f"The data has {len(data)} candles, fewer than a single window "
+                             f"({self.in_sample_length} in sample and {self.out_of_sample_length} out of sample).")
+
+        names = list(self.parameters)
+        combinations = [dict(zip(names, values)) for values in itertools.product(*self.parameters.values())]
+
+        # Agents are created and their signals generated only once
+        agents, signals, cache = [], [], {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            for combination in combinations:
+                agent = agent_class(**{**base_parameters, **combination})
+                key = tuple((name, value) for name, value in combination.items()
+                            if name not in self.TRADING_PARAMETERS)
+                if key not in cache:
+                    cache[key] = agent.generate_signals(data)['Signal'].to_numpy()
+                agents.append(agent)
+                signals.append(cache[key])
+
+        rows = []
+        for begin in range(0, len(data) - window_length + 1, self.step):
+            middle, end = begin + self.in_sample_length, begin + window_length
+
+            scores = [self._score(agent, data, signal, begin, middle) for agent, signal in zip(agents, signals)]
+            best = max(range(len(combinations)), key=lambda number: scores[number][self.rank_by])
+            out_of_sample = self._score(agents[best], data, signals[best], middle, end)
+
+            rows.append({
+                'In sample initial date': data.index[begin],
+                'In sample final date': data.index[middle - 1],
+                'Out of sample initial date': data.index[middle],
+                'Out of sample final date': data.index[end - 1],
+                **combinations[best],
+                'In sample profit (R$)': scores[best]['Total profit (R$)'],
+                'Out of sample profit (R$)': out_of_sample['Total profit (R$)'],
+                'Out of sample operations': out_of_sample['Total operations'],
+                'Out of sample Sharpe ratio': out_of_sample['Sharpe ratio'],
+                'Out of sample max drawdown (%)': out_of_sample['Max drawdown (%)']
+            })
+
+        results = pd.DataFrame(rows)
+        results.index.name = 'Window'
+
+        return results
+
+    def _score(self, agent, data, signals, begin, end):
+        """
+        Simulate the operations of an agent on a window, from signals already generated.
+        The last candle of the window is left out, as in BacktestTool.
+
+        @return score: final balance, profit, number of operations and risk metrics
+        @@@type score: dict
+        """
+        agent.reset()
+        window = data.iloc[begin:end]
+        agent.trade_all(window.iloc[:-1], signals[begin:end - 1])
+
+        total_balance = agent.get_balance() + agent.get_active_operation_data(None)[1]
+
+        return {
+            'Final balance (R$)': round(total_balance, 2),
+            'Total profit (R$)': round(total_balance - agent.initial_balance, 2),
+            'Total operations': len(agent.get_ledger()),
+            **self._backtest.get_metrics(agent, window['Close'].to_numpy(dtype=np.float64))
+        }
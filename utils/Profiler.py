@@ -0,0 +1,153 @@
+import contextlib
+import sys
+import time
+
+
+class Profiler(object):
+    """
+    Records wall time and call counts of named phases (data fetch, model update, agent consensus...).
+    When enabled with details, it also records allocated memory blocks and a latency histogram per phase.
+    While disabled, phase returns a shared no-op context, so instrumented code costs close to nothing.
+
+    """
+
+    _DISABLED = contextlib.nullcontext()
+
+    def __init__(self):
+        """
+        Class constructor.
+
+        """
+        self.enabled = False
+        self.detailed = False
+        self.reset()
+
+    def enable(self, detailed=False):
+        """
+        Start recording phases.
+
+        @param detailed: whether allocations and latency histograms are recorded too
+        @@type detailed: boolean
+        """
+        self.enabled = True
+        self.detailed = detailed
+
+    def disable(self):
+        """
+        Stop recording phases. What was recorded is kept.
+
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forget every phase recorded.
+
+        """
+        self._phases = {}
+
+    def phase(self, name):
+        """
+        Context that records a phase.
+
+        @param name: phase name
+        @@type name: string
+        """
+        if not self.enabled:
+            return self._DISABLED
+
+        return _Phase(self, name)
+
+    def add(self, name, elapsed, allocated_blocks=0):
+        """
+        Add a call of a phase.
+
+        @param name: phase name
+        @@type name: string
+        @param elapsed: wall time of the call in nanoseconds
+        @@type elapsed: integer
+        @param allocated_blocks: memory blocks allocated (and not freed) by the call
+        @@type allocated_blocks: integer
+        """
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = {'calls': 0, 'elapsed': 0, 'allocated_blocks': 0, 'histogram': {}}
+
+        phase['calls'] += 1
+        phase['elapsed'] += elapsed
+        if self.detailed:
+            phase['allocated_blocks'] += allocated_blocks
+            # Buckets are powers of two of nanoseconds
+            bucket = elapsed.bit_length()
+            phase['histogram'][bucket] = phase['histogram'].get(bucket, 0) + 1
+
+    def get_report(self):
+        """
+        Get what was recorded, in a format that can go into a log.
+
+        @return report: data of each phase
+        @@@type report: dict
+        """
+        report = {}
+        for name, phase in sorted(self._phases.items(), key=lambda item: -item[1]['elapsed']):
+            report[name] = {
+                'Calls': phase['calls'],
+                'Total (s)': phase['elapsed'] / 1e9,
+                'Mean (us)': phase['elapsed'] / phase['calls'] / 1e3
+            }
+            if self.detailed:
+                report[name]['Allocated blocks'] = phase['allocated_blocks']
+                report[name]['Latency histogram'] = {
+                    f'< {self._format_nanoseconds(1 << bucket)}': count
+                    for bucket, count in sorted(phase['histogram'].items())
+                }
+
+        return report
+
+    def get_summary(self):
+        """
+        Get a table summarizing what was recorded.
+
+        @return summary: one line per phase, slowest first
+        @@@type summary: string
+        """
+        lines = [f"{'Phase':<50} {'Calls':>10} {'Total (s)':>12} {'Mean (us)':>12}"]
+        for name, phase in self.get_report().items():
+            lines.append(f"{name:<50} {phase['Calls']:>10} {phase['Total (s)']:>12.4f} {phase['Mean (us)']:>12.2f}")
+
+        return '\n'.join(lines)
+
+    def _format_nanoseconds(self, nanoseconds):
+        for unit, scale in [('s', 1e9), ('ms', 1e6), ('us', 1e3)]:
+            if nanoseconds >= scale:
+                return f'{nanoseconds / scale:.3g}{unit}'
+
+        return f'{nanoseconds}ns'
+
+
+class _Phase(object):
+    """
+    A single call of a phase being recorded.
+
+    """
+
+    __slots__ = ('_profiler', '_name', '_start', '_blocks')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._blocks = sys.getallocatedblocks() if self._profiler.detailed else 0
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exception):
+        elapsed = time.perf_counter_ns() - self._start
+        blocks = sys.getallocatedblocks() - self._blocks if self._profiler.detailed else 0
+        self._profiler.add(self._name, elapsed, blocks)
+        return False
+
+
+# Profiler shared by tools, agents and models
+PROFILER = Profiler()
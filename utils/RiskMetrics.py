@@ -0,0 +1,101 @@
+import math
+import numpy as np
+
+
+class RiskMetrics(object):
+    """
+    Risk and activity metrics of an equity curve, computed from its returns candle by candle.
+    The curve is added block by block and only running statistics are kept (returns moments, peak and
+    drawdown), so it never has to be in memory at once. The same blocks always give the same metrics.
+
+    """
+
+    def __init__(self, periods_per_year=252):
+        """
+        Class constructor.
+
+        @param periods_per_year: number of candles in a year, to annualize the ratios
+        @@type periods_per_year: float
+        """
+        self.periods_per_year = periods_per_year
+        self._candles = 0
+        self._exposed_candles = 0
+        self._equity_sum = 0.0
+        self._last_equity = None
+        self._peak = -math.inf
+        self._max_drawdown = 0.0
+        self._returns = 0
+        self._returns_mean = 0.0
+        self._returns_squares = 0.0
+        self._downside_squares = 0.0
+
+    def update(self, equity, exposed):
+        """
+        Add the next candles of the curve.
+
+        @param equity: equity on each candle
+        @@type equity: numpy array
+        @param exposed: number of operations active on each candle
+        @@type exposed: numpy array of integers
+        """
+        equity = np.asarray(equity, dtype=np.float64)
+        if not len(equity):
+            return
+
+        # The first return of a block comes from the last equity of the one before
+        series = equity if self._last_equity is None else np.concatenate([[self._last_equity], equity])
+        returns = series[1:] / series[:-1] - 1
+        if len(returns):
+            # Moments of the block merged into the running ones (Chan et al.)
+            count = len(returns)
+            mean = returns.mean()
+            squares = np.sum((returns - mean) ** 2)
+            total = self._returns + count
+            delta = mean - self._returns_mean
+            self._returns_squares += squares + delta * delta * self._returns * count / total
+            self._returns_mean += delta * count / total
+            self._returns = total
+            self._downside_squares += np.sum(np.minimum(returns, 0.0) ** 2)
+
+        peaks = np.maximum(np.maximum.accumulate(equity), self._peak)
+        self._max_drawdown = max(self._max_drawdown, float(np.max(1 - equity / peaks)))
+        self._peak = peaks[-1]
+        self._last_equity = equity[-1]
+        self._candles += len(equity)
+        self._exposed_candles += int(np.count_nonzero(exposed))
+        self._equity_sum += float(equity.sum())
+
+    def get_metrics(self, traded_value):
+        """
+        Get the metrics of the whole curve added so far.
+
+        @param traded_value: value that went in and out of operations
+        @@type traded_value: float
+
+        @return metrics: Sharpe and Sortino ratios (annualized), max drawdown, exposure and turnover
+        @@@type metrics: dict
+        """
+        metrics = {
+            'Sharpe ratio': 0.0,
+            'Sortino ratio': 0.0,
+            'Max drawdown (%)': 0.0,
+            'Exposure (%)': 0.0,
+            'Turnover': 0.0
+        }
+        if not self._candles:
+            return metrics
+
+        if self._returns:
+            deviation = math.sqrt(self._returns_squares / self._returns)
+            downside = math.sqrt(self._downside_squares / self._returns)
+            annualization = math.sqrt(self.periods_per_year)
+            if deviation > 0:
+                metrics['Sharpe ratio'] = self._returns_mean / deviation * annualization
+            if downside > 0:
+                metrics['Sortino ratio'] = self._returns_mean / downside * annualization
+
+        metrics['Max drawdown (%)'] = self._max_drawdown * 100
+        metrics['Exposure (%)'] = self._exposed_candles / self._candles * 100
+        metrics['Turnover'] = traded_value / (self._equity_sum / self._candles)
+
+        return {name: round(float(value), 4) for name, value in metrics.items()}
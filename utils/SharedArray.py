@@ -0,0 +1,80 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class SharedArray(object):
+    """
+    NumPy array living on shared memory, so worker processes can read it without a copy.
+    The object itself is small and can be pickled to the workers, which attach to the same memory.
+
+    """
+
+    def __init__(self, name, shape, dtype):
+        """
+        Class constructor. Use SharedArray.create to allocate a new array.
+
+        @param name: name of the shared memory block
+        @@type name: string
+        @param shape: shape of the array
+        @@type shape: tuple
+        @param dtype: type of the array
+        @@type dtype: numpy dtype
+        """
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._memory = None
+
+    @classmethod
+    def create(cls, values):
+        """
+        Allocate shared memory and copy an array to it.
+
+        @param values: array to be shared
+        @@type values: numpy array
+
+        @return shared: the shared array (the caller should unlink it when done)
+        @@@type shared: SharedArray
+        """
+        values = np.asarray(values)
+        memory = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        shared = cls(memory.name, values.shape, values.dtype)
+        shared._memory = memory
+        shared.get_array()[...] = values
+
+        return shared
+
+    def get_array(self):
+        """
+        Get the array, attaching to the shared memory if needed.
+
+        @return array: array backed by the shared memory
+        @@@type array: numpy array
+        """
+        if self._memory is None:
+            self._memory = shared_memory.SharedMemory(name=self.name)
+
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self._memory.buf)
+
+    def close(self):
+        """
+        Detach from the shared memory.
+
+        """
+        if self._memory is not None:
+            self._memory.close()
+            self._memory = None
+
+    def unlink(self):
+        """
+        Free the shared memory. Only the process that created it should call this.
+
+        """
+        memory = self._memory or shared_memory.SharedMemory(name=self.name)
+        self._memory = None
+        memory.close()
+        memory.unlink()
+
+    def __getstate__(self):
+        # Only the description goes to other processes
+        return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype, '_memory': None}
@@ -2,4 +2,33 @@
 
 BUY = 1.0
 SELL = -1.0
-DO_NOTHING = 0.0
\ No newline at end of file
+DO_NOTHING = 0.0
+
+# Backtest modes
+LOOP = 'loop'
+VECTORIZED = 'vectorized'
+CHUNKED = 'chunked'
+
+# Prices operations exits are checked against
+CLOSE_EXITS = 'close'
+INTRABAR_EXITS = 'intrabar'
+
+# Profiling levels (True times the phases only)
+DETAILED_PROFILE = 'detailed'
+
+# Candles per year of each interval, used to annualize ratios (390 minutes per trading day)
+PERIODS_PER_YEAR = {
+    '1m': 252 * 390,
+    '2m': 252 * 195,
+    '5m': 252 * 78,
+    '15m': 252 * 26,
+    '30m': 252 * 13,
+    '60m': 252 * 6.5,
+    '90m': 252 * 390 / 90,
+    '1h': 252 * 6.5,
+    '1d': 252,
+    '5d': 52,
+    '1wk': 52,
+    '1mo': 12,
+    '3mo': 4
+}
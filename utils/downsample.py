@@ -0,0 +1,102 @@
+import numpy as np
+
+# Downsampling methods
+LTTB = 'lttb'
+MIN_MAX = 'min_max'
+
+
+def downsample(x, y, points, method=LTTB):
+    """
+    Choose the points of a series that keep its shape when drawn with far fewer points.
+    Missing values (NaN) are never chosen.
+
+    @param x: position of each point, increasing (like dates in nanoseconds)
+    @@type x: numpy array
+    @param y: value of each point
+    @@type y: numpy array
+    @param points: maximum number of points chosen
+    @@type points: integer
+    @param method: LTTB (largest triangle three buckets) or MIN_MAX (lowest and highest point of each bucket)
+    @@type method: LTTB or MIN_MAX constant
+
+    @return positions: positions of the chosen points, increasing
+    @@@type positions: numpy array of integers
+    """
+    if method not in [LTTB, MIN_MAX]:
+        raise ValueError(f"Unknown downsampling method '{method}'.")
+
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= max(points, 2):
+        return valid
+
+    x = np.asarray(x, dtype=np.float64)[valid]
+    if method == LTTB:
+        return valid[lttb(x, y[valid], points)]
+
+    return valid[min_max(y[valid], points)]
+
+
+def min_max(y, points):
+    """
+    Keep the first and the last point, and the lowest and the highest point of each of (points - 2) / 2
+    buckets of equal size. Peaks are never lost, which is what matters when there are more points than pixels.
+
+    @param y: value of each point (no NaN)
+    @@type y: numpy array
+    @param points: maximum number of points chosen (at least 4)
+    @@type points: integer
+
+    @return positions: positions of the chosen points, increasing
+    @@@type positions: numpy array of integers
+    """
+    total_length = len(y)
+    bucket_size = -(-total_length // max((points - 2) // 2, 1))
+    total_buckets = -(-total_length // bucket_size)
+    padding = total_buckets * bucket_size - total_length
+    offsets = np.arange(total_buckets) * bucket_size
+
+    lowest = np.argmin(np.concatenate([y, np.full(padding, np.inf)]).reshape(total_buckets, bucket_size), axis=1)
+    highest = np.argmax(np.concatenate([y, np.full(padding, -np.inf)]).reshape(total_buckets, bucket_size), axis=1)
+
+    return np.unique(np.concatenate([[0, total_length - 1], offsets + lowest, offsets + highest]))
+
+
+def lttb(x, y, points):
+    """
+    Largest triangle three buckets: keep the first and the last point, and from each bucket in between the
+    point making the largest triangle with the point kept before it and the mean of the next bucket.
+
+    @param x: position of each point, increasing
+    @@type x: numpy array
+    @param y: value of each point (no NaN)
+    @@type y: numpy array
+    @param points: number of points chosen (at least 3)
+    @@type points: integer
+
+    @return positions: positions of the chosen points, increasing
+    @@@type positions: numpy array of integers
+    """
+    total_length = len(y)
+    points = max(points, 3)
+    # Buckets split the points between the first and the last one
+    edges = np.linspace(1, total_length - 1, points - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    x_means = np.add.reduceat(x[:-1], edges[:-1]) / sizes
+    y_means = np.add.reduceat(y[:-1], edges[:-1]) / sizes
+    # The last bucket looks ahead at the last point
+    x_means = np.append(x_means[1:], x[-1])
+    y_means = np.append(y_means[1:], y[-1])
+
+    positions = np.zeros(points, dtype=np.int64)
+    positions[-1] = total_length - 1
+    chosen = 0
+    for bucket in range(points - 2):
+        begin, end = edges[bucket], edges[bucket + 1]
+        bucket_x, bucket_y = x[begin:end], y[begin:end]
+        areas = np.abs((x[chosen] - x_means[bucket]) * (bucket_y - y[chosen])
+                       - (x[chosen] - bucket_x) * (y_means[bucket] - y[chosen]))
+        chosen = begin + int(np.argmax(areas))
+        positions[bucket + 1] = chosen
+
+    return positions
@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def first_crossing(upper_prices, lower_prices, starts, upper_thresholds, lower_thresholds, block_size=64, max_cells=1 << 22):
+    """
+    Find, for every start index, the first index k >= start where upper_prices[k] > upper_threshold or
+    lower_prices[k] < lower_threshold. All the starts are searched together, scanning blocks that double
+    in size until every one of them crossed or reached the end of the series.
+
+    @param upper_prices: prices compared against the upper thresholds
+    @@type upper_prices: numpy array
+    @param lower_prices: prices compared against the lower thresholds
+    @@type lower_prices: numpy array
+    @param starts: first index to be checked for each search
+    @@type starts: numpy array of integers
+    @param upper_thresholds: upper threshold for each search
+    @@type upper_thresholds: numpy array
+    @param lower_thresholds: lower threshold for each search
+    @@type lower_thresholds: numpy array
+    @param block_size: size of the first block scanned
+    @@type block_size: integer
+    @param max_cells: maximum number of cells compared at once (bounds memory usage)
+    @@type max_cells: integer
+
+    @return crossings: index of the first crossing for each search (-1 if it never happened)
+    @@@type crossings: numpy array of integers
+    """
+    total_length = len(upper_prices)
+    starts = np.asarray(starts, dtype=np.int64)
+    crossings = np.full(len(starts), -1, dtype=np.int64)
+    pending = np.flatnonzero(starts < total_length)
+    offset = 0
+
+    while len(pending):
+        block = np.arange(block_size)
+        columns = starts[pending, None] + offset + block
+        valid = columns < total_length
+        clipped = np.minimum(columns, total_length - 1)
+        crossed = valid & ((upper_prices[clipped] > upper_thresholds[pending, None]) |
+                           (lower_prices[clipped] < lower_thresholds[pending, None]))
+        hit = crossed.any(axis=1)
+        crossings[pending[hit]] = columns[hit, crossed[hit].argmax(axis=1)]
+        # Keep only the searches that still have bars to go through
+        pending = pending[~hit & valid[:, -1]]
+        offset += block_size
+        block_size = max(block_size, min(block_size * 2, max_cells // max(len(pending), 1)))
+
+    return crossings